@@ -1,10 +1,14 @@
 """Provide pre-made queries on top of the recorder component."""
 from __future__ import annotations
 
-from collections.abc import Iterable
+import asyncio
+from collections.abc import Callable, Iterable
 from datetime import datetime as dt, timedelta
 from http import HTTPStatus
+from itertools import islice
+import json
 import logging
+import threading
 import time
 from typing import cast
 
@@ -20,7 +24,13 @@ from homeassistant.components.recorder.statistics import (
     statistics_during_period,
 )
 from homeassistant.components.recorder.util import session_scope
-from homeassistant.const import CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE
+from homeassistant.const import (
+    CONF_DOMAINS,
+    CONF_ENTITIES,
+    CONF_EXCLUDE,
+    CONF_INCLUDE,
+    CONTENT_TYPE_JSON,
+)
 from homeassistant.core import HomeAssistant
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.deprecation import deprecated_class, deprecated_function
@@ -28,6 +38,7 @@ from homeassistant.helpers.entityfilter import (
     CONF_ENTITY_GLOBS,
     INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA,
 )
+from homeassistant.helpers.json import JSONEncoder
 import homeassistant.util.dt as dt_util
 
 # mypy: allow-untyped-defs, no-check-untyped-defs
@@ -37,6 +48,26 @@ _LOGGER = logging.getLogger(__name__)
 DOMAIN = "history"
 CONF_ORDER = "use_include_order"
 
+# Streamed responses are written in chunks of about this many bytes,
+# with at most STREAM_MAX_PENDING_CHUNKS chunks waiting to be written
+STREAM_CHUNK_SIZE = 65536
+STREAM_MAX_PENDING_CHUNKS = 4
+MAX_HISTORY_PAGE_SIZE = 10000
+
+HISTORY_CURSOR_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entity_id"): cv.entity_id,
+        vol.Required("metadata_id"): int,
+        vol.Required("last_updated_ts"): vol.Coerce(float),
+        vol.Required("state_id"): int,
+        vol.Required("state"): vol.Any(str, None),
+        vol.Required("pending_state_id"): vol.Any(int, None),
+        # The last state sent in the compressed state format
+        vol.Optional("compressed_state"): vol.Any(str, None),
+        vol.Optional("compressed_attributes"): vol.Any(str, None),
+    }
+)
+
 GLOB_TO_SQL_CHARS = {
     42: "%",  # *
     46: "_",  # .
@@ -96,10 +127,12 @@ async def async_setup(hass, config):
 
     use_include_order = conf.get(CONF_ORDER)
 
+    hass.data[DOMAIN] = filters
     hass.http.register_view(HistoryPeriodView(filters, use_include_order))
     hass.components.frontend.async_register_built_in_panel(
         "history", "history", "hass:chart-box"
     )
+    hass.components.websocket_api.async_register_command(ws_get_history_during_period)
     hass.components.websocket_api.async_register_command(
         ws_get_statistics_during_period
     )
@@ -156,6 +189,118 @@ async def ws_get_statistics_during_period(
     connection.send_result(msg["id"], statistics)
 
 
+def _ws_get_significant_states_page(
+    hass: HomeAssistant,
+    start_time: dt,
+    end_time: dt | None,
+    entity_ids: list[str] | None,
+    include_start_time_state: bool,
+    significant_changes_only: bool,
+    minimal_response: bool,
+    compressed_state_format: bool,
+    page_size: int,
+    cursor: dict | None,
+) -> dict:
+    """Fetch a page of significant states from the database."""
+    with session_scope(hass=hass) as session:
+        states, next_cursor = history.get_significant_states_page_with_session(
+            hass,
+            session,
+            start_time,
+            end_time,
+            entity_ids,
+            hass.data[DOMAIN],
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response and not compressed_state_format,
+            page_size,
+            cursor,
+        )
+    if not compressed_state_format:
+        return {"states": states, "cursor": next_cursor}
+
+    compressed_states = {}
+    for entity_id, entity_states in states.items():
+        if cursor is not None and entity_id == cursor.get("entity_id"):
+            # The entity continues from the previous page
+            compressed_states[entity_id] = history.compress_entity_states(
+                entity_states,
+                minimal_response,
+                cursor.get("compressed_state"),
+                cursor.get("compressed_attributes"),
+            )
+        else:
+            compressed_states[entity_id] = history.compress_entity_states(
+                entity_states, minimal_response
+            )
+    if next_cursor is not None:
+        last_state = states[next_cursor["entity_id"]][-1]
+        next_cursor["compressed_state"] = last_state.state
+        next_cursor["compressed_attributes"] = last_state.attributes_json
+    return {"states": compressed_states, "cursor": next_cursor}
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "history/history_during_period",
+        vol.Required("start_time"): str,
+        vol.Optional("end_time"): str,
+        vol.Optional("entity_ids"): [cv.entity_id],
+        vol.Optional("include_start_time_state", default=True): bool,
+        vol.Optional("significant_changes_only", default=True): bool,
+        vol.Optional("minimal_response", default=False): bool,
+        vol.Optional("compressed_state_format", default=False): bool,
+        vol.Optional("page_size", default=history.HISTORY_PAGE_SIZE): vol.All(
+            int, vol.Range(min=1, max=MAX_HISTORY_PAGE_SIZE)
+        ),
+        vol.Optional("cursor"): HISTORY_CURSOR_SCHEMA,
+    }
+)
+@websocket_api.async_response
+async def ws_get_history_during_period(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Handle history websocket command, one page at a time.
+
+    The result has the states of the page by entity_id and a cursor,
+    which is passed in the next command to fetch the next page until
+    it is None. With compressed_state_format the states of each entity
+    are sent as parallel lists, see history.compress_entity_states.
+    """
+    start_time_str = msg["start_time"]
+    end_time_str = msg.get("end_time")
+
+    if start_time := dt_util.parse_datetime(start_time_str):
+        start_time = dt_util.as_utc(start_time)
+    else:
+        connection.send_error(msg["id"], "invalid_start_time", "Invalid start_time")
+        return
+
+    if end_time_str:
+        if end_time := dt_util.parse_datetime(end_time_str):
+            end_time = dt_util.as_utc(end_time)
+        else:
+            connection.send_error(msg["id"], "invalid_end_time", "Invalid end_time")
+            return
+    else:
+        end_time = None
+
+    page = await hass.async_add_executor_job(
+        _ws_get_significant_states_page,
+        hass,
+        start_time,
+        end_time,
+        msg.get("entity_ids"),
+        msg["include_start_time_state"],
+        msg["significant_changes_only"],
+        msg["minimal_response"],
+        msg["compressed_state_format"],
+        msg["page_size"],
+        msg.get("cursor"),
+    )
+    connection.send_result(msg["id"], page)
+
+
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "history/list_statistic_ids",
@@ -223,6 +368,25 @@ class HistoryPeriodView(HomeAssistantView):
         )
 
         minimal_response = "minimal_response" in request.query
+        compressed_state_format = "compressed_state_format" in request.query
+
+        max_points = None
+        if max_points_str := request.query.get("max_points"):
+            try:
+                max_points = int(max_points_str)
+            except ValueError:
+                max_points = 0
+            if max_points < 1:
+                return self.json_message("Invalid max_points", HTTPStatus.BAD_REQUEST)
+
+        resolution = None
+        if resolution_str := request.query.get("resolution"):
+            try:
+                resolution = timedelta(seconds=float(resolution_str))
+            except (OverflowError, ValueError):
+                resolution = timedelta(0)
+            if resolution <= timedelta(0):
+                return self.json_message("Invalid resolution", HTTPStatus.BAD_REQUEST)
 
         hass = request.app["hass"]
 
@@ -233,6 +397,34 @@ class HistoryPeriodView(HomeAssistantView):
         ):
             return self.json([])
 
+        if max_points or resolution:
+            return cast(
+                web.Response,
+                await hass.async_add_executor_job(
+                    self._downsampled_states_json,
+                    hass,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    significant_changes_only,
+                    max_points or history.DEFAULT_MAX_POINTS,
+                    resolution,
+                ),
+            )
+
+        if "stream" in request.query:
+            return await self._async_stream_significant_states_json(
+                request,
+                hass,
+                start_time,
+                end_time,
+                entity_ids,
+                include_start_time_state,
+                significant_changes_only,
+                minimal_response,
+                compressed_state_format,
+            )
+
         return cast(
             web.Response,
             await hass.async_add_executor_job(
@@ -244,6 +436,7 @@ class HistoryPeriodView(HomeAssistantView):
                 include_start_time_state,
                 significant_changes_only,
                 minimal_response,
+                compressed_state_format,
             ),
         )
 
@@ -256,6 +449,7 @@ class HistoryPeriodView(HomeAssistantView):
         include_start_time_state,
         significant_changes_only,
         minimal_response,
+        compressed_state_format,
     ):
         """Fetch significant stats from the database as json."""
         timer_start = time.perf_counter()
@@ -270,7 +464,7 @@ class HistoryPeriodView(HomeAssistantView):
                 self.filters,
                 include_start_time_state,
                 significant_changes_only,
-                minimal_response,
+                minimal_response and not compressed_state_format,
             )
 
         result = list(result.values())
@@ -291,8 +485,215 @@ class HistoryPeriodView(HomeAssistantView):
             sorted_result.extend(result)
             result = sorted_result
 
+        if compressed_state_format:
+            return self.json(
+                {
+                    state_list[0].entity_id: history.compress_entity_states(
+                        state_list, minimal_response
+                    )
+                    for state_list in result
+                }
+            )
+
+        return self.json(result)
+
+    def _downsampled_states_json(
+        self,
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        significant_changes_only,
+        max_points,
+        resolution,
+    ):
+        """Fetch downsampled states from the database as json.
+
+        The result maps each entity_id to a list of min, mean and max
+        buckets, or to its states if the entity is not numeric.
+        """
+        timer_start = time.perf_counter()
+
+        with session_scope(hass=hass) as session:
+            result = history.get_downsampled_states_with_session(
+                hass,
+                session,
+                start_time,
+                end_time,
+                entity_ids,
+                self.filters,
+                max_points,
+                resolution,
+                significant_changes_only,
+            )
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            elapsed = time.perf_counter() - timer_start
+            _LOGGER.debug("Downsampled %d entities in %fs", len(result), elapsed)
+
         return self.json(result)
 
+    async def _async_stream_significant_states_json(
+        self,
+        request,
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+        compressed_state_format,
+    ):
+        """Stream significant states from the database as a chunked json response.
+
+        The states are written in database order while they are read, so
+        use_include_order is not applied.
+        """
+        chunks: asyncio.Queue[bytes | None] = asyncio.Queue(
+            maxsize=STREAM_MAX_PENDING_CHUNKS
+        )
+        cancel = threading.Event()
+
+        def put_chunk(chunk: bytes | None) -> None:
+            """Queue a chunk, blocks while the client is behind."""
+            asyncio.run_coroutine_threadsafe(chunks.put(chunk), hass.loop).result()
+
+        writer = hass.async_add_executor_job(
+            self._stream_significant_states_json,
+            hass,
+            put_chunk,
+            cancel,
+            start_time,
+            end_time,
+            entity_ids,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            compressed_state_format,
+        )
+        response: web.StreamResponse | None = None
+        failed = False
+        try:
+            while (chunk := await chunks.get()) is not None:
+                if response is None:
+                    # Nothing is sent before the first chunk is encoded,
+                    # errors up to then still get an error status.
+                    response = web.StreamResponse()
+                    response.content_type = CONTENT_TYPE_JSON
+                    response.enable_chunked_encoding()
+                    await response.prepare(request)
+                await response.write(chunk)
+        finally:
+            # Unblock the writer if the client went away
+            cancel.set()
+            while not chunks.empty():
+                chunks.get_nowait()
+            try:
+                await writer
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error streaming history")
+                failed = True
+
+        if response is None:
+            return self.json_message(
+                "Error fetching history", HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+        if failed:
+            # The status has already been sent, close the connection
+            # without ending the body so the client sees it is incomplete.
+            request.transport.close()
+            return response
+
+        await response.write_eof()
+        return response
+
+    def _stream_significant_states_json(
+        self,
+        hass,
+        put_chunk: Callable[[bytes | None], None],
+        cancel: threading.Event,
+        start_time,
+        end_time,
+        entity_ids,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+        compressed_state_format,
+    ):
+        """Encode significant states from the database to json chunks.
+
+        In the compressed state format the parallel lists of an entity are
+        built before they are encoded, so memory is only bounded per entity.
+        """
+        timer_start = time.perf_counter()
+        buffer: list[str] = ["{" if compressed_state_format else "["]
+        buffer_size = 1
+        state_count = 0
+
+        def flush_full_buffer() -> bool:
+            """Queue the buffer once it is full, return False when cancelled."""
+            nonlocal buffer, buffer_size
+            if buffer_size < STREAM_CHUNK_SIZE:
+                return True
+            put_chunk("".join(buffer).encode("UTF-8"))
+            buffer = []
+            buffer_size = 0
+            return not cancel.is_set()
+
+        try:
+            with session_scope(hass=hass) as session:
+                for index, (entity_id, states) in enumerate(
+                    history.stream_significant_states_with_session(
+                        hass,
+                        session,
+                        start_time,
+                        end_time,
+                        entity_ids,
+                        self.filters,
+                        include_start_time_state,
+                        significant_changes_only,
+                        minimal_response and not compressed_state_format,
+                    )
+                ):
+                    if compressed_state_format:
+                        compressed = history.compress_entity_states(
+                            states, minimal_response
+                        )
+                        encoded = json.dumps(
+                            {entity_id: compressed}, cls=JSONEncoder, allow_nan=False
+                        )
+                        buffer.append("," if index else "")
+                        buffer.append(encoded[1:-1])
+                        buffer_size += len(encoded)
+                        state_count += len(compressed[history.COMPRESSED_STATE_KEY])
+                        if not flush_full_buffer():
+                            return
+                        continue
+
+                    buffer.append(",[" if index else "[")
+                    separator = ""
+                    while batch := list(islice(states, history.STREAM_BATCH_SIZE)):
+                        encoded = json.dumps(batch, cls=JSONEncoder, allow_nan=False)
+                        buffer.append(separator)
+                        buffer.append(encoded[1:-1])
+                        buffer_size += len(encoded)
+                        state_count += len(batch)
+                        separator = ","
+                        if not flush_full_buffer():
+                            return
+                    buffer.append("]")
+
+            buffer.append("}" if compressed_state_format else "]")
+            put_chunk("".join(buffer).encode("UTF-8"))
+        finally:
+            if not cancel.is_set():
+                put_chunk(None)
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            elapsed = time.perf_counter() - timer_start
+            _LOGGER.debug("Streamed %d states in %fs", state_count, elapsed)
+
 
 def sqlalchemy_filter_from_include_exclude_conf(conf):
     """Build a sql filter from config."""
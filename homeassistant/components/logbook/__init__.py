@@ -15,11 +15,16 @@ from homeassistant.components.automation import EVENT_AUTOMATION_TRIGGERED
 from homeassistant.components.history import sqlalchemy_filter_from_include_exclude_conf
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
+    EventData,
     Events,
+    StateAttributes,
     States,
     process_timestamp_to_utc_isoformat,
 )
-from homeassistant.components.recorder.util import session_scope
+from homeassistant.components.recorder.util import (
+    find_states_metadata_ids,
+    session_scope,
+)
 from homeassistant.components.script import EVENT_SCRIPT_STARTED
 from homeassistant.const import (
     ATTR_DOMAIN,
@@ -89,9 +94,11 @@ EVENT_COLUMNS = [
     Events.event_type,
     Events.event_data,
     Events.time_fired,
+    Events.time_fired_ts,
     Events.context_id,
     Events.context_user_id,
     Events.context_parent_id,
+    EventData.shared_data,
 ]
 
 SCRIPT_AUTOMATION_EVENTS = [EVENT_AUTOMATION_TRIGGERED, EVENT_SCRIPT_STARTED]
@@ -459,7 +466,7 @@ def _get_events(
             query = _apply_events_types_and_states_filter(
                 hass, query, old_state
             ).filter(
-                (States.last_updated == States.last_changed)
+                (States.last_updated_ts == States.last_changed_ts)
                 | (Events.event_type != EVENT_STATE_CHANGED)
             )
             if filters:
@@ -470,7 +477,7 @@ def _get_events(
             if context_id is not None:
                 query = query.filter(Events.context_id == context_id)
 
-        query = query.order_by(Events.time_fired)
+        query = query.order_by(Events.time_fired_ts)
 
         return list(
             humanify(hass, yield_events(query), entity_attr_cache, context_lookup)
@@ -484,6 +491,7 @@ def _generate_events_query(session):
         States.entity_id,
         States.domain,
         States.attributes,
+        StateAttributes.shared_attrs,
     )
 
 
@@ -494,28 +502,40 @@ def _generate_events_query_without_states(session):
         literal(value=None, type_=sqlalchemy.String).label("entity_id"),
         literal(value=None, type_=sqlalchemy.String).label("domain"),
         literal(value=None, type_=sqlalchemy.Text).label("attributes"),
-    )
+        literal(value=None, type_=sqlalchemy.Text).label("shared_attrs"),
+    ).outerjoin(EventData, (Events.data_id == EventData.data_id))
 
 
 def _generate_states_query(session, start_day, end_day, old_state, entity_ids):
     return (
         _generate_events_query(session)
         .outerjoin(Events, (States.event_id == Events.event_id))
+        .outerjoin(EventData, (Events.data_id == EventData.data_id))
         .outerjoin(old_state, (States.old_state_id == old_state.state_id))
+        .outerjoin(
+            StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
+        )
         .filter(_missing_state_matcher(old_state))
         .filter(_continuous_entity_matcher())
-        .filter((States.last_updated > start_day) & (States.last_updated < end_day))
         .filter(
-            (States.last_updated == States.last_changed)
-            & States.entity_id.in_(entity_ids)
+            (States.last_updated_ts > start_day.timestamp())
+            & (States.last_updated_ts < end_day.timestamp())
+        )
+        .filter(
+            (States.last_updated_ts == States.last_changed_ts)
+            & States.metadata_id.in_(find_states_metadata_ids(session, entity_ids))
         )
     )
 
 
 def _apply_events_types_and_states_filter(hass, query, old_state):
     events_query = (
-        query.outerjoin(States, (Events.event_id == States.event_id))
+        query.outerjoin(EventData, (Events.data_id == EventData.data_id))
+        .outerjoin(States, (Events.event_id == States.event_id))
         .outerjoin(old_state, (States.old_state_id == old_state.state_id))
+        .outerjoin(
+            StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
+        )
         .filter(
             (Events.event_type != EVENT_STATE_CHANGED)
             | _missing_state_matcher(old_state)
@@ -543,15 +563,22 @@ def _continuous_entity_matcher():
     # Prefilter out continuous domains that have
     # ATTR_UNIT_OF_MEASUREMENT as its much faster in sql.
     #
+    # The attributes are either stored on the state row (legacy)
+    # or in the shared state_attributes table
+    #
     return sqlalchemy.or_(
         sqlalchemy.not_(States.domain.in_(CONTINUOUS_DOMAINS)),
         sqlalchemy.not_(States.attributes.contains(UNIT_OF_MEASUREMENT_JSON)),
+        sqlalchemy.not_(
+            StateAttributes.shared_attrs.contains(UNIT_OF_MEASUREMENT_JSON)
+        ),
     )
 
 
 def _apply_event_time_filter(events_query, start_day, end_day):
     return events_query.filter(
-        (Events.time_fired > start_day) & (Events.time_fired < end_day)
+        (Events.time_fired_ts > start_day.timestamp())
+        & (Events.time_fired_ts < end_day.timestamp())
     )
 
 
@@ -562,12 +589,20 @@ def _apply_event_types_filter(hass, query, event_types):
 
 
 def _apply_event_entity_id_matchers(events_query, entity_ids):
+    # The event data is either stored on the event row (legacy)
+    # or in the shared event_data table
     return events_query.filter(
         sqlalchemy.or_(
             *(
                 Events.event_data.contains(ENTITY_ID_JSON_TEMPLATE.format(entity_id))
                 for entity_id in entity_ids
-            )
+            ),
+            *(
+                EventData.shared_data.contains(
+                    ENTITY_ID_JSON_TEMPLATE.format(entity_id)
+                )
+                for entity_id in entity_ids
+            ),
         )
     )
 
@@ -700,7 +735,9 @@ class LazyEventPartialState:
         if self._attributes:
             return self._attributes.get(ATTR_ICON)
 
-        result = ICON_JSON_EXTRACT.search(self._row.attributes)
+        result = ICON_JSON_EXTRACT.search(
+            self._row.shared_attrs or self._row.attributes or ""
+        )
         return result and result.group(1)
 
     @property
@@ -709,7 +746,9 @@ class LazyEventPartialState:
         if self._event_data:
             return self._event_data.get(ATTR_ENTITY_ID)
 
-        result = ENTITY_ID_JSON_EXTRACT.search(self._row.event_data)
+        result = ENTITY_ID_JSON_EXTRACT.search(
+            self._row.shared_data or self._row.event_data or ""
+        )
         return result and result.group(1)
 
     @property
@@ -718,30 +757,31 @@ class LazyEventPartialState:
         if self._event_data:
             return self._event_data.get(ATTR_DOMAIN)
 
-        result = DOMAIN_JSON_EXTRACT.search(self._row.event_data)
+        result = DOMAIN_JSON_EXTRACT.search(
+            self._row.shared_data or self._row.event_data or ""
+        )
         return result and result.group(1)
 
     @property
     def attributes(self):
         """State attributes."""
         if not self._attributes:
-            if (
-                self._row.attributes is None
-                or self._row.attributes == EMPTY_JSON_OBJECT
-            ):
+            source = self._row.shared_attrs or self._row.attributes
+            if source is None or source == EMPTY_JSON_OBJECT:
                 self._attributes = {}
             else:
-                self._attributes = json.loads(self._row.attributes)
+                self._attributes = json.loads(source)
         return self._attributes
 
     @property
     def data(self):
         """Event data."""
         if not self._event_data:
-            if self._row.event_data == EMPTY_JSON_OBJECT:
+            source = self._row.shared_data or self._row.event_data
+            if source is None or source == EMPTY_JSON_OBJECT:
                 self._event_data = {}
             else:
-                self._event_data = json.loads(self._row.event_data)
+                self._event_data = json.loads(source)
         return self._event_data
 
     @property
@@ -7,7 +7,11 @@ import logging
 import voluptuous as vol
 
 from homeassistant.components.recorder.models import States
-from homeassistant.components.recorder.util import execute, session_scope
+from homeassistant.components.recorder.util import (
+    execute,
+    find_states_metadata_ids,
+    session_scope,
+)
 from homeassistant.const import (
     ATTR_TEMPERATURE,
     ATTR_UNIT_OF_MEASUREMENT,
@@ -313,10 +317,12 @@ class Plant(Entity):
             query = (
                 session.query(States)
                 .filter(
-                    (States.entity_id == entity_id.lower())
-                    and (States.last_updated > start_date)
+                    States.metadata_id.in_(
+                        find_states_metadata_ids(session, [entity_id.lower()])
+                    ),
+                    States.last_updated_ts > start_date.timestamp(),
                 )
-                .order_by(States.last_updated.asc())
+                .order_by(States.last_updated_ts.asc())
             )
             states = execute(query, to_native=True, validate_entity_ids=False)
 
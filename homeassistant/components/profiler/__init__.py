@@ -8,20 +8,35 @@ import sys
 import threading
 import time
 import traceback
+from typing import Any
 
 from guppy import hpy
 import objgraph
 from pyprof2calltree import convert
 import voluptuous as vol
 
+from homeassistant.components import websocket_api
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_SCAN_INTERVAL, CONF_TYPE
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import (
+    CONF_SCAN_INTERVAL,
+    CONF_TYPE,
+    EVENT_HOMEASSISTANT_STOP,
+    Platform,
+)
+from homeassistant.core import Event, HomeAssistant, ServiceCall, callback
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.helpers.template import (
+    async_get_profiler as async_get_template_profiler,
+    async_start_profiler as async_start_template_profiler,
+    async_stop_profiler as async_stop_template_profiler,
+)
+
+from .const import DOMAIN, LOOP_LAG_MONITOR
+from .loop_lag import LoopLagMonitor
 
-from .const import DOMAIN
+PLATFORMS = [Platform.SENSOR]
 
 SERVICE_START = "start"
 SERVICE_MEMORY = "memory"
@@ -30,6 +45,10 @@ SERVICE_STOP_LOG_OBJECTS = "stop_log_objects"
 SERVICE_DUMP_LOG_OBJECTS = "dump_log_objects"
 SERVICE_LOG_THREAD_FRAMES = "log_thread_frames"
 SERVICE_LOG_EVENT_LOOP_SCHEDULED = "log_event_loop_scheduled"
+SERVICE_START_EVENT_LISTENER_PROFILER = "start_event_listener_profiler"
+SERVICE_STOP_EVENT_LISTENER_PROFILER = "stop_event_listener_profiler"
+SERVICE_START_TEMPLATE_PROFILER = "start_template_profiler"
+SERVICE_STOP_TEMPLATE_PROFILER = "stop_template_profiler"
 
 
 SERVICES = (
@@ -40,11 +59,22 @@ SERVICES = (
     SERVICE_DUMP_LOG_OBJECTS,
     SERVICE_LOG_THREAD_FRAMES,
     SERVICE_LOG_EVENT_LOOP_SCHEDULED,
+    SERVICE_START_EVENT_LISTENER_PROFILER,
+    SERVICE_STOP_EVENT_LISTENER_PROFILER,
+    SERVICE_START_TEMPLATE_PROFILER,
+    SERVICE_STOP_TEMPLATE_PROFILER,
 )
 
 DEFAULT_SCAN_INTERVAL = timedelta(seconds=30)
+DEFAULT_SLOW_THRESHOLD = 0.1
 
 CONF_SECONDS = "seconds"
+CONF_SLOW_THRESHOLD = "slow_threshold"
+
+# The slowest listeners logged when the event listener profiler stops
+LOG_SLOWEST_LISTENERS = 20
+# The slowest templates logged when the template profiler stops
+LOG_SLOWEST_TEMPLATES = 20
 
 LOG_INTERVAL_SUB = "log_interval_subscription"
 
@@ -56,6 +86,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     lock = asyncio.Lock()
     domain_data = hass.data[DOMAIN] = {}
 
+    monitor = domain_data[LOOP_LAG_MONITOR] = LoopLagMonitor(hass)
+    monitor.async_start()
+    entry.async_on_unload(monitor.async_stop)
+
+    @callback
+    def _async_stop_monitor(event: Event) -> None:
+        """Stop the loop lag monitor when Home Assistant stops."""
+        monitor.async_stop()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop_monitor)
+    )
+
     async def _async_run_profile(call: ServiceCall):
         async with lock:
             await _async_generate_profile(hass, call)
@@ -184,6 +227,32 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _async_dump_thread_frames,
     )
 
+    @callback
+    def _async_start_event_listener_profiler(call: ServiceCall) -> None:
+        """Start recording how long event listeners take."""
+        hass.bus.async_start_profiler(call.data[CONF_SLOW_THRESHOLD])
+
+    @callback
+    def _async_stop_event_listener_profiler(call: ServiceCall) -> None:
+        """Stop recording event listeners and log the slowest."""
+        if (profiler := hass.bus.async_stop_profiler()) is None:
+            return
+        for listener in profiler.async_as_list()[:LOG_SLOWEST_LISTENERS]:
+            _LOGGER.critical("Event listener: %s", listener)
+
+    @callback
+    def _async_start_template_profiler(call: ServiceCall) -> None:
+        """Start recording how long templates take to render."""
+        async_start_template_profiler(hass, call.data[CONF_SLOW_THRESHOLD])
+
+    @callback
+    def _async_stop_template_profiler(call: ServiceCall) -> None:
+        """Stop recording template renders and log the slowest."""
+        if (profiler := async_stop_template_profiler(hass)) is None:
+            return
+        for template in profiler.async_as_list()[:LOG_SLOWEST_TEMPLATES]:
+            _LOGGER.critical("Template: %s", template)
+
     async_register_admin_service(
         hass,
         DOMAIN,
@@ -191,19 +260,104 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _async_dump_scheduled,
     )
 
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_START_EVENT_LISTENER_PROFILER,
+        _async_start_event_listener_profiler,
+        schema=vol.Schema(
+            {
+                vol.Optional(
+                    CONF_SLOW_THRESHOLD, default=DEFAULT_SLOW_THRESHOLD
+                ): vol.Coerce(float)
+            }
+        ),
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_STOP_EVENT_LISTENER_PROFILER,
+        _async_stop_event_listener_profiler,
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_START_TEMPLATE_PROFILER,
+        _async_start_template_profiler,
+        schema=vol.Schema(
+            {
+                vol.Optional(
+                    CONF_SLOW_THRESHOLD, default=DEFAULT_SLOW_THRESHOLD
+                ): vol.Coerce(float)
+            }
+        ),
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_STOP_TEMPLATE_PROFILER,
+        _async_stop_template_profiler,
+    )
+
+    websocket_api.async_register_command(hass, websocket_event_listeners)
+    websocket_api.async_register_command(hass, websocket_templates)
+
+    hass.config_entries.async_setup_platforms(entry, PLATFORMS)
+
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
     for service in SERVICES:
         hass.services.async_remove(domain=DOMAIN, service=service)
+    hass.bus.async_stop_profiler()
+    async_stop_template_profiler(hass)
     if LOG_INTERVAL_SUB in hass.data[DOMAIN]:
         hass.data[DOMAIN][LOG_INTERVAL_SUB]()
     hass.data.pop(DOMAIN)
     return True
 
 
+@callback
+@websocket_api.websocket_command({vol.Required("type"): "profiler/event_listeners"})
+@websocket_api.require_admin
+def websocket_event_listeners(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the stats of the event listener profiler."""
+    if (profiler := hass.bus.profiler) is None:
+        connection.send_error(
+            msg["id"], "not_running", "The event listener profiler is not running"
+        )
+        return
+    connection.send_result(msg["id"], profiler.async_as_list())
+
+
+@callback
+@websocket_api.websocket_command({vol.Required("type"): "profiler/templates"})
+@websocket_api.require_admin
+def websocket_templates(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the stats of the template profiler."""
+    if (profiler := async_get_template_profiler(hass)) is None:
+        connection.send_error(
+            msg["id"], "not_running", "The template profiler is not running"
+        )
+        return
+    connection.send_result(msg["id"], profiler.async_as_list())
+
+
 async def _async_generate_profile(hass: HomeAssistant, call: ServiceCall):
     start_time = int(time.time() * 1000000)
     hass.components.persistent_notification.async_create(
@@ -2,3 +2,5 @@
 
 DOMAIN = "profiler"
 DEFAULT_NAME = "Profiler"
+
+LOOP_LAG_MONITOR = "loop_lag_monitor"
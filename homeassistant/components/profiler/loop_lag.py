@@ -0,0 +1,128 @@
+"""Monitor how late the event loop runs scheduled callbacks."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+import logging
+import re
+import sys
+import threading
+import time
+import traceback
+
+from homeassistant.core import HomeAssistant, callback
+
+# Seconds between two lag measurements
+LAG_CHECK_INTERVAL = 0.25
+# Lag in seconds above which the loop thread stack is sampled
+DEFAULT_LAG_THRESHOLD = 0.1
+# Number of measurements the percentiles are calculated over
+LAG_SAMPLES = 1200
+# Number of innermost frames logged with a stack sample
+LOGGED_FRAMES = 15
+
+_INTEGRATION_RE = re.compile(r"[/\\](?:components|custom_components)[/\\]([^/\\]+)")
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measure the scheduling latency of the event loop.
+
+    A callback rescheduled every LAG_CHECK_INTERVAL records how late it
+    runs. A watchdog thread samples the stack of the loop thread once
+    per stall when the loop has not run the callback within the
+    threshold, and attributes the stall to the integration it was in.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        threshold: float = DEFAULT_LAG_THRESHOLD,
+        interval: float = LAG_CHECK_INTERVAL,
+    ) -> None:
+        """Initialize the monitor."""
+        self._hass = hass
+        self._loop = hass.loop
+        self.threshold = threshold
+        self._interval = interval
+        self._lags: deque[float] = deque(maxlen=LAG_SAMPLES)
+        self.blocking_integrations: Counter[str] = Counter()
+        self._handle: asyncio.TimerHandle | None = None
+        self._expected = 0.0
+        self._heartbeat = 0.0
+        self._loop_thread_id: int | None = None
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start measuring the loop lag."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._expected = self._loop.time() + self._interval
+        self._handle = self._loop.call_at(self._expected, self._async_check)
+        self._stop.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="profiler_loop_lag", daemon=True
+        )
+        self._watchdog.start()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop measuring the loop lag."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    @callback
+    def _async_check(self) -> None:
+        """Record how late this callback runs and schedule the next one."""
+        now = self._loop.time()
+        self._lags.append(max(now - self._expected, 0.0))
+        self._heartbeat = time.monotonic()
+        self._expected = now + self._interval
+        self._handle = self._loop.call_at(self._expected, self._async_check)
+
+    def percentile(self, percent: float) -> float | None:
+        """Return a percentile of the recent lags in seconds."""
+        if not (lags := sorted(self._lags)):
+            return None
+        return lags[min(int(len(lags) * percent / 100), len(lags) - 1)]
+
+    def _watch(self) -> None:
+        """Sample the loop thread stack when the loop stalls."""
+        sampled_heartbeat = None
+        while not self._stop.wait(self._interval):
+            heartbeat = self._heartbeat
+            lag = time.monotonic() - heartbeat - self._interval
+            if lag > self.threshold and heartbeat != sampled_heartbeat:
+                sampled_heartbeat = heartbeat
+                self._sample(lag)
+
+    def _sample(self, lag: float) -> None:
+        """Log the stack of the loop thread and the integration it is in."""
+        # pylint: disable=protected-access
+        if (frame := sys._current_frames().get(self._loop_thread_id)) is None:
+            return
+        stack = traceback.extract_stack(frame)
+        integration = _integration_from_stack(stack)
+        self.blocking_integrations[integration] += 1
+        _LOGGER.warning(
+            "Event loop blocked for more than %.3f seconds in %s: %s",
+            lag,
+            integration,
+            "".join(traceback.format_list(stack[-LOGGED_FRAMES:])).strip(),
+        )
+
+
+def _integration_from_stack(stack: traceback.StackSummary) -> str:
+    """Return the innermost integration in the stack."""
+    for frame in reversed(stack):
+        if match := _INTEGRATION_RE.search(frame.filename):
+            return match.group(1)
+    return "homeassistant"
@@ -0,0 +1,66 @@
+"""Sensors for the event loop lag measured by the profiler."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import TIME_MILLISECONDS
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DEFAULT_NAME, DOMAIN, LOOP_LAG_MONITOR
+from .loop_lag import LoopLagMonitor
+
+SCAN_INTERVAL = timedelta(seconds=30)
+
+SENSOR_TYPES: tuple[SensorEntityDescription, ...] = (
+    SensorEntityDescription(key="50", name="Event loop lag median"),
+    SensorEntityDescription(key="95", name="Event loop lag 95th percentile"),
+    SensorEntityDescription(key="99", name="Event loop lag 99th percentile"),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the event loop lag sensors."""
+    monitor: LoopLagMonitor = hass.data[DOMAIN][LOOP_LAG_MONITOR]
+    async_add_entities(
+        LoopLagSensor(monitor, entry, description) for description in SENSOR_TYPES
+    )
+
+
+class LoopLagSensor(SensorEntity):
+    """A percentile of the recent event loop lag."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = TIME_MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        monitor: LoopLagMonitor,
+        entry: ConfigEntry,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._monitor = monitor
+        self._percent = float(description.key)
+        self._attr_name = f"{DEFAULT_NAME} {description.name}"
+        self._attr_unique_id = f"{entry.entry_id}_loop_lag_{description.key}"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the lag in milliseconds."""
+        if (lag := self._monitor.percentile(self._percent)) is None:
+            return None
+        return round(lag * 1000, 1)
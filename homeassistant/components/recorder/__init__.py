@@ -14,6 +14,7 @@ import threading
 import time
 from typing import Any
 
+from lru import LRU  # pylint: disable=no-name-in-module
 from sqlalchemy import create_engine, event as sqlalchemy_event, exc, func, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import scoped_session, sessionmaker
@@ -31,8 +32,10 @@ from homeassistant.const import (
     EVENT_STATE_CHANGED,
     EVENT_TIME_CHANGED,
     MATCH_ALL,
+    Platform,
 )
-from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.core import CoreState, Event, HomeAssistant, callback
+from homeassistant.helpers import discovery
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entityfilter import (
     INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA,
@@ -51,6 +54,7 @@ from homeassistant.helpers.integration_platform import (
 from homeassistant.helpers.service import async_extract_entity_ids
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.loader import bind_hass
+from homeassistant.setup import async_when_setup
 import homeassistant.util.dt as dt_util
 
 from . import history, migration, purge, statistics, websocket_api
@@ -61,16 +65,21 @@ from .const import (
     MAX_QUEUE_BACKLOG,
     SQLITE_URL_PREFIX,
 )
+from .metrics import RecorderMetrics
 from .models import (
     Base,
+    EventData,
     Events,
     RecorderRuns,
+    StateAttributes,
     States,
+    StatesMeta,
     StatisticsRuns,
     process_timestamp,
 )
 from .pool import RecorderPool
 from .util import (
+    bulk_insert_and_set_ids,
     dburl_to_path,
     end_incomplete_runs,
     move_away_broken_database,
@@ -126,6 +135,16 @@ KEEPALIVE_TIME = 30
 # States and Events objects
 EXPIRE_AFTER_COMMITS = 120
 
+# The number of attribute ids to cache in memory
+#
+# Based on:
+# - The number of overlapping attributes
+# - How frequently states with overlapping attributes will change
+# - How much memory our low end hardware has
+STATE_ATTRIBUTES_ID_CACHE_SIZE = 2048
+STATES_META_ID_CACHE_SIZE = 8192
+EVENT_DATA_ID_CACHE_SIZE = 2048
+
 DB_LOCK_TIMEOUT = 30
 DB_LOCK_QUEUE_CHECK_TIMEOUT = 1
 
@@ -270,6 +289,12 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     history.async_setup(hass)
     statistics.async_setup(hass)
     websocket_api.async_setup(hass)
+
+    async def _async_load_sensors(hass: HomeAssistant, component: str) -> None:
+        """Add the recorder sensors once the sensor integration is set up."""
+        await discovery.async_load_platform(hass, component, DOMAIN, {}, config)
+
+    async_when_setup(hass, Platform.SENSOR, _async_load_sensors)
     await async_process_integration_platforms(hass, DOMAIN, _process_recorder_platform)
 
     return await instance.async_db_ready
@@ -457,6 +482,24 @@ class DatabaseLockTask(RecorderTask):
         instance._lock_database(self)  # pylint: disable=[protected-access]
 
 
+@dataclass
+class CommitTask(RecorderTask):
+    """Commit the event session."""
+
+    def run(self, instance: Recorder) -> None:
+        """Handle the task."""
+        instance._commit_event_session_or_retry()  # pylint: disable=[protected-access]
+
+
+@dataclass
+class KeepAliveTask(RecorderTask):
+    """A keep alive to be sent."""
+
+    def run(self, instance: Recorder) -> None:
+        """Handle the task."""
+        instance._send_keep_alive()  # pylint: disable=[protected-access]
+
+
 @dataclass
 class StopTask(RecorderTask):
     """An object to insert into the recorder queue to stop the event handler."""
@@ -516,11 +559,18 @@ class Recorder(threading.Thread):
         self.entity_filter = entity_filter
         self.exclude_t = exclude_t
 
-        self._timechanges_seen = 0
         self._commits_without_expire = 0
-        self._keepalive_count = 0
         self._old_states: dict[str, States] = {}
-        self._pending_expunge: list[States] = []
+        self._state_attributes_ids: LRU = LRU(STATE_ATTRIBUTES_ID_CACHE_SIZE)
+        self._pending_state_attributes: dict[str, StateAttributes] = {}
+        self._states_meta_ids: LRU = LRU(STATES_META_ID_CACHE_SIZE)
+        self._pending_states_meta: dict[str, StatesMeta] = {}
+        self._event_data_ids: LRU = LRU(EVENT_DATA_ID_CACHE_SIZE)
+        self._pending_event_data: dict[str, EventData] = {}
+        self._pending_events: list[tuple[Events, EventData | None]] = []
+        self._pending_states: list[
+            tuple[States, Events, StateAttributes | None, States | None]
+        ] = []
         self.event_session = None
         self.get_session = None
         self._completed_first_database_setup = None
@@ -528,8 +578,11 @@ class Recorder(threading.Thread):
         self.async_migration_event = asyncio.Event()
         self.migration_in_progress = False
         self._queue_watcher = None
+        self._keep_alive_listener = None
+        self._commit_listener = None
         self._db_supports_row_number = True
         self._database_lock_task: DatabaseLockTask | None = None
+        self.metrics = RecorderMetrics()
 
         self.enabled = True
 
@@ -569,6 +622,12 @@ class Recorder(threading.Thread):
         if self._queue_watcher:
             self._queue_watcher()
             self._queue_watcher = None
+        if self._keep_alive_listener:
+            self._keep_alive_listener()
+            self._keep_alive_listener = None
+        if self._commit_listener:
+            self._commit_listener()
+            self._commit_listener = None
         if self._event_listener:
             self._event_listener()
             self._event_listener = None
@@ -579,6 +638,10 @@ class Recorder(threading.Thread):
         if event.event_type in self.exclude_t:
             return False
 
+        if event.event_type == EVENT_TIME_CHANGED:
+            # Commits and keep alives run on their own timers
+            return False
+
         if (entity_id := event.data.get(ATTR_ENTITY_ID)) is None:
             return True
 
@@ -730,6 +793,25 @@ class Recorder(threading.Thread):
             self.hass, self.async_periodic_statistics, minute=range(0, 60, 5), second=10
         )
 
+        # Keep the connection alive and commit the session on timers
+        self._keep_alive_listener = async_track_time_interval(
+            self.hass, self._async_keep_alive, timedelta(seconds=KEEPALIVE_TIME)
+        )
+        if self.commit_interval:
+            self._commit_listener = async_track_time_interval(
+                self.hass, self._async_commit, timedelta(seconds=self.commit_interval)
+            )
+
+    @callback
+    def _async_keep_alive(self, now: datetime) -> None:
+        """Queue a keep alive."""
+        self.queue.put(KeepAliveTask())
+
+    @callback
+    def _async_commit(self, now: datetime) -> None:
+        """Queue a commit."""
+        self.queue.put(CommitTask())
+
     def run(self):
         """Start processing events to save."""
         shutdown_task = object()
@@ -790,16 +872,25 @@ class Recorder(threading.Thread):
         self.stop_requested = False
         while not self.stop_requested:
             task = self.queue.get()
+            start = time.monotonic()
             try:
                 self._process_one_task_or_recover(task)
             except Exception as err:  # pylint: disable=broad-except
                 _LOGGER.exception("Error while processing event %s: %s", task, err)
+            self.metrics.record_task(type(task).__name__, time.monotonic() - start)
 
         self._shutdown()
 
     def _process_one_task_or_recover(self, task: RecorderTask):
         """Process an event, reconnect, or recover a malformed database."""
         try:
+            # Other tasks share the scoped session with the event writer
+            # and would otherwise not see the events and states that are
+            # still queued for the next batch.
+            if not isinstance(task, (EventTask, StopTask)) and (
+                self._pending_events or self._pending_states
+            ):
+                self._commit_event_session_or_retry()
             return task.run(self)
         except exc.DatabaseError as err:
             if self._handle_database_error(err):
@@ -890,61 +981,175 @@ class Recorder(threading.Thread):
         )
 
     def _process_one_event(self, event):
-        if event.event_type == EVENT_TIME_CHANGED:
-            self._keepalive_count += 1
-            if self._keepalive_count >= KEEPALIVE_TIME:
-                self._keepalive_count = 0
-                self._send_keep_alive()
-            if self.commit_interval:
-                self._timechanges_seen += 1
-                if self._timechanges_seen >= self.commit_interval:
-                    self._timechanges_seen = 0
-                    self._commit_event_session_or_retry()
-            return
-
         if not self.enabled:
             return
 
-        try:
-            if event.event_type == EVENT_STATE_CHANGED:
-                dbevent = Events.from_event(event, event_data="{}")
-            else:
-                dbevent = Events.from_event(event)
-            dbevent.created = event.time_fired
-            self.event_session.add(dbevent)
-        except (TypeError, ValueError):
-            _LOGGER.warning("Event is not JSON serializable: %s", event)
-            return
-
         if event.event_type == EVENT_STATE_CHANGED:
-            try:
-                dbstate = States.from_event(event)
-                has_new_state = event.data.get("new_state")
-                if dbstate.entity_id in self._old_states:
-                    old_state = self._old_states.pop(dbstate.entity_id)
-                    if old_state.state_id:
-                        dbstate.old_state_id = old_state.state_id
-                    else:
-                        dbstate.old_state = old_state
-                if not has_new_state:
-                    dbstate.state = None
-                dbstate.event = dbevent
-                dbstate.created = event.time_fired
-                self.event_session.add(dbstate)
-                if has_new_state:
-                    self._old_states[dbstate.entity_id] = dbstate
-                    self._pending_expunge.append(dbstate)
-            except (TypeError, ValueError):
-                _LOGGER.warning(
-                    "State is not JSON serializable: %s",
-                    event.data.get("new_state"),
-                )
+            self._process_state_changed_event(event)
+        else:
+            self._process_non_state_changed_event(event)
 
         # If they do not have a commit interval
         # than we commit right away
         if not self.commit_interval:
             self._commit_event_session_or_retry()
 
+    def _process_non_state_changed_event(self, event: Event) -> None:
+        """Queue an event that is not a state change for the next commit."""
+        try:
+            shared_data = EventData.shared_data_from_event(event)
+        except (TypeError, ValueError):
+            _LOGGER.warning("Event is not JSON serializable: %s", event)
+            return
+
+        dbevent = Events.from_event(event)
+        dbevent.created = event.time_fired
+        dbevent.data_id, pending_event_data = self._lookup_event_data(shared_data)
+        self._pending_events.append((dbevent, pending_event_data))
+
+    def _process_state_changed_event(self, event: Event) -> None:
+        """Queue a state changed event and its state for the next commit."""
+        dbevent = Events.from_event(event)
+        dbevent.created = event.time_fired
+        try:
+            dbstate = States.from_event(event)
+            shared_attrs = StateAttributes.shared_attrs_from_event(event)
+        except (TypeError, ValueError):
+            _LOGGER.warning(
+                "State is not JSON serializable: %s",
+                event.data.get("new_state"),
+            )
+            self._pending_events.append((dbevent, None))
+            return
+
+        dbstate.attributes_id, pending_attributes = self._lookup_state_attributes(
+            shared_attrs
+        )
+        dbstate.metadata_id = self._lookup_states_meta(dbstate.entity_id)
+
+        has_new_state = event.data.get("new_state")
+        pending_old_state: States | None = None
+        if dbstate.entity_id in self._old_states:
+            old_state = self._old_states.pop(dbstate.entity_id)
+            if old_state.state_id:
+                dbstate.old_state_id = old_state.state_id
+            else:
+                # The old state is part of this commit as well, its id
+                # is resolved once the batch has been inserted.
+                pending_old_state = old_state
+        if not has_new_state:
+            dbstate.state = None
+        dbstate.created = event.time_fired
+        self._pending_states.append(
+            (dbstate, dbevent, pending_attributes, pending_old_state)
+        )
+        if has_new_state:
+            self._old_states[dbstate.entity_id] = dbstate
+
+    def _lookup_event_data(
+        self, shared_data: str
+    ) -> tuple[int | None, EventData | None]:
+        """Return the id of matching event data or the pending row to write."""
+        # Matching data found in the pending commit
+        if pending_event_data := self._pending_event_data.get(shared_data):
+            return None, pending_event_data
+        # Matching data id found in the cache
+        if data_id := self._event_data_ids.get(shared_data):
+            return data_id, None
+        data_hash = EventData.hash_shared_data(shared_data)
+        # Matching data found in the database
+        if data_id := self._find_shared_data_in_db(data_hash, shared_data):
+            self._event_data_ids[shared_data] = data_id
+            return data_id, None
+        # No matching data found, save it in the DB
+        pending_event_data = EventData(shared_data=shared_data, hash=data_hash)
+        self._pending_event_data[shared_data] = pending_event_data
+        self.event_session.add(pending_event_data)
+        return None, pending_event_data
+
+    def _lookup_state_attributes(
+        self, shared_attrs: str
+    ) -> tuple[int | None, StateAttributes | None]:
+        """Return the id of matching attributes or the pending row to write."""
+        # Matching attributes found in the pending commit
+        if pending_attributes := self._pending_state_attributes.get(shared_attrs):
+            return None, pending_attributes
+        # Matching attributes id found in the cache
+        if attributes_id := self._state_attributes_ids.get(shared_attrs):
+            return attributes_id, None
+        attr_hash = StateAttributes.hash_shared_attrs(shared_attrs)
+        # Matching attributes found in the database
+        if attributes_id := self._find_shared_attr_in_db(attr_hash, shared_attrs):
+            self._state_attributes_ids[shared_attrs] = attributes_id
+            return attributes_id, None
+        # No matching attributes found, save them in the DB
+        pending_attributes = StateAttributes(shared_attrs=shared_attrs, hash=attr_hash)
+        self._pending_state_attributes[shared_attrs] = pending_attributes
+        self.event_session.add(pending_attributes)
+        return None, pending_attributes
+
+    def _lookup_states_meta(self, entity_id: str) -> int | None:
+        """Return the metadata id of an entity id.
+
+        None is returned when the entity id is new, its metadata id is
+        assigned when the pending states meta is written with the batch.
+        """
+        if entity_id in self._pending_states_meta:
+            return None
+        # Matching metadata id found in the cache
+        if metadata_id := self._states_meta_ids.get(entity_id):
+            return metadata_id
+        # Matching metadata found in the database
+        with self.event_session.no_autoflush:
+            if states_meta := (
+                self.event_session.query(StatesMeta.metadata_id)
+                .filter(StatesMeta.entity_id == entity_id)
+                .first()
+            ):
+                self._states_meta_ids[entity_id] = states_meta[0]
+                return states_meta[0]
+        # No matching metadata found, save it in the DB
+        pending_states_meta = StatesMeta(entity_id=entity_id)
+        self._pending_states_meta[entity_id] = pending_states_meta
+        self.event_session.add(pending_states_meta)
+        return None
+
+    def _find_shared_data_in_db(self, data_hash: int, shared_data: str) -> int | None:
+        """Find shared event data in the db from the hash and shared_data."""
+        #
+        # Avoid the event session being flushed since it will
+        # commit all the pending events and states to the database.
+        #
+        with self.event_session.no_autoflush:
+            if data := (
+                self.event_session.query(EventData.data_id)
+                .filter(EventData.hash == data_hash)
+                .filter(EventData.shared_data == shared_data)
+                .first()
+            ):
+                return data[0]
+        return None
+
+    def _find_shared_attr_in_db(self, attr_hash: int, shared_attrs: str) -> int | None:
+        """Find shared attributes in the db from the hash and shared_attrs."""
+        #
+        # Avoid the event session being flushed since it will
+        # commit all the pending events and states to the database.
+        #
+        # The lookup has already checked to see if the data is cached
+        # or going to be written in the next commit so there is no
+        # need to flush before checking the database.
+        #
+        with self.event_session.no_autoflush:
+            if attributes := (
+                self.event_session.query(StateAttributes.attributes_id)
+                .filter(StateAttributes.hash == attr_hash)
+                .filter(StateAttributes.shared_attrs == shared_attrs)
+                .first()
+            ):
+                return attributes[0]
+        return None
+
     def _handle_database_error(self, err):
         """Handle a database error that may result in moving away the corrupt db."""
         if isinstance(err.__cause__, sqlite3.DatabaseError):
@@ -957,7 +1162,12 @@ class Recorder(threading.Thread):
 
     def _commit_event_session_or_retry(self):
         """Commit the event session if there is work to do."""
-        if not self.event_session.new and not self.event_session.dirty:
+        if (
+            not self.event_session.new
+            and not self.event_session.dirty
+            and not self._pending_events
+            and not self._pending_states
+        ):
             return
         tries = 1
         while tries <= self.db_max_retries:
@@ -975,20 +1185,40 @@ class Recorder(threading.Thread):
                     raise
 
                 tries += 1
+                self.metrics.record_commit_retry()
                 time.sleep(self.db_retry_wait)
 
     def _commit_event_session(self):
         self._commits_without_expire += 1
+        start = time.monotonic()
+        rows = (
+            len(self.event_session.new)
+            + len(self._pending_events)
+            + 2 * len(self._pending_states)
+        )
 
-        if self._pending_expunge:
-            self.event_session.flush()
-            for dbstate in self._pending_expunge:
-                # Expunge the state so its not expired
-                # until we use it later for dbstate.old_state
-                if dbstate in self.event_session:
-                    self.event_session.expunge(dbstate)
-            self._pending_expunge = []
+        # Flush the shared attributes and event data first
+        # so the batched events and states can refer to their ids.
+        self.event_session.flush()
+        if self._pending_events or self._pending_states:
+            self._bulk_insert_pending_events_and_states()
         self.event_session.commit()
+        self._pending_events = []
+        self._pending_states = []
+        self.metrics.record_commit(rows, time.monotonic() - start)
+
+        # Map the newly written attributes to their ids
+        # so we can avoid a database lookup the next time
+        # they are seen.
+        for shared_attrs, attributes in self._pending_state_attributes.items():
+            self._state_attributes_ids[shared_attrs] = attributes.attributes_id
+        self._pending_state_attributes = {}
+        for entity_id, states_meta in self._pending_states_meta.items():
+            self._states_meta_ids[entity_id] = states_meta.metadata_id
+        self._pending_states_meta = {}
+        for shared_data, event_data in self._pending_event_data.items():
+            self._event_data_ids[shared_data] = event_data.data_id
+        self._pending_event_data = {}
 
         # Expire is an expensive operation (frequently more expensive
         # than the flush and commit itself) so we only
@@ -997,6 +1227,49 @@ class Recorder(threading.Thread):
             self._commits_without_expire = 0
             self.event_session.expire_all()
 
+    def _bulk_insert_pending_events_and_states(self):
+        """Write the queued events and states with as few statements as possible.
+
+        Going through the unit of work issues one INSERT per row and
+        resolves every relationship in Python, which dominates the
+        recorder thread when many states change at once. The state events
+        and states are written with multi row INSERTs as their ids are
+        needed to link them.
+        """
+        session = self.event_session
+        for dbevent, event_data in self._pending_events:
+            if event_data is not None:
+                dbevent.data_id = event_data.data_id
+        # Events without a state do not need their primary key back
+        # so they can be written with a single executemany.
+        session.bulk_save_objects(
+            [dbevent for dbevent, _ in self._pending_events], preserve_order=True
+        )
+
+        if not self._pending_states:
+            return
+
+        bulk_insert_and_set_ids(
+            session, [dbevent for _, dbevent, _, _ in self._pending_states]
+        )
+        for dbstate, dbevent, attributes, _ in self._pending_states:
+            dbstate.event_id = dbevent.event_id
+            if attributes is not None:
+                dbstate.attributes_id = attributes.attributes_id
+            if dbstate.metadata_id is None:
+                dbstate.metadata_id = self._pending_states_meta[
+                    dbstate.entity_id
+                ].metadata_id
+        bulk_insert_and_set_ids(
+            session, [dbstate for dbstate, _, _, _ in self._pending_states]
+        )
+        if old_state_ids := [
+            {"state_id": dbstate.state_id, "old_state_id": old_state.state_id}
+            for dbstate, _, _, old_state in self._pending_states
+            if old_state is not None
+        ]:
+            session.bulk_update_mappings(States, old_state_ids)
+
     def _handle_sqlite_corruption(self):
         """Handle the sqlite3 database being corrupt."""
         self._close_event_session()
@@ -1008,6 +1281,14 @@ class Recorder(threading.Thread):
     def _close_event_session(self):
         """Close the event session."""
         self._old_states = {}
+        self._pending_events = []
+        self._pending_states = []
+        self._state_attributes_ids.clear()
+        self._pending_state_attributes = {}
+        self._states_meta_ids.clear()
+        self._pending_states_meta = {}
+        self._event_data_ids.clear()
+        self._pending_event_data = {}
 
         if not self.event_session:
             return
@@ -2,19 +2,30 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from itertools import groupby
+from datetime import timedelta
+from itertools import chain, groupby
 import logging
+import math
 import time
 
 from sqlalchemy import and_, bindparam, func
 from sqlalchemy.ext import baked
 
 from homeassistant.components import recorder
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
 from homeassistant.core import split_entity_id
 import homeassistant.util.dt as dt_util
 
-from .models import LazyState, States, process_timestamp_to_utc_isoformat
-from .util import execute, session_scope
+from . import statistics
+from .models import (
+    LazyState,
+    StateAttributes,
+    States,
+    Statistics,
+    StatisticsShortTerm,
+    process_timestamp,
+)
+from .util import execute, find_states_metadata_ids, session_scope
 
 # mypy: allow-untyped-defs, no-check-untyped-defs
 
@@ -23,6 +34,11 @@ _LOGGER = logging.getLogger(__name__)
 STATE_KEY = "state"
 LAST_CHANGED_KEY = "last_changed"
 
+COMPRESSED_STATE_KEY = "s"
+COMPRESSED_LAST_UPDATED_KEY = "lu"
+COMPRESSED_LAST_CHANGED_KEY = "lc"
+COMPRESSED_ATTRIBUTES_KEY = "a"
+
 SIGNIFICANT_DOMAINS = (
     "climate",
     "device_tracker",
@@ -44,12 +60,26 @@ QUERY_STATES = [
     States.entity_id,
     States.state,
     States.attributes,
-    States.last_changed,
-    States.last_updated,
+    States.last_changed_ts,
+    States.last_updated_ts,
+    StateAttributes.shared_attrs,
 ]
 
 HISTORY_BAKERY = "recorder_history_bakery"
 
+# Number of rows fetched from the database at once when streaming
+STREAM_BATCH_SIZE = 1000
+HISTORY_PAGE_SIZE = 1000
+
+# Number of buckets returned by downsampled history without a resolution
+DEFAULT_MAX_POINTS = 1000
+
+# Statistics which can be reduced to buckets at least as wide as their period
+STATISTICS_PERIODS = (
+    ("hour", Statistics.duration),
+    ("5minute", StatisticsShortTerm.duration),
+)
+
 
 def async_setup(hass):
     """Set up the history hooks."""
@@ -87,38 +117,19 @@ def get_significant_states_with_session(
     """
     timer_start = time.perf_counter()
 
-    baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
+    baked_query, metadata_ids = _significant_states_baked_query(
+        hass, session, end_time, entity_ids, filters, significant_changes_only
     )
-
-    if significant_changes_only:
-        baked_query += lambda q: q.filter(
-            (
-                States.domain.in_(SIGNIFICANT_DOMAINS)
-                | (States.last_changed == States.last_updated)
-            )
-            & (States.last_updated > bindparam("start_time"))
-        )
-    else:
-        baked_query += lambda q: q.filter(States.last_updated > bindparam("start_time"))
-
     if entity_ids is not None:
-        baked_query += lambda q: q.filter(
-            States.entity_id.in_(bindparam("entity_ids", expanding=True))
-        )
+        baked_query += lambda q: q.order_by(States.metadata_id, States.last_updated_ts)
     else:
-        baked_query += lambda q: q.filter(~States.domain.in_(IGNORE_DOMAINS))
-        if filters:
-            filters.bake(baked_query)
-
-    if end_time is not None:
-        baked_query += lambda q: q.filter(States.last_updated < bindparam("end_time"))
-
-    baked_query += lambda q: q.order_by(States.entity_id, States.last_updated)
+        baked_query += lambda q: q.order_by(States.entity_id, States.last_updated_ts)
 
     states = execute(
         baked_query(session).params(
-            start_time=start_time, end_time=end_time, entity_ids=entity_ids
+            start_time_ts=start_time.timestamp(),
+            end_time_ts=end_time.timestamp() if end_time is not None else None,
+            metadata_ids=metadata_ids,
         )
     )
 
@@ -138,32 +149,467 @@ def get_significant_states_with_session(
     )
 
 
+def stream_significant_states_with_session(
+    hass,
+    session,
+    start_time,
+    end_time=None,
+    entity_ids=None,
+    filters=None,
+    include_start_time_state=True,
+    significant_changes_only=True,
+    minimal_response=False,
+):
+    """Yield the significant states during UTC period start_time - end_time.
+
+    Works like get_significant_states_with_session, but rather than building
+    the whole result in memory it yields (entity_id, states) tuples while the
+    rows are read from the database. The states of an entity must be consumed
+    before advancing to the next entity.
+
+    The entities are yielded in database order, entities which only have a
+    state at start_time come last.
+    """
+    start_states = {}
+    if include_start_time_state:
+        run = recorder.run_information_from_instance(hass, start_time)
+        for state in _get_states_with_session(
+            hass, session, start_time, entity_ids, run=run, filters=filters
+        ):
+            state.last_changed = start_time
+            state.last_updated = start_time
+            start_states[state.entity_id] = state
+
+    baked_query, metadata_ids = _significant_states_baked_query(
+        hass, session, end_time, entity_ids, filters, significant_changes_only
+    )
+    if entity_ids is not None:
+        baked_query += lambda q: q.order_by(States.metadata_id, States.last_updated_ts)
+    else:
+        baked_query += lambda q: q.order_by(States.entity_id, States.last_updated_ts)
+
+    states = (
+        baked_query(session)
+        .params(
+            start_time_ts=start_time.timestamp(),
+            end_time_ts=end_time.timestamp() if end_time is not None else None,
+            metadata_ids=metadata_ids,
+        )
+        .with_post_criteria(lambda q: q.yield_per(STREAM_BATCH_SIZE))
+    )
+
+    for ent_id, group in groupby(states, lambda state: state.entity_id):
+        start_state = start_states.pop(ent_id, None)
+        entity_states = _stream_entity_states(
+            ent_id, start_state, group, minimal_response
+        )
+        if start_state is not None:
+            entity_states = chain((start_state,), entity_states)
+        yield ent_id, entity_states
+
+    for ent_id, start_state in start_states.items():
+        yield ent_id, iter((start_state,))
+
+
+def get_significant_states_page_with_session(
+    hass,
+    session,
+    start_time,
+    end_time=None,
+    entity_ids=None,
+    filters=None,
+    include_start_time_state=True,
+    significant_changes_only=True,
+    minimal_response=False,
+    page_size=HISTORY_PAGE_SIZE,
+    cursor=None,
+):
+    """Return a page of the significant states during UTC period start_time - end_time.
+
+    At most page_size rows are read from the database per page, ordered by
+    entity. Pass the returned cursor to fetch the next page, it is None once
+    the last page has been returned. Only the first page has the states at
+    start_time.
+
+    With minimal_response the first and the last state of each entity
+    in the period are native states.
+    """
+    result = defaultdict(list)
+    if cursor is None and include_start_time_state:
+        run = recorder.run_information_from_instance(hass, start_time)
+        for state in _get_states_with_session(
+            hass, session, start_time, entity_ids, run=run, filters=filters
+        ):
+            state.last_changed = start_time
+            state.last_updated = start_time
+            result[state.entity_id].append(state)
+
+    baked_query, metadata_ids = _significant_states_baked_query(
+        hass, session, end_time, entity_ids, filters, significant_changes_only
+    )
+    baked_query += lambda q: q.add_columns(States.metadata_id, States.state_id)
+    if cursor is not None:
+        # Continue after the last row of the previous page
+        baked_query += lambda q: q.filter(
+            (States.metadata_id > bindparam("cursor_metadata_id"))
+            | (
+                (States.metadata_id == bindparam("cursor_metadata_id"))
+                & (
+                    (States.last_updated_ts > bindparam("cursor_last_updated_ts"))
+                    | (
+                        (States.last_updated_ts == bindparam("cursor_last_updated_ts"))
+                        & (States.state_id > bindparam("cursor_state_id"))
+                    )
+                )
+            )
+        )
+    baked_query += lambda q: q.order_by(
+        States.metadata_id, States.last_updated_ts, States.state_id
+    )
+    baked_query += lambda q: q.limit(bindparam("page_size"))
+
+    cursor = cursor or {}
+    rows = execute(
+        baked_query(session).params(
+            start_time_ts=start_time.timestamp(),
+            end_time_ts=end_time.timestamp() if end_time is not None else None,
+            metadata_ids=metadata_ids,
+            page_size=page_size,
+            cursor_metadata_id=cursor.get("metadata_id"),
+            cursor_last_updated_ts=cursor.get("last_updated_ts"),
+            cursor_state_id=cursor.get("state_id"),
+        )
+    )
+
+    metadata_id = cursor.get("metadata_id")
+    prev_state = cursor.get("state")
+    # The last state change of an entity is held back until we know if it
+    # is followed by another change, the last one is sent as a native state
+    pending = None
+    if (pending_state_id := cursor.get("pending_state_id")) is not None:
+        pending = _get_state_row_with_session(hass, session, pending_state_id)
+
+    for row in rows:
+        if row.metadata_id != metadata_id:
+            if pending is not None:
+                result[pending.entity_id].append(LazyState(pending))
+                pending = None
+            metadata_id = row.metadata_id
+            prev_state = None
+
+        ent_results = result[row.entity_id]
+        if (
+            not minimal_response
+            or split_entity_id(row.entity_id)[0] in NEED_ATTRIBUTE_DOMAINS
+            or prev_state is None
+        ):
+            ent_results.append(LazyState(row))
+            prev_state = row.state
+            continue
+
+        # With minimal response we do not care about attribute
+        # changes so we can filter out duplicate states
+        if row.state == prev_state:
+            continue
+        if pending is not None:
+            ent_results.append(_minimal_state(pending))
+        pending = row
+        prev_state = row.state
+
+    next_cursor = None
+    if len(rows) < page_size:
+        if pending is not None:
+            result[pending.entity_id].append(LazyState(pending))
+    else:
+        last_row = rows[-1]
+        next_cursor = {
+            "entity_id": last_row.entity_id,
+            "metadata_id": last_row.metadata_id,
+            "last_updated_ts": last_row.last_updated_ts,
+            "state_id": last_row.state_id,
+            "state": prev_state,
+            "pending_state_id": pending.state_id if pending is not None else None,
+        }
+
+    return dict(result), next_cursor
+
+
+def get_downsampled_states_with_session(
+    hass,
+    session,
+    start_time,
+    end_time,
+    entity_ids=None,
+    filters=None,
+    max_points=DEFAULT_MAX_POINTS,
+    resolution=None,
+    significant_changes_only=True,
+):
+    """Return the states during UTC period start_time - end_time in buckets.
+
+    The period is split in buckets which are resolution wide, or wider to
+    not return more than max_points buckets. The states of numeric entities
+    are reduced to the min, time weighted mean and max of every bucket as
+    they are read from the database. Other entities return their states like
+    get_significant_states_with_session.
+
+    When entity_ids are given and the buckets are at least as wide as the
+    long or short term statistics, entities with statistics covering
+    start_time are reduced from the statistics. Only the states recorded
+    after the last compiled statistics are read.
+    """
+    now = dt_util.utcnow()
+    end_time = min(end_time or now, now)
+    start_ts = start_time.timestamp()
+    end_ts = end_time.timestamp()
+    width = (end_ts - start_ts) / max_points
+    if resolution is not None:
+        width = max(width, resolution.total_seconds())
+
+    buckets = {}
+    # Entities reduced from the statistics by the start of their states
+    states_start_times = defaultdict(list)
+    if entity_ids is not None:
+        for period, duration in STATISTICS_PERIODS:
+            if width >= duration.total_seconds():
+                for entity_id, stats in statistics.statistics_during_period(
+                    hass, start_time, end_time, entity_ids, period, True
+                ).items():
+                    entity_buckets = _StateBuckets(start_ts, end_ts, width)
+                    if states_start := entity_buckets.add_statistics(
+                        stats, start_time, duration
+                    ):
+                        buckets[entity_id] = entity_buckets
+                        states_start_times[states_start].append(entity_id)
+                break
+        states_start_times[start_time] = [
+            entity_id for entity_id in entity_ids if entity_id not in buckets
+        ]
+    else:
+        states_start_times[start_time] = None
+
+    result = {}
+    for states_start, states_entity_ids in states_start_times.items():
+        if states_start >= end_time or states_entity_ids == []:
+            continue
+        for entity_id, states in stream_significant_states_with_session(
+            hass,
+            session,
+            states_start,
+            end_time,
+            states_entity_ids,
+            filters,
+            significant_changes_only=significant_changes_only,
+        ):
+            entity_buckets = buckets.get(entity_id)
+            for state in states:
+                if entity_buckets is None:
+                    if state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+                        result.setdefault(entity_id, []).append(state)
+                        continue
+                    if _state_as_float(state.state) is None:
+                        # Not a numeric entity, return all of its states
+                        result.setdefault(entity_id, []).append(state)
+                        result[entity_id].extend(states)
+                        break
+                    entity_buckets = buckets[entity_id] = _StateBuckets(
+                        start_ts, end_ts, width
+                    )
+                    result.pop(entity_id, None)
+                entity_buckets.add_state(
+                    state.last_updated_ts, _state_as_float(state.state)
+                )
+
+    for entity_id, entity_buckets in buckets.items():
+        result[entity_id] = entity_buckets.as_list()
+
+    if entity_ids is not None:
+        # Return the entities in the requested order
+        return {
+            entity_id: result[entity_id]
+            for entity_id in entity_ids
+            if entity_id in result
+        }
+    return result
+
+
+def _state_as_float(state):
+    """Return the state as a finite float or None."""
+    try:
+        value = float(state)
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+class _StateBuckets:
+    """Reduce the numeric states of an entity to min, mean and max buckets."""
+
+    def __init__(self, start_ts, end_ts, width):
+        """Initialize the buckets of the period start_ts - end_ts."""
+        self._start_ts = start_ts
+        self._end_ts = end_ts
+        self._width = width
+        # Bucket index -> [min, max, time weighted sum, duration]
+        self._buckets = {}
+        self._value = None
+        self._value_ts = None
+
+    def _bucket(self, timestamp):
+        """Return the bucket of a timestamp and its end."""
+        index = max(0, int((timestamp - self._start_ts) // self._width))
+        if (bucket := self._buckets.get(index)) is None:
+            bucket = self._buckets[index] = [math.inf, -math.inf, 0.0, 0.0]
+        return bucket, self._start_ts + (index + 1) * self._width
+
+    def _add_mean(self, from_ts, to_ts):
+        """Add the current value between from_ts and to_ts to the buckets."""
+        value = self._value
+        while from_ts < to_ts:
+            bucket, bucket_end_ts = self._bucket(from_ts)
+            until_ts = min(to_ts, bucket_end_ts)
+            bucket[0] = min(bucket[0], value)
+            bucket[1] = max(bucket[1], value)
+            bucket[2] += value * (until_ts - from_ts)
+            bucket[3] += until_ts - from_ts
+            from_ts = until_ts
+
+    def add_statistics(self, stats, start_time, duration):
+        """Add statistics, return the end of the last one.
+
+        Returns None if the statistics do not cover start_time.
+        """
+        stats = [
+            stat
+            for stat in stats
+            if stat["mean"] is not None and stat["start"] + duration > start_time
+        ]
+        if not stats or stats[0]["start"] > start_time:
+            return None
+
+        seconds = duration.total_seconds()
+        for stat in stats:
+            bucket, _ = self._bucket(stat["start"].timestamp())
+            bucket[0] = min(bucket[0], stat["min"])
+            bucket[1] = max(bucket[1], stat["max"])
+            bucket[2] += stat["mean"] * seconds
+            bucket[3] += seconds
+        return stats[-1]["start"] + duration
+
+    def add_state(self, timestamp, value):
+        """Add a state, a value of None starts a gap."""
+        if self._value is not None:
+            self._add_mean(self._value_ts, timestamp)
+        self._value = value
+        self._value_ts = timestamp
+        if value is not None:
+            bucket, _ = self._bucket(timestamp)
+            bucket[0] = min(bucket[0], value)
+            bucket[1] = max(bucket[1], value)
+
+    def as_list(self):
+        """Return the buckets until the end of the period."""
+        if self._value is not None:
+            self._add_mean(self._value_ts, self._end_ts)
+            self._value = None
+
+        result = []
+        for index in sorted(self._buckets):
+            min_, max_, weighted_sum, duration = self._buckets[index]
+            start = dt_util.utc_from_timestamp(self._start_ts + index * self._width)
+            result.append(
+                {
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(seconds=self._width)).isoformat(),
+                    "min": min_,
+                    "mean": weighted_sum / duration if duration else min_,
+                    "max": max_,
+                }
+            )
+        return result
+
+
+def _significant_states_baked_query(
+    hass, session, end_time, entity_ids, filters, significant_changes_only
+):
+    """Return the baked query of the significant states and the metadata ids."""
+    baked_query = hass.data[HISTORY_BAKERY](
+        lambda session: session.query(*QUERY_STATES)
+    )
+    baked_query += lambda q: q.outerjoin(
+        StateAttributes, States.attributes_id == StateAttributes.attributes_id
+    )
+
+    if significant_changes_only:
+        baked_query += lambda q: q.filter(
+            (
+                States.domain.in_(SIGNIFICANT_DOMAINS)
+                | (States.last_changed_ts == States.last_updated_ts)
+            )
+            & (States.last_updated_ts > bindparam("start_time_ts"))
+        )
+    else:
+        baked_query += lambda q: q.filter(
+            States.last_updated_ts > bindparam("start_time_ts")
+        )
+
+    metadata_ids = None
+    if entity_ids is not None:
+        metadata_ids = find_states_metadata_ids(session, entity_ids)
+        baked_query += lambda q: q.filter(
+            States.metadata_id.in_(bindparam("metadata_ids", expanding=True))
+        )
+    else:
+        baked_query += lambda q: q.filter(~States.domain.in_(IGNORE_DOMAINS))
+        if filters:
+            filters.bake(baked_query)
+
+    if end_time is not None:
+        baked_query += lambda q: q.filter(
+            States.last_updated_ts < bindparam("end_time_ts")
+        )
+
+    return baked_query, metadata_ids
+
+
 def state_changes_during_period(hass, start_time, end_time=None, entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
     with session_scope(hass=hass) as session:
         baked_query = hass.data[HISTORY_BAKERY](
             lambda session: session.query(*QUERY_STATES)
         )
+        baked_query += lambda q: q.outerjoin(
+            StateAttributes, States.attributes_id == StateAttributes.attributes_id
+        )
 
         baked_query += lambda q: q.filter(
-            (States.last_changed == States.last_updated)
-            & (States.last_updated > bindparam("start_time"))
+            (States.last_changed_ts == States.last_updated_ts)
+            & (States.last_updated_ts > bindparam("start_time_ts"))
         )
 
         if end_time is not None:
             baked_query += lambda q: q.filter(
-                States.last_updated < bindparam("end_time")
+                States.last_updated_ts < bindparam("end_time_ts")
             )
 
+        metadata_id = None
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
             entity_id = entity_id.lower()
-
-        baked_query += lambda q: q.order_by(States.entity_id, States.last_updated)
+            metadata_id = _find_states_metadata_id(session, entity_id)
+            baked_query += lambda q: q.filter(
+                States.metadata_id == bindparam("metadata_id")
+            )
+            baked_query += lambda q: q.order_by(States.last_updated_ts)
+        else:
+            baked_query += lambda q: q.order_by(
+                States.entity_id, States.last_updated_ts
+            )
 
         states = execute(
             baked_query(session).params(
-                start_time=start_time, end_time=end_time, entity_id=entity_id
+                start_time_ts=start_time.timestamp(),
+                end_time_ts=end_time.timestamp() if end_time is not None else None,
+                metadata_id=metadata_id,
             )
         )
 
@@ -180,21 +626,31 @@ def get_last_state_changes(hass, number_of_states, entity_id):
         baked_query = hass.data[HISTORY_BAKERY](
             lambda session: session.query(*QUERY_STATES)
         )
-        baked_query += lambda q: q.filter(States.last_changed == States.last_updated)
+        baked_query += lambda q: q.outerjoin(
+            StateAttributes, States.attributes_id == StateAttributes.attributes_id
+        )
+        baked_query += lambda q: q.filter(
+            States.last_changed_ts == States.last_updated_ts
+        )
 
+        metadata_id = None
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
             entity_id = entity_id.lower()
-
-        baked_query += lambda q: q.order_by(
-            States.entity_id, States.last_updated.desc()
-        )
+            metadata_id = _find_states_metadata_id(session, entity_id)
+            baked_query += lambda q: q.filter(
+                States.metadata_id == bindparam("metadata_id")
+            )
+            baked_query += lambda q: q.order_by(States.last_updated_ts.desc())
+        else:
+            baked_query += lambda q: q.order_by(
+                States.entity_id, States.last_updated_ts.desc()
+            )
 
         baked_query += lambda q: q.limit(bindparam("number_of_states"))
 
         states = execute(
             baked_query(session).params(
-                number_of_states=number_of_states, entity_id=entity_id
+                number_of_states=number_of_states, metadata_id=metadata_id
             )
         )
 
@@ -241,9 +697,14 @@ def _get_states_with_session(
         if run is None:
             return []
 
+    run_start_ts = process_timestamp(run.start).timestamp()
+    utc_point_in_time_ts = utc_point_in_time.timestamp()
+
     # We have more than one entity to look at so we need to do a query on states
     # since the last recorder run started.
-    query = session.query(*QUERY_STATES)
+    query = session.query(*QUERY_STATES).outerjoin(
+        StateAttributes, States.attributes_id == StateAttributes.attributes_id
+    )
 
     if entity_ids:
         # We got an include-list of entities, accelerate the query by filtering already
@@ -253,12 +714,14 @@ def _get_states_with_session(
                 func.max(States.state_id).label("max_state_id"),
             )
             .filter(
-                (States.last_updated >= run.start)
-                & (States.last_updated < utc_point_in_time)
+                (States.last_updated_ts >= run_start_ts)
+                & (States.last_updated_ts < utc_point_in_time_ts)
+            )
+            .filter(
+                States.metadata_id.in_(find_states_metadata_ids(session, entity_ids))
             )
-            .filter(States.entity_id.in_(entity_ids))
         )
-        most_recent_state_ids = most_recent_state_ids.group_by(States.entity_id)
+        most_recent_state_ids = most_recent_state_ids.group_by(States.metadata_id)
         most_recent_state_ids = most_recent_state_ids.subquery()
         query = query.join(
             most_recent_state_ids,
@@ -271,14 +734,14 @@ def _get_states_with_session(
         # not indexed and we can't control what's in the custom filter.
         most_recent_states_by_date = (
             session.query(
-                States.entity_id.label("max_entity_id"),
-                func.max(States.last_updated).label("max_last_updated"),
+                States.metadata_id.label("max_metadata_id"),
+                func.max(States.last_updated_ts).label("max_last_updated"),
             )
             .filter(
-                (States.last_updated >= run.start)
-                & (States.last_updated < utc_point_in_time)
+                (States.last_updated_ts >= run_start_ts)
+                & (States.last_updated_ts < utc_point_in_time_ts)
             )
-            .group_by(States.entity_id)
+            .group_by(States.metadata_id)
             .subquery()
         )
         most_recent_state_ids = (
@@ -286,12 +749,12 @@ def _get_states_with_session(
             .join(
                 most_recent_states_by_date,
                 and_(
-                    States.entity_id == most_recent_states_by_date.c.max_entity_id,
-                    States.last_updated
+                    States.metadata_id == most_recent_states_by_date.c.max_metadata_id,
+                    States.last_updated_ts
                     == most_recent_states_by_date.c.max_last_updated,
                 ),
             )
-            .group_by(States.entity_id)
+            .group_by(States.metadata_id)
             .subquery()
         )
         query = query.join(
@@ -301,6 +764,9 @@ def _get_states_with_session(
         query = query.filter(~States.domain.in_(IGNORE_DOMAINS))
         if filters:
             query = filters.apply(query)
+        # The inner queries group by the integer metadata_id, keep returning
+        # the states sorted by entity_id
+        query = query.order_by(States.entity_id)
 
     return [LazyState(row) for row in execute(query)]
 
@@ -308,23 +774,47 @@ def _get_states_with_session(
 def _get_single_entity_states_with_session(hass, session, utc_point_in_time, entity_id):
     # Use an entirely different (and extremely fast) query if we only
     # have a single entity id
+    if (metadata_id := _find_states_metadata_id(session, entity_id)) is None:
+        return []
     baked_query = hass.data[HISTORY_BAKERY](
         lambda session: session.query(*QUERY_STATES)
     )
+    baked_query += lambda q: q.outerjoin(
+        StateAttributes, States.attributes_id == StateAttributes.attributes_id
+    )
     baked_query += lambda q: q.filter(
-        States.last_updated < bindparam("utc_point_in_time"),
-        States.entity_id == bindparam("entity_id"),
+        States.last_updated_ts < bindparam("utc_point_in_time_ts"),
+        States.metadata_id == bindparam("metadata_id"),
     )
-    baked_query += lambda q: q.order_by(States.last_updated.desc())
+    baked_query += lambda q: q.order_by(States.last_updated_ts.desc())
     baked_query += lambda q: q.limit(1)
 
     query = baked_query(session).params(
-        utc_point_in_time=utc_point_in_time, entity_id=entity_id
+        utc_point_in_time_ts=utc_point_in_time.timestamp(), metadata_id=metadata_id
     )
 
     return [LazyState(row) for row in execute(query)]
 
 
+def _get_state_row_with_session(hass, session, state_id):
+    """Return the row of a single state."""
+    baked_query = hass.data[HISTORY_BAKERY](
+        lambda session: session.query(*QUERY_STATES)
+    )
+    baked_query += lambda q: q.outerjoin(
+        StateAttributes, States.attributes_id == StateAttributes.attributes_id
+    )
+    baked_query += lambda q: q.filter(States.state_id == bindparam("state_id"))
+    rows = execute(baked_query(session).params(state_id=state_id))
+    return rows[0] if rows else None
+
+
+def _find_states_metadata_id(session, entity_id):
+    """Return the states_meta id of a single entity id."""
+    metadata_ids = find_states_metadata_ids(session, (entity_id,))
+    return metadata_ids[0] if metadata_ids else None
+
+
 def _sorted_states_to_dict(
     hass,
     session,
@@ -367,53 +857,117 @@ def _sorted_states_to_dict(
         elapsed = time.perf_counter() - timer_start
         _LOGGER.debug("getting %d first datapoints took %fs", len(result), elapsed)
 
-    # Called in a tight loop so cache the function
-    # here
-    _process_timestamp_to_utc_isoformat = process_timestamp_to_utc_isoformat
-
     # Append all changes to it
     for ent_id, group in groupby(states, lambda state: state.entity_id):
-        domain = split_entity_id(ent_id)[0]
         ent_results = result[ent_id]
-        if not minimal_response or domain in NEED_ATTRIBUTE_DOMAINS:
-            ent_results.extend(LazyState(db_state) for db_state in group)
-
-        # With minimal response we only provide a native
-        # State for the first and last response. All the states
-        # in-between only provide the "state" and the
-        # "last_changed".
-        if not ent_results:
-            ent_results.append(LazyState(next(group)))
-
-        prev_state = ent_results[-1]
-        initial_state_count = len(ent_results)
-
-        for db_state in group:
-            # With minimal response we do not care about attribute
-            # changes so we can filter out duplicate states
-            if db_state.state == prev_state.state:
-                continue
-
-            ent_results.append(
-                {
-                    STATE_KEY: db_state.state,
-                    LAST_CHANGED_KEY: _process_timestamp_to_utc_isoformat(
-                        db_state.last_changed
-                    ),
-                }
+        ent_results.extend(
+            _stream_entity_states(
+                ent_id,
+                ent_results[-1] if ent_results else None,
+                group,
+                minimal_response,
             )
-            prev_state = db_state
-
-        if prev_state and len(ent_results) != initial_state_count:
-            # There was at least one state change
-            # replace the last minimal state with
-            # a full state
-            ent_results[-1] = LazyState(prev_state)
+        )
 
     # Filter out the empty lists if some states had 0 results.
     return {key: val for key, val in result.items() if val}
 
 
+def _stream_entity_states(entity_id, prev_state, db_states, minimal_response):
+    """Yield the states of an entity which follow prev_state.
+
+    With minimal response we only provide a native
+    State for the first and last response. All the states
+    in-between only provide the "state" and the
+    "last_changed".
+    """
+    if not minimal_response or split_entity_id(entity_id)[0] in NEED_ATTRIBUTE_DOMAINS:
+        for db_state in db_states:
+            yield LazyState(db_state)
+        return
+
+    if prev_state is None:
+        prev_state = LazyState(next(db_states))
+        yield prev_state
+
+    pending = None
+    for db_state in db_states:
+        # With minimal response we do not care about attribute
+        # changes so we can filter out duplicate states
+        if db_state.state == prev_state.state:
+            continue
+        if pending is not None:
+            yield _minimal_state(pending)
+        pending = prev_state = db_state
+
+    if pending is not None:
+        # There was at least one state change
+        # the last one is a full state
+        yield LazyState(pending)
+
+
+def compress_entity_states(
+    states, minimal_response=False, prev_state=None, prev_attributes_json=None
+):
+    """Return the states of an entity in the compressed columnar format.
+
+    The "s" and "lu" lists hold the state and the last_updated POSIX
+    timestamp of every state. Last changed and attributes are only sent
+    as [index, value] pairs in the "lc" and "a" lists for the states
+    where last_changed differs from last_updated and where the attributes
+    differ from the previous state.
+
+    With minimal response states which only changed attributes are
+    skipped and only the attributes of the first state are sent.
+
+    When the states continue states which have already been sent, pass
+    the state and the stored attributes of the last state sent as
+    prev_state and prev_attributes_json.
+    """
+    state_values = []
+    last_updated = []
+    last_changed = []
+    attributes = []
+    continues = prev_state is not None
+    prev_attributes = prev_attributes_json
+
+    for state in states:
+        if (
+            minimal_response
+            and (state_values or continues)
+            and state.state == prev_state
+        ):
+            continue
+        index = len(state_values)
+        state_values.append(prev_state := state.state)
+        last_updated.append(last_updated_ts := state.last_updated_ts)
+        if (last_changed_ts := state.last_changed_ts) != last_updated_ts:
+            last_changed.append([index, last_changed_ts])
+        if minimal_response and (index or continues):
+            continue
+        attributes_json = state.attributes_json
+        if (not index and not continues) or attributes_json != prev_attributes:
+            attributes.append([index, state.attributes])
+            prev_attributes = attributes_json
+
+    return {
+        COMPRESSED_STATE_KEY: state_values,
+        COMPRESSED_LAST_UPDATED_KEY: last_updated,
+        COMPRESSED_LAST_CHANGED_KEY: last_changed,
+        COMPRESSED_ATTRIBUTES_KEY: attributes,
+    }
+
+
+def _minimal_state(db_state):
+    """Return the state and last_changed of a row."""
+    return {
+        STATE_KEY: db_state.state,
+        LAST_CHANGED_KEY: dt_util.utc_from_timestamp(
+            db_state.last_changed_ts
+        ).isoformat(),
+    }
+
+
 def get_state(hass, utc_point_in_time, entity_id, run=None):
     """Return a state at a specific point in time."""
     states = get_states(hass, utc_point_in_time, (entity_id,), run)
@@ -0,0 +1,80 @@
+"""Track how fast the recorder is writing to the database."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+import threading
+from typing import Any
+
+# Upper bounds in seconds of the commit latency histogram buckets,
+# the last bucket collects every commit slower than the last bound.
+COMMIT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class RecorderMetrics:
+    """Write throughput and latency counters of the recorder.
+
+    The counters are updated from the recorder thread and read
+    from the event loop.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self._lock = threading.Lock()
+        self.commits = 0
+        self.commit_retries = 0
+        self.rows_committed = 0
+        self.last_commit_rows = 0
+        self.max_commit_rows = 0
+        self.last_commit_latency: float | None = None
+        self._commit_latency_buckets = [0] * (len(COMMIT_LATENCY_BUCKETS) + 1)
+        self._task_count: dict[str, int] = defaultdict(int)
+        self._task_time: dict[str, float] = defaultdict(float)
+
+    def record_commit(self, rows: int, latency: float) -> None:
+        """Record a successful commit of rows that took latency seconds."""
+        with self._lock:
+            self.commits += 1
+            self.rows_committed += rows
+            self.last_commit_rows = rows
+            self.max_commit_rows = max(self.max_commit_rows, rows)
+            self.last_commit_latency = latency
+            self._commit_latency_buckets[
+                bisect_left(COMMIT_LATENCY_BUCKETS, latency)
+            ] += 1
+
+    def record_commit_retry(self) -> None:
+        """Record a commit that has to be retried."""
+        with self._lock:
+            self.commit_retries += 1
+
+    def record_task(self, task_type: str, duration: float) -> None:
+        """Record the time spent running a recorder task."""
+        with self._lock:
+            self._task_count[task_type] += 1
+            self._task_time[task_type] += duration
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a JSON serializable dict."""
+        with self._lock:
+            return {
+                "commits": self.commits,
+                "commit_retries": self.commit_retries,
+                "rows_committed": self.rows_committed,
+                "last_commit_rows": self.last_commit_rows,
+                "max_commit_rows": self.max_commit_rows,
+                "last_commit_latency": self.last_commit_latency,
+                "commit_latency_histogram": [
+                    {"le": bound, "count": count}
+                    for bound, count in zip(
+                        (*COMMIT_LATENCY_BUCKETS, None), self._commit_latency_buckets
+                    )
+                ],
+                "tasks": {
+                    task_type: {
+                        "count": count,
+                        "time": self._task_time[task_type],
+                    }
+                    for task_type, count in self._task_count.items()
+                },
+            }
@@ -587,11 +587,141 @@ def _apply_update(instance, session, new_version, old_version):  # noqa: C901
     elif new_version == 23:
         # Add name column to StatisticsMeta
         _add_columns(session, "statistics_meta", ["name VARCHAR(255)"])
-
+    elif new_version == 24:
+        # The state_attributes table is created by create_all when
+        # the connection is set up, we only need to link states to it
+        _add_columns(connection, "states", ["attributes_id INTEGER"])
+        _create_index(connection, "states", "ix_states_attributes_id")
+    elif new_version == 25:
+        # The event_data table is created by create_all when
+        # the connection is set up, we only need to link events to it
+        _add_columns(connection, "events", ["data_id INTEGER"])
+        _create_index(connection, "events", "ix_events_data_id")
+    elif new_version == 26:
+        # The states_meta table is created by create_all when the connection
+        # is set up, fill it from the existing states and link them to it.
+        # The index on metadata_id is only created by version 27 together
+        # with the timestamp columns, building it here would be wasted work
+        # on large databases.
+        _add_columns(connection, "states", ["metadata_id INTEGER"])
+        connection.execute(
+            text(
+                "INSERT INTO states_meta (entity_id) "
+                "SELECT DISTINCT entity_id FROM states WHERE entity_id IS NOT NULL"
+            )
+        )
+        connection.execute(
+            text(
+                "UPDATE states SET metadata_id = (SELECT metadata_id FROM states_meta "
+                "WHERE states_meta.entity_id = states.entity_id)"
+            )
+        )
+        _drop_index(connection, "states", "ix_states_entity_id_last_updated")
+    elif new_version == 27:
+        # Store the datetime columns as seconds since the epoch as well, the
+        # queries filter and sort on these and the indexes on the datetime
+        # columns are replaced by indexes on the float columns.
+        _add_columns(connection, "events", ["time_fired_ts DOUBLE PRECISION"])
+        _add_columns(
+            connection,
+            "states",
+            ["last_changed_ts DOUBLE PRECISION", "last_updated_ts DOUBLE PRECISION"],
+        )
+        for table in ("statistics", "statistics_short_term"):
+            _add_columns(connection, table, ["start_ts DOUBLE PRECISION"])
+        _migrate_columns_to_timestamp(connection, engine)
+        _create_index(connection, "events", "ix_events_time_fired_ts")
+        _create_index(connection, "events", "ix_events_event_type_time_fired_ts")
+        _create_index(connection, "states", "ix_states_last_updated_ts")
+        _create_index(connection, "states", "ix_states_metadata_id_last_updated_ts")
+        _create_index(connection, "statistics", "ix_statistics_start_ts")
+        _create_index(connection, "statistics", "ix_statistics_statistic_id_start_ts")
+        _create_index(
+            connection, "statistics_short_term", "ix_statistics_short_term_start_ts"
+        )
+        _create_index(
+            connection,
+            "statistics_short_term",
+            "ix_statistics_short_term_statistic_id_start_ts",
+        )
+        _drop_index(connection, "events", "ix_events_time_fired")
+        _drop_index(connection, "events", "ix_events_event_type_time_fired")
+        _drop_index(connection, "states", "ix_states_last_updated")
+        _drop_index(connection, "states", "ix_states_metadata_id_last_updated")
+        _drop_index(connection, "statistics", "ix_statistics_start")
+        _drop_index(connection, "statistics", "ix_statistics_statistic_id_start")
+        _drop_index(
+            connection, "statistics_short_term", "ix_statistics_short_term_start"
+        )
+        _drop_index(
+            connection,
+            "statistics_short_term",
+            "ix_statistics_short_term_statistic_id_start",
+        )
     else:
         raise ValueError(f"No schema migration defined for version {new_version}")
 
 
+def _migrate_columns_to_timestamp(connection, engine):
+    """Fill the seconds since the epoch columns from the datetime columns."""
+    columns = (
+        ("events", "time_fired_ts", "time_fired"),
+        ("states", "last_changed_ts", "last_changed"),
+        ("states", "last_updated_ts", "last_updated"),
+        ("statistics", "start_ts", "start"),
+        ("statistics_short_term", "start_ts", "start"),
+    )
+    for table_name, ts_column, column in columns:
+        if engine.dialect.name == "sqlite":
+            # The datetimes are stored as text. The date functions of SQLite
+            # round to milliseconds, so the microseconds are read from the text.
+            to_timestamp = (
+                f"STRFTIME('%s', SUBSTR({column}, 1, 19)) "
+                f"+ CAST(SUBSTR({column}, 20) AS REAL)"
+            )
+        elif engine.dialect.name == "mysql":
+            # UNIX_TIMESTAMP depends on the time zone of the session, dividing
+            # by a DOUBLE avoids rounding to div_precision_increment decimals
+            to_timestamp = (
+                f"TIMESTAMPDIFF(MICROSECOND, '1970-01-01 00:00:00', {column}) " "/ 1E6"
+            )
+        elif engine.dialect.name == "postgresql":
+            to_timestamp = f"EXTRACT(EPOCH FROM {column})"
+        else:
+            _migrate_column_to_timestamp_in_python(
+                connection, table_name, ts_column, column
+            )
+            continue
+        connection.execute(
+            text(
+                f"UPDATE {table_name} SET {ts_column} = {to_timestamp} "
+                f"WHERE {ts_column} IS NULL AND {column} IS NOT NULL"
+            )
+        )
+
+
+def _migrate_column_to_timestamp_in_python(connection, table_name, ts_column, column):
+    """Fill a seconds since the epoch column on databases without epoch functions."""
+    table = Base.metadata.tables[table_name]
+    primary_key = list(table.primary_key.columns)[0]
+    rows = connection.execute(
+        sqlalchemy.select(primary_key, table.c[column]).where(
+            table.c[ts_column].is_(None) & table.c[column].isnot(None)
+        )
+    ).fetchall()
+    if not rows:
+        return
+    connection.execute(
+        table.update()
+        .where(primary_key == sqlalchemy.bindparam("row_id"))
+        .values({ts_column: sqlalchemy.bindparam("timestamp")}),
+        [
+            {"row_id": row_id, "timestamp": process_timestamp(value).timestamp()}
+            for row_id, value in rows
+        ],
+    )
+
+
 def _inspect_schema_version(engine, session):
     """Determine the schema version by inspecting the db structure.
 
@@ -605,7 +735,7 @@ def _inspect_schema_version(engine, session):
     indexes = inspector.get_indexes("events")
 
     for index in indexes:
-        if index["column_names"] == ["time_fired"]:
+        if index["column_names"] in (["time_fired"], ["time_fired_ts"]):
             # Schema addition from version 1 detected. New DB.
             session.add(StatisticsRuns(start=get_start_time()))
             session.add(SchemaChanges(schema_version=SCHEMA_VERSION))
@@ -6,7 +6,9 @@ import json
 import logging
 from typing import TypedDict, overload
 
+from fnvhash import fnv1a_32
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
@@ -40,14 +42,17 @@ import homeassistant.util.dt as dt_util
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 23
+SCHEMA_VERSION = 27
 
 _LOGGER = logging.getLogger(__name__)
 
 DB_TIMEZONE = "+00:00"
 
 TABLE_EVENTS = "events"
+TABLE_EVENT_DATA = "event_data"
 TABLE_STATES = "states"
+TABLE_STATE_ATTRIBUTES = "state_attributes"
+TABLE_STATES_META = "states_meta"
 TABLE_RECORDER_RUNS = "recorder_runs"
 TABLE_SCHEMA_CHANGES = "schema_changes"
 TABLE_STATISTICS = "statistics"
@@ -57,7 +62,10 @@ TABLE_STATISTICS_SHORT_TERM = "statistics_short_term"
 
 ALL_TABLES = [
     TABLE_STATES,
+    TABLE_STATE_ATTRIBUTES,
+    TABLE_STATES_META,
     TABLE_EVENTS,
+    TABLE_EVENT_DATA,
     TABLE_RECORDER_RUNS,
     TABLE_SCHEMA_CHANGES,
     TABLE_STATISTICS,
@@ -75,6 +83,9 @@ DOUBLE_TYPE = (
     .with_variant(oracle.DOUBLE_PRECISION(), "oracle")
     .with_variant(postgresql.DOUBLE_PRECISION(), "postgresql")
 )
+# Seconds since the epoch, filtering and sorting on these avoids parsing
+# the datetime columns which are stored as text on some databases
+TIMESTAMP_TYPE = DOUBLE_TYPE
 
 
 class Events(Base):  # type: ignore
@@ -83,7 +94,7 @@ class Events(Base):  # type: ignore
     __table_args__ = (
         # Used for fetching events at a specific time
         # see logbook
-        Index("ix_events_event_type_time_fired", "event_type", "time_fired"),
+        Index("ix_events_event_type_time_fired_ts", "event_type", "time_fired_ts"),
         {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
     )
     __tablename__ = TABLE_EVENTS
@@ -91,30 +102,38 @@ class Events(Base):  # type: ignore
     event_type = Column(String(MAX_LENGTH_EVENT_EVENT_TYPE))
     event_data = Column(Text().with_variant(mysql.LONGTEXT, "mysql"))
     origin = Column(String(MAX_LENGTH_EVENT_ORIGIN))
-    time_fired = Column(DATETIME_TYPE, index=True)
+    time_fired = Column(DATETIME_TYPE)
+    time_fired_ts = Column(TIMESTAMP_TYPE, index=True)
     created = Column(DATETIME_TYPE, default=dt_util.utcnow)
     context_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True)
     context_user_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True)
     context_parent_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True)
+    data_id = Column(Integer, ForeignKey("event_data.data_id"), index=True)
+    event_data_rel = relationship("EventData")
 
     def __repr__(self) -> str:
         """Return string representation of instance for debugging."""
         return (
             f"<recorder.Events("
             f"id={self.event_id}, type='{self.event_type}', data='{self.event_data}', "
+            f"data_id={self.data_id}, "
             f"origin='{self.origin}', time_fired='{self.time_fired}'"
             f")>"
         )
 
     @staticmethod
-    def from_event(event, event_data=None):
-        """Create an event database object from a native event."""
+    def from_event(event):
+        """Create an event database object from a native event.
+
+        The event data is not stored on the row, it is shared
+        with other rows in the event_data table.
+        """
         return Events(
             event_type=event.event_type,
-            event_data=event_data
-            or json.dumps(event.data, cls=JSONEncoder, separators=(",", ":")),
+            event_data=None,
             origin=str(event.origin.value),
             time_fired=event.time_fired,
+            time_fired_ts=event.time_fired.timestamp(),
             context_id=event.context.id,
             context_user_id=event.context.user_id,
             context_parent_id=event.context.parent_id,
@@ -122,6 +141,12 @@ class Events(Base):  # type: ignore
 
     def to_native(self, validate_entity_id=True):
         """Convert to a native HA Event."""
+        if self.event_data is not None:
+            data = self.event_data
+        elif self.event_data_rel is not None:
+            data = self.event_data_rel.shared_data
+        else:
+            data = "{}"
         context = Context(
             id=self.context_id,
             user_id=self.context_user_id,
@@ -130,7 +155,7 @@ class Events(Base):  # type: ignore
         try:
             return Event(
                 self.event_type,
-                json.loads(self.event_data),
+                json.loads(data),
                 EventOrigin(self.origin),
                 process_timestamp(self.time_fired),
                 context=context,
@@ -141,13 +166,63 @@ class Events(Base):  # type: ignore
             return None
 
 
+class EventData(Base):  # type: ignore
+    """Event data history."""
+
+    __table_args__ = (
+        {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
+    )
+    __tablename__ = TABLE_EVENT_DATA
+    data_id = Column(Integer, Identity(), primary_key=True)
+    hash = Column(BigInteger, index=True)
+    # Note that this is not named event_data to avoid confusion with the events table
+    shared_data = Column(Text().with_variant(mysql.LONGTEXT, "mysql"))
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.EventData("
+            f"id={self.data_id}, hash='{self.hash}', data='{self.shared_data}'"
+            f")>"
+        )
+
+    @staticmethod
+    def from_event(event):
+        """Create object from an event."""
+        shared_data = EventData.shared_data_from_event(event)
+        return EventData(
+            shared_data=shared_data, hash=EventData.hash_shared_data(shared_data)
+        )
+
+    @staticmethod
+    def shared_data_from_event(event) -> str:
+        """Create shared_data from an event."""
+        return json.dumps(event.data, cls=JSONEncoder, separators=(",", ":"))
+
+    @staticmethod
+    def hash_shared_data(shared_data: str) -> int:
+        """Return the hash of json encoded shared data."""
+        return fnv1a_32(shared_data.encode("utf-8"))
+
+    def to_native(self) -> dict:
+        """Convert to an event data dictionary."""
+        try:
+            return json.loads(self.shared_data)
+        except ValueError:
+            # When json.loads fails
+            _LOGGER.exception("Error converting row to event data: %s", self)
+            return {}
+
+
 class States(Base):  # type: ignore
     """State change history."""
 
     __table_args__ = (
         # Used for fetching the state of entities at a specific time
         # (get_states in history.py)
-        Index("ix_states_entity_id_last_updated", "entity_id", "last_updated"),
+        Index(
+            "ix_states_metadata_id_last_updated_ts", "metadata_id", "last_updated_ts"
+        ),
         {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
     )
     __tablename__ = TABLE_STATES
@@ -160,11 +235,18 @@ class States(Base):  # type: ignore
         Integer, ForeignKey("events.event_id", ondelete="CASCADE"), index=True
     )
     last_changed = Column(DATETIME_TYPE, default=dt_util.utcnow)
-    last_updated = Column(DATETIME_TYPE, default=dt_util.utcnow, index=True)
+    last_changed_ts = Column(TIMESTAMP_TYPE)
+    last_updated = Column(DATETIME_TYPE, default=dt_util.utcnow)
+    last_updated_ts = Column(TIMESTAMP_TYPE, index=True)
     created = Column(DATETIME_TYPE, default=dt_util.utcnow)
     old_state_id = Column(Integer, ForeignKey("states.state_id"), index=True)
+    attributes_id = Column(
+        Integer, ForeignKey("state_attributes.attributes_id"), index=True
+    )
+    metadata_id = Column(Integer, ForeignKey("states_meta.metadata_id"))
     event = relationship("Events", uselist=False)
     old_state = relationship("States", remote_side=[state_id])
+    state_attributes = relationship("StateAttributes")
 
     def __repr__(self) -> str:
         """Return string representation of instance for debugging."""
@@ -173,43 +255,54 @@ class States(Base):  # type: ignore
             f"id={self.state_id}, domain='{self.domain}', entity_id='{self.entity_id}', "
             f"state='{self.state}', event_id='{self.event_id}', "
             f"last_updated='{self.last_updated.isoformat(sep=' ', timespec='seconds')}', "
-            f"old_state_id={self.old_state_id}"
+            f"old_state_id={self.old_state_id}, metadata_id={self.metadata_id}"
             f")>"
         )
 
     @staticmethod
     def from_event(event):
-        """Create object from a state_changed event."""
+        """Create object from a state_changed event.
+
+        The attributes are not stored on the row, they are
+        shared with other rows in the state_attributes table.
+        """
         entity_id = event.data["entity_id"]
         state = event.data.get("new_state")
 
-        dbstate = States(entity_id=entity_id)
+        dbstate = States(entity_id=entity_id, attributes=None)
 
         # State got deleted
         if state is None:
             dbstate.state = ""
             dbstate.domain = split_entity_id(entity_id)[0]
-            dbstate.attributes = "{}"
             dbstate.last_changed = event.time_fired
             dbstate.last_updated = event.time_fired
+            dbstate.last_changed_ts = (
+                dbstate.last_updated_ts
+            ) = event.time_fired.timestamp()
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(
-                dict(state.attributes), cls=JSONEncoder, separators=(",", ":")
-            )
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
+            dbstate.last_changed_ts = state.last_changed.timestamp()
+            dbstate.last_updated_ts = state.last_updated.timestamp()
 
         return dbstate
 
     def to_native(self, validate_entity_id=True):
         """Convert to an HA state object."""
+        if self.attributes is not None:
+            attrs = self.attributes
+        elif self.state_attributes is not None:
+            attrs = self.state_attributes.shared_attrs
+        else:
+            attrs = "{}"
         try:
             return State(
                 self.entity_id,
                 self.state,
-                json.loads(self.attributes),
+                json.loads(attrs),
                 process_timestamp(self.last_changed),
                 process_timestamp(self.last_updated),
                 # Join the events table on event_id to get the context instead
@@ -223,6 +316,79 @@ class States(Base):  # type: ignore
             return None
 
 
+class StateAttributes(Base):  # type: ignore
+    """State attribute change history."""
+
+    __table_args__ = (
+        {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
+    )
+    __tablename__ = TABLE_STATE_ATTRIBUTES
+    attributes_id = Column(Integer, Identity(), primary_key=True)
+    hash = Column(BigInteger, index=True)
+    # Note that this is not named attributes to avoid confusion with the states table
+    shared_attrs = Column(Text().with_variant(mysql.LONGTEXT, "mysql"))
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.StateAttributes("
+            f"id={self.attributes_id}, hash='{self.hash}', attributes='{self.shared_attrs}'"
+            f")>"
+        )
+
+    @staticmethod
+    def from_event(event):
+        """Create object from a state_changed event."""
+        shared_attrs = StateAttributes.shared_attrs_from_event(event)
+        return StateAttributes(
+            shared_attrs=shared_attrs,
+            hash=StateAttributes.hash_shared_attrs(shared_attrs),
+        )
+
+    @staticmethod
+    def shared_attrs_from_event(event) -> str:
+        """Create shared_attrs from a state_changed event."""
+        # None state means the state was removed from the state machine
+        if (state := event.data.get("new_state")) is None:
+            return "{}"
+        return json.dumps(
+            dict(state.attributes), cls=JSONEncoder, separators=(",", ":")
+        )
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs: str) -> int:
+        """Return the hash of json encoded shared attributes."""
+        return fnv1a_32(shared_attrs.encode("utf-8"))
+
+    def to_native(self) -> dict:
+        """Convert to a state attributes dictionary."""
+        try:
+            return json.loads(self.shared_attrs)
+        except ValueError:
+            # When json.loads fails
+            _LOGGER.exception("Error converting row to state attributes: %s", self)
+            return {}
+
+
+class StatesMeta(Base):  # type: ignore
+    """Integer keys for the entity ids of the states table."""
+
+    __table_args__ = (
+        {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
+    )
+    __tablename__ = TABLE_STATES_META
+    metadata_id = Column(Integer, Identity(), primary_key=True)
+    entity_id = Column(String(MAX_LENGTH_STATE_ENTITY_ID), index=True, unique=True)
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.StatesMeta("
+            f"id={self.metadata_id}, entity_id='{self.entity_id}'"
+            f")>"
+        )
+
+
 class StatisticResult(TypedDict):
     """Statistic result data class.
 
@@ -265,7 +431,8 @@ class StatisticsBase:
             index=True,
         )
 
-    start = Column(DATETIME_TYPE, index=True)
+    start = Column(DATETIME_TYPE)
+    start_ts = Column(TIMESTAMP_TYPE, index=True)
     mean = Column(DOUBLE_TYPE)
     min = Column(DOUBLE_TYPE)
     max = Column(DOUBLE_TYPE)
@@ -278,6 +445,7 @@ class StatisticsBase:
         """Create object from a statistics."""
         return cls(  # type: ignore
             metadata_id=metadata_id,
+            start_ts=stats["start"].timestamp(),
             **stats,
         )
 
@@ -289,7 +457,7 @@ class Statistics(Base, StatisticsBase):  # type: ignore
 
     __table_args__ = (
         # Used for fetching statistics for a certain entity at a specific time
-        Index("ix_statistics_statistic_id_start", "metadata_id", "start"),
+        Index("ix_statistics_statistic_id_start_ts", "metadata_id", "start_ts"),
     )
     __tablename__ = TABLE_STATISTICS
 
@@ -301,7 +469,9 @@ class StatisticsShortTerm(Base, StatisticsBase):  # type: ignore
 
     __table_args__ = (
         # Used for fetching statistics for a certain entity at a specific time
-        Index("ix_statistics_short_term_statistic_id_start", "metadata_id", "start"),
+        Index(
+            "ix_statistics_short_term_statistic_id_start_ts", "metadata_id", "start_ts"
+        ),
     )
     __tablename__ = TABLE_STATISTICS_SHORT_TERM
 
@@ -373,13 +543,15 @@ class RecorderRuns(Base):  # type: ignore
         assert session is not None, "RecorderRuns need to be persisted"
 
         query = session.query(distinct(States.entity_id)).filter(
-            States.last_updated >= self.start
+            States.last_updated_ts >= process_timestamp(self.start).timestamp()
         )
 
         if point_in_time is not None:
-            query = query.filter(States.last_updated < point_in_time)
+            query = query.filter(States.last_updated_ts < point_in_time.timestamp())
         elif self.end is not None:
-            query = query.filter(States.last_updated < self.end)
+            query = query.filter(
+                States.last_updated_ts < process_timestamp(self.end).timestamp()
+            )
 
         return [row[0] for row in query]
 
@@ -491,7 +663,9 @@ class LazyState(State):
         """State attributes."""
         if not self._attributes:
             try:
-                self._attributes = json.loads(self._row.attributes)
+                self._attributes = json.loads(
+                    self._row.shared_attrs or self._row.attributes or "{}"
+                )
             except ValueError:
                 # When json.loads fails
                 _LOGGER.exception("Error converting row to state: %s", self._row)
@@ -503,6 +677,11 @@ class LazyState(State):
         """Set attributes."""
         self._attributes = value
 
+    @property
+    def attributes_json(self):
+        """State attributes as stored in the database."""
+        return self._row.shared_attrs or self._row.attributes
+
     @property  # type: ignore
     def context(self):
         """State context."""
@@ -519,7 +698,7 @@ class LazyState(State):
     def last_changed(self):
         """Last changed datetime."""
         if not self._last_changed:
-            self._last_changed = process_timestamp(self._row.last_changed)
+            self._last_changed = dt_util.utc_from_timestamp(self._row.last_changed_ts)
         return self._last_changed
 
     @last_changed.setter
@@ -531,7 +710,7 @@ class LazyState(State):
     def last_updated(self):
         """Last updated datetime."""
         if not self._last_updated:
-            self._last_updated = process_timestamp(self._row.last_updated)
+            self._last_updated = dt_util.utc_from_timestamp(self._row.last_updated_ts)
         return self._last_updated
 
     @last_updated.setter
@@ -539,6 +718,20 @@ class LazyState(State):
         """Set last updated datetime."""
         self._last_updated = value
 
+    @property
+    def last_changed_ts(self):
+        """Last changed POSIX timestamp."""
+        if self._last_changed:
+            return self._last_changed.timestamp()
+        return self._row.last_changed_ts
+
+    @property
+    def last_updated_ts(self):
+        """Last updated POSIX timestamp."""
+        if self._last_updated:
+            return self._last_updated.timestamp()
+        return self._row.last_updated_ts
+
     def as_dict(self):
         """Return a dict representation of the LazyState.
 
@@ -546,24 +739,12 @@ class LazyState(State):
 
         To be used for JSON serialization.
         """
-        if self._last_changed:
-            last_changed_isoformat = self._last_changed.isoformat()
-        else:
-            last_changed_isoformat = process_timestamp_to_utc_isoformat(
-                self._row.last_changed
-            )
-        if self._last_updated:
-            last_updated_isoformat = self._last_updated.isoformat()
-        else:
-            last_updated_isoformat = process_timestamp_to_utc_isoformat(
-                self._row.last_updated
-            )
         return {
             "entity_id": self.entity_id,
             "state": self.state,
             "attributes": self._attributes or self.attributes,
-            "last_changed": last_changed_isoformat,
-            "last_updated": last_updated_isoformat,
+            "last_changed": self.last_changed.isoformat(),
+            "last_updated": self.last_updated.isoformat(),
         }
 
     def __eq__(self, other):
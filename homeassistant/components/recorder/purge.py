@@ -1,7 +1,7 @@
 """Purge old data helper."""
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from datetime import datetime
 import logging
 from typing import TYPE_CHECKING
@@ -11,7 +11,16 @@ from sqlalchemy.orm.session import Session
 from sqlalchemy.sql.expression import distinct
 
 from .const import MAX_ROWS_TO_PURGE
-from .models import Events, RecorderRuns, States, StatisticsRuns, StatisticsShortTerm
+from .models import (
+    EventData,
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatesMeta,
+    StatisticsRuns,
+    StatisticsShortTerm,
+)
 from .repack import repack_database
 from .util import retryable_database_job, session_scope
 
@@ -36,8 +45,14 @@ def purge_old_data(
 
     with session_scope(session=instance.get_session()) as session:  # type: ignore
         # Purge a max of MAX_ROWS_TO_PURGE, based on the oldest states or events record
-        event_ids = _select_event_ids_to_purge(session, purge_before)
-        state_ids = _select_state_ids_to_purge(session, purge_before, event_ids)
+        event_ids, data_ids = _select_event_and_data_ids_to_purge(session, purge_before)
+        (
+            state_ids,
+            attributes_ids,
+            metadata_ids,
+        ) = _select_state_attributes_and_metadata_ids_to_purge(
+            session, purge_before, event_ids
+        )
         statistics_runs = _select_statistics_runs_to_purge(session, purge_before)
         short_term_statistics = _select_short_term_statistics_to_purge(
             session, purge_before
@@ -46,9 +61,22 @@ def purge_old_data(
         if state_ids:
             _purge_state_ids(instance, session, state_ids)
 
+        if unused_attribute_ids_set := _select_unused_attributes_ids(
+            session, attributes_ids
+        ):
+            _purge_attributes_ids(instance, session, unused_attribute_ids_set)
+
+        if unused_metadata_ids_set := _select_unused_states_meta_ids(
+            session, metadata_ids
+        ):
+            _purge_states_meta_ids(instance, session, unused_metadata_ids_set)
+
         if event_ids:
             _purge_event_ids(session, event_ids)
 
+        if unused_data_ids_set := _select_unused_event_data_ids(session, data_ids):
+            _purge_event_data_ids(instance, session, unused_data_ids_set)
+
         if statistics_runs:
             _purge_statistics_runs(session, statistics_runs)
 
@@ -70,32 +98,101 @@ def purge_old_data(
     return True
 
 
-def _select_event_ids_to_purge(session: Session, purge_before: datetime) -> list[int]:
-    """Return a list of event ids to purge."""
+def _select_event_and_data_ids_to_purge(
+    session: Session, purge_before: datetime
+) -> tuple[list[int], set[int]]:
+    """Return a list of event ids and a set of event data ids to purge."""
     events = (
-        session.query(Events.event_id)
-        .filter(Events.time_fired < purge_before)
+        session.query(Events.event_id, Events.data_id)
+        .filter(Events.time_fired_ts < purge_before.timestamp())
         .limit(MAX_ROWS_TO_PURGE)
         .all()
     )
     _LOGGER.debug("Selected %s event ids to remove", len(events))
-    return [event.event_id for event in events]
+    event_ids = []
+    data_ids = set()
+    for event in events:
+        event_ids.append(event.event_id)
+        if event.data_id:
+            data_ids.add(event.data_id)
+    return event_ids, data_ids
 
 
-def _select_state_ids_to_purge(
+def _select_state_attributes_and_metadata_ids_to_purge(
     session: Session, purge_before: datetime, event_ids: list[int]
-) -> set[int]:
-    """Return a list of state ids to purge."""
+) -> tuple[set[int], set[int], set[int]]:
+    """Return a set of state ids, attributes ids and states meta ids to purge."""
     if not event_ids:
-        return set()
+        return set(), set(), set()
     states = (
-        session.query(States.state_id)
-        .filter(States.last_updated < purge_before)
+        session.query(States.state_id, States.attributes_id, States.metadata_id)
+        .filter(States.last_updated_ts < purge_before.timestamp())
         .filter(States.event_id.in_(event_ids))
         .all()
     )
     _LOGGER.debug("Selected %s state ids to remove", len(states))
-    return {state.state_id for state in states}
+    state_ids = set()
+    attributes_ids = set()
+    metadata_ids = set()
+    for state in states:
+        state_ids.add(state.state_id)
+        if state.attributes_id:
+            attributes_ids.add(state.attributes_id)
+        if state.metadata_id:
+            metadata_ids.add(state.metadata_id)
+    return state_ids, attributes_ids, metadata_ids
+
+
+def _select_unused_attributes_ids(
+    session: Session, attributes_ids: set[int]
+) -> set[int]:
+    """Return a set of attributes ids that are no longer used by any state."""
+    if not attributes_ids:
+        return set()
+    seen_ids = {
+        state[0]
+        for state in session.query(distinct(States.attributes_id))
+        .filter(States.attributes_id.in_(attributes_ids))
+        .all()
+    }
+    to_remove = attributes_ids - seen_ids
+    _LOGGER.debug(
+        "Selected %s shared attributes to remove",
+        len(to_remove),
+    )
+    return to_remove
+
+
+def _select_unused_states_meta_ids(
+    session: Session, metadata_ids: set[int]
+) -> set[int]:
+    """Return a set of states meta ids that are no longer used by any state."""
+    if not metadata_ids:
+        return set()
+    seen_ids = {
+        state[0]
+        for state in session.query(distinct(States.metadata_id))
+        .filter(States.metadata_id.in_(metadata_ids))
+        .all()
+    }
+    to_remove = metadata_ids - seen_ids
+    _LOGGER.debug("Selected %s states meta to remove", len(to_remove))
+    return to_remove
+
+
+def _select_unused_event_data_ids(session: Session, data_ids: set[int]) -> set[int]:
+    """Return a set of event data ids that are no longer used by any event."""
+    if not data_ids:
+        return set()
+    seen_ids = {
+        event[0]
+        for event in session.query(distinct(Events.data_id))
+        .filter(Events.data_id.in_(data_ids))
+        .all()
+    }
+    to_remove = data_ids - seen_ids
+    _LOGGER.debug("Selected %s shared event data to remove", len(to_remove))
+    return to_remove
 
 
 def _select_statistics_runs_to_purge(
@@ -125,7 +222,7 @@ def _select_short_term_statistics_to_purge(
     """Return a list of short term statistics to purge."""
     statistics = (
         session.query(StatisticsShortTerm.id)
-        .filter(StatisticsShortTerm.start < purge_before)
+        .filter(StatisticsShortTerm.start_ts < purge_before.timestamp())
         .limit(MAX_ROWS_TO_PURGE)
         .all()
     )
@@ -175,6 +272,73 @@ def _evict_purged_states_from_old_states_cache(
         old_states.pop(old_state_reversed[purged_state_id], None)
 
 
+def _evict_purged_attributes_from_attributes_cache(
+    instance: Recorder, purged_attributes_ids: set[int]
+) -> None:
+    """Evict purged attribute ids from the attribute ids cache."""
+    # Make a map from attributes_id to the attributes json
+    state_attributes_ids = (
+        instance._state_attributes_ids  # pylint: disable=protected-access
+    )
+    state_attributes_ids_reversed = {
+        attributes_id: attributes
+        for attributes, attributes_id in state_attributes_ids.items()
+    }
+
+    # Evict any purged attributes from the state attributes id cache
+    for purged_attribute_id in purged_attributes_ids.intersection(
+        state_attributes_ids_reversed
+    ):
+        state_attributes_ids.pop(
+            state_attributes_ids_reversed[purged_attribute_id], None
+        )
+
+
+def _purge_attributes_ids(
+    instance: Recorder, session: Session, attributes_ids: set[int]
+) -> None:
+    """Delete old attributes ids."""
+    deleted_rows = (
+        session.query(StateAttributes)
+        .filter(StateAttributes.attributes_id.in_(attributes_ids))
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s attribute states", deleted_rows)
+
+    # Evict any entries in the state_attributes_ids cache referring to a purged state
+    _evict_purged_attributes_from_attributes_cache(instance, attributes_ids)
+
+
+def _evict_purged_data_from_data_cache(
+    instance: Recorder, purged_data_ids: set[int]
+) -> None:
+    """Evict purged data ids from the data ids cache."""
+    # Make a map from data_id to the data json
+    event_data_ids = instance._event_data_ids  # pylint: disable=protected-access
+    event_data_ids_reversed = {
+        data_id: data for data, data_id in event_data_ids.items()
+    }
+
+    # Evict any purged data from the event data id cache
+    for purged_data_id in purged_data_ids.intersection(event_data_ids_reversed):
+        event_data_ids.pop(event_data_ids_reversed[purged_data_id], None)
+
+
+def _purge_event_data_ids(
+    instance: Recorder, session: Session, data_ids: set[int]
+) -> None:
+    """Delete old event data ids."""
+    deleted_rows = (
+        session.query(EventData)
+        .filter(EventData.data_id.in_(data_ids))
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s data events", deleted_rows)
+
+    # Evict any entries in the event_data_ids cache referring to a purged event
+    _evict_purged_data_from_data_cache(instance, data_ids)
+
+
 def _purge_statistics_runs(session: Session, statistics_runs: list[int]) -> None:
     """Delete by run_id."""
     deleted_rows = (
@@ -226,13 +390,15 @@ def _purge_filtered_data(instance: Recorder, session: Session) -> bool:
     _LOGGER.debug("Cleanup filtered data")
 
     # Check if excluded entity_ids are in database
-    excluded_entity_ids: list[str] = [
-        entity_id
-        for (entity_id,) in session.query(distinct(States.entity_id)).all()
+    excluded_metadata_ids: list[int] = [
+        metadata_id
+        for (metadata_id, entity_id) in session.query(
+            StatesMeta.metadata_id, StatesMeta.entity_id
+        ).all()
         if not instance.entity_filter(entity_id)
     ]
-    if len(excluded_entity_ids) > 0:
-        _purge_filtered_states(instance, session, excluded_entity_ids)
+    if len(excluded_metadata_ids) > 0:
+        _purge_filtered_states(instance, session, excluded_metadata_ids)
         return False
 
     # Check if excluded event_types are in database
@@ -249,25 +415,37 @@ def _purge_filtered_data(instance: Recorder, session: Session) -> bool:
 
 
 def _purge_filtered_states(
-    instance: Recorder, session: Session, excluded_entity_ids: list[str]
+    instance: Recorder, session: Session, excluded_metadata_ids: list[int]
 ) -> None:
-    """Remove filtered states and linked events."""
+    """Remove filtered states and linked events.
+
+    Once all states of the entities are gone, their states_meta rows are
+    removed as well.
+    """
     state_ids: list[int]
+    attributes_ids: list[int | None]
     event_ids: list[int | None]
-    state_ids, event_ids = zip(
-        *(
-            session.query(States.state_id, States.event_id)
-            .filter(States.entity_id.in_(excluded_entity_ids))
-            .limit(MAX_ROWS_TO_PURGE)
-            .all()
-        )
+    states = (
+        session.query(States.state_id, States.attributes_id, States.event_id)
+        .filter(States.metadata_id.in_(excluded_metadata_ids))
+        .limit(MAX_ROWS_TO_PURGE)
+        .all()
     )
+    if not states:
+        _purge_states_meta_ids(instance, session, excluded_metadata_ids)
+        return
+    state_ids, attributes_ids, event_ids = zip(*states)
     event_ids = [id_ for id_ in event_ids if id_ is not None]
+    attributes_ids_set = {id_ for id_ in attributes_ids if id_ is not None}
     _LOGGER.debug(
         "Selected %s state_ids to remove that should be filtered", len(state_ids)
     )
     _purge_state_ids(instance, session, set(state_ids))
     _purge_event_ids(session, event_ids)  # type: ignore  # type of event_ids already narrowed to 'list[int]'
+    if unused_attribute_ids_set := _select_unused_attributes_ids(
+        session, attributes_ids_set
+    ):
+        _purge_attributes_ids(instance, session, unused_attribute_ids_set)
 
 
 def _purge_filtered_events(
@@ -275,36 +453,73 @@ def _purge_filtered_events(
 ) -> None:
     """Remove filtered events and linked states."""
     events: list[Events] = (
-        session.query(Events.event_id)
+        session.query(Events.event_id, Events.data_id)
         .filter(Events.event_type.in_(excluded_event_types))
         .limit(MAX_ROWS_TO_PURGE)
         .all()
     )
     event_ids: list[int] = [event.event_id for event in events]
+    data_ids: set[int] = {event.data_id for event in events if event.data_id}
     _LOGGER.debug(
         "Selected %s event_ids to remove that should be filtered", len(event_ids)
     )
     states: list[States] = (
-        session.query(States.state_id).filter(States.event_id.in_(event_ids)).all()
+        session.query(States.state_id, States.attributes_id)
+        .filter(States.event_id.in_(event_ids))
+        .all()
     )
     state_ids: set[int] = {state.state_id for state in states}
+    attributes_ids: set[int] = {
+        state.attributes_id for state in states if state.attributes_id
+    }
     _purge_state_ids(instance, session, state_ids)
     _purge_event_ids(session, event_ids)
+    if unused_attribute_ids_set := _select_unused_attributes_ids(
+        session, attributes_ids
+    ):
+        _purge_attributes_ids(instance, session, unused_attribute_ids_set)
+    if unused_data_ids_set := _select_unused_event_data_ids(session, data_ids):
+        _purge_event_data_ids(instance, session, unused_data_ids_set)
+
+
+def _purge_states_meta_ids(
+    instance: Recorder, session: Session, metadata_ids: Iterable[int]
+) -> None:
+    """Delete states_meta rows and evict them from the recorder cache."""
+    deleted_rows = (
+        session.query(StatesMeta)
+        .filter(StatesMeta.metadata_id.in_(metadata_ids))
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s states meta", deleted_rows)
+
+    # Evict the purged metadata ids from the states meta id cache
+    metadata_ids_set = set(metadata_ids)
+    states_meta_ids = instance._states_meta_ids  # pylint: disable=protected-access
+    for entity_id in [
+        entity_id
+        for entity_id, metadata_id in states_meta_ids.items()
+        if metadata_id in metadata_ids_set
+    ]:
+        states_meta_ids.pop(entity_id, None)
 
 
 @retryable_database_job("purge")
 def purge_entity_data(instance: Recorder, entity_filter: Callable[[str], bool]) -> bool:
     """Purge states and events of specified entities."""
     with session_scope(session=instance.get_session()) as session:  # type: ignore
-        selected_entity_ids: list[str] = [
-            entity_id
-            for (entity_id,) in session.query(distinct(States.entity_id)).all()
-            if entity_filter(entity_id)
-        ]
+        selected_entity_ids: list[str] = []
+        selected_metadata_ids: list[int] = []
+        for metadata_id, entity_id in session.query(
+            StatesMeta.metadata_id, StatesMeta.entity_id
+        ).all():
+            if entity_filter(entity_id):
+                selected_entity_ids.append(entity_id)
+                selected_metadata_ids.append(metadata_id)
         _LOGGER.debug("Purging entity data for %s", selected_entity_ids)
-        if len(selected_entity_ids) > 0:
+        if len(selected_metadata_ids) > 0:
             # Purge a max of MAX_ROWS_TO_PURGE, based on the oldest states or events record
-            _purge_filtered_states(instance, session, selected_entity_ids)
+            _purge_filtered_states(instance, session, selected_metadata_ids)
             _LOGGER.debug("Purging entity data hasn't fully completed yet")
             return False
 
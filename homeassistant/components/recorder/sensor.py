@@ -0,0 +1,113 @@
+"""Sensors reporting the write throughput of the recorder."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import TIME_MILLISECONDS
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType, StateType
+
+from .const import DATA_INSTANCE
+
+if TYPE_CHECKING:
+    from . import Recorder
+
+
+def _commit_latency(instance: Recorder) -> StateType:
+    """Return the latency of the last commit in milliseconds."""
+    if (latency := instance.metrics.last_commit_latency) is None:
+        return None
+    return round(latency * 1000, 1)
+
+
+@dataclass
+class RecorderSensorEntityDescriptionMixin:
+    """Mixin for required keys."""
+
+    value_fn: Callable[[Recorder], StateType]
+
+
+@dataclass
+class RecorderSensorEntityDescription(
+    SensorEntityDescription, RecorderSensorEntityDescriptionMixin
+):
+    """Describes a recorder sensor entity."""
+
+
+SENSORS: tuple[RecorderSensorEntityDescription, ...] = (
+    RecorderSensorEntityDescription(
+        key="queue_backlog",
+        name="Recorder queue backlog",
+        icon="mdi:tray-full",
+        native_unit_of_measurement="events",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda instance: instance.queue.qsize(),
+    ),
+    RecorderSensorEntityDescription(
+        key="commit_latency",
+        name="Recorder commit latency",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=TIME_MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_commit_latency,
+    ),
+    RecorderSensorEntityDescription(
+        key="rows_per_commit",
+        name="Recorder rows per commit",
+        icon="mdi:table-row-plus-after",
+        native_unit_of_measurement="rows",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda instance: instance.metrics.last_commit_rows,
+    ),
+    RecorderSensorEntityDescription(
+        key="commit_retries",
+        name="Recorder commit retries",
+        icon="mdi:database-refresh",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda instance: instance.metrics.commit_retries,
+    ),
+)
+
+
+async def async_setup_platform(
+    hass: HomeAssistant,
+    config: ConfigType,
+    async_add_entities: AddEntitiesCallback,
+    discovery_info: DiscoveryInfoType | None = None,
+) -> None:
+    """Set up the recorder sensors."""
+    if discovery_info is None:
+        return
+
+    instance: Recorder = hass.data[DATA_INSTANCE]
+    async_add_entities(RecorderSensor(instance, description) for description in SENSORS)
+
+
+class RecorderSensor(SensorEntity):
+    """Representation of a recorder throughput sensor."""
+
+    entity_description: RecorderSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self, instance: Recorder, description: RecorderSensorEntityDescription
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._instance = instance
+        self._attr_unique_id = description.key
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the current value of the metric."""
+        return self.entity_description.value_fn(self._instance)
@@ -51,7 +51,7 @@ if TYPE_CHECKING:
 
 QUERY_STATISTICS = [
     Statistics.metadata_id,
-    Statistics.start,
+    Statistics.start_ts,
     Statistics.mean,
     Statistics.min,
     Statistics.max,
@@ -62,7 +62,7 @@ QUERY_STATISTICS = [
 
 QUERY_STATISTICS_SHORT_TERM = [
     StatisticsShortTerm.metadata_id,
-    StatisticsShortTerm.start,
+    StatisticsShortTerm.start_ts,
     StatisticsShortTerm.mean,
     StatisticsShortTerm.min,
     StatisticsShortTerm.max,
@@ -80,14 +80,14 @@ QUERY_STATISTICS_SUMMARY_MEAN = [
 
 QUERY_STATISTICS_SUMMARY_SUM = [
     StatisticsShortTerm.metadata_id,
-    StatisticsShortTerm.start,
+    StatisticsShortTerm.start_ts,
     StatisticsShortTerm.last_reset,
     StatisticsShortTerm.state,
     StatisticsShortTerm.sum,
     func.row_number()
     .over(
         partition_by=StatisticsShortTerm.metadata_id,
-        order_by=StatisticsShortTerm.start.desc(),
+        order_by=StatisticsShortTerm.start_ts.desc(),
     )
     .label("rownum"),
 ]
@@ -281,14 +281,18 @@ def compile_hourly_statistics(
     )
 
     baked_query += lambda q: q.filter(
-        StatisticsShortTerm.start >= bindparam("start_time")
+        StatisticsShortTerm.start_ts >= bindparam("start_time_ts")
+    )
+    baked_query += lambda q: q.filter(
+        StatisticsShortTerm.start_ts < bindparam("end_time_ts")
     )
-    baked_query += lambda q: q.filter(StatisticsShortTerm.start < bindparam("end_time"))
     baked_query += lambda q: q.group_by(StatisticsShortTerm.metadata_id)
     baked_query += lambda q: q.order_by(StatisticsShortTerm.metadata_id)
 
     stats = execute(
-        baked_query(session).params(start_time=start_time, end_time=end_time)
+        baked_query(session).params(
+            start_time_ts=start_time.timestamp(), end_time_ts=end_time.timestamp()
+        )
     )
 
     if stats:
@@ -305,8 +309,8 @@ def compile_hourly_statistics(
     if instance._db_supports_row_number:  # pylint: disable=[protected-access]
         subquery = (
             session.query(*QUERY_STATISTICS_SUMMARY_SUM)
-            .filter(StatisticsShortTerm.start >= bindparam("start_time"))
-            .filter(StatisticsShortTerm.start < bindparam("end_time"))
+            .filter(StatisticsShortTerm.start_ts >= bindparam("start_time_ts"))
+            .filter(StatisticsShortTerm.start_ts < bindparam("end_time_ts"))
             .subquery()
         )
         query = (
@@ -314,7 +318,11 @@ def compile_hourly_statistics(
             .filter(subquery.c.rownum == 1)
             .order_by(subquery.c.metadata_id)
         )
-        stats = execute(query.params(start_time=start_time, end_time=end_time))
+        stats = execute(
+            query.params(
+                start_time_ts=start_time.timestamp(), end_time_ts=end_time.timestamp()
+            )
+        )
 
         if stats:
             for stat in stats:
@@ -340,17 +348,19 @@ def compile_hourly_statistics(
         )
 
         baked_query += lambda q: q.filter(
-            StatisticsShortTerm.start >= bindparam("start_time")
+            StatisticsShortTerm.start_ts >= bindparam("start_time_ts")
         )
         baked_query += lambda q: q.filter(
-            StatisticsShortTerm.start < bindparam("end_time")
+            StatisticsShortTerm.start_ts < bindparam("end_time_ts")
         )
         baked_query += lambda q: q.order_by(
-            StatisticsShortTerm.metadata_id, StatisticsShortTerm.start.desc()
+            StatisticsShortTerm.metadata_id, StatisticsShortTerm.start_ts.desc()
         )
 
         stats = execute(
-            baked_query(session).params(start_time=start_time, end_time=end_time)
+            baked_query(session).params(
+                start_time_ts=start_time.timestamp(), end_time_ts=end_time.timestamp()
+            )
         )
 
         if stats:
@@ -654,17 +664,17 @@ def _statistics_during_period_query(
     """
     baked_query = hass.data[bakery](lambda session: session.query(*base_query))
 
-    baked_query += lambda q: q.filter(table.start >= bindparam("start_time"))
+    baked_query += lambda q: q.filter(table.start_ts >= bindparam("start_time_ts"))
 
     if end_time is not None:
-        baked_query += lambda q: q.filter(table.start < bindparam("end_time"))
+        baked_query += lambda q: q.filter(table.start_ts < bindparam("end_time_ts"))
 
     if statistic_ids is not None:
         baked_query += lambda q: q.filter(
             table.metadata_id.in_(bindparam("metadata_ids"))
         )
 
-    baked_query += lambda q: q.order_by(table.metadata_id, table.start)
+    baked_query += lambda q: q.order_by(table.metadata_id, table.start_ts)
     return baked_query  # type: ignore[no-any-return]
 
 
@@ -805,7 +815,9 @@ def statistics_during_period(
 
         stats = execute(
             baked_query(session).params(
-                start_time=start_time, end_time=end_time, metadata_ids=metadata_ids
+                start_time_ts=start_time.timestamp(),
+                end_time_ts=end_time.timestamp() if end_time is not None else None,
+                metadata_ids=metadata_ids,
             )
         )
         if not stats:
@@ -861,7 +873,7 @@ def _get_last_statistics(
         baked_query += lambda q: q.filter_by(metadata_id=bindparam("metadata_id"))
         metadata_id = metadata[statistic_id][0]
 
-        baked_query += lambda q: q.order_by(table.metadata_id, table.start.desc())
+        baked_query += lambda q: q.order_by(table.metadata_id, table.start_ts.desc())
 
         baked_query += lambda q: q.limit(bindparam("number_of_stats"))
 
@@ -923,7 +935,7 @@ def _statistics_at_time(
         session.query(
             func.max(table.id).label("max_id"),
         )
-        .filter(table.start < start_time)
+        .filter(table.start_ts < start_time.timestamp())
         .filter(table.metadata_id.in_(metadata_ids))
     )
     most_recent_statistic_ids = most_recent_statistic_ids.group_by(table.metadata_id)
@@ -964,9 +976,9 @@ def _sorted_statistics_to_dict(
             result[stat_id] = []
 
     # Identify metadata IDs for which no data was available at the requested start time
+    start_time_ts = start_time.timestamp() if start_time else None
     for meta_id, group in groupby(stats, lambda stat: stat.metadata_id):  # type: ignore
-        first_start_time = process_timestamp(next(group).start)
-        if start_time and first_start_time > start_time:
+        if start_time_ts and next(group).start_ts > start_time_ts:
             need_stat_at_start_time.add(meta_id)
 
     # Fetch last known statistics for the needed metadata IDs
@@ -988,7 +1000,7 @@ def _sorted_statistics_to_dict(
             convert = no_conversion
         ent_results = result[meta_id]
         for db_state in chain(stats_at_start_time.get(meta_id, ()), group):
-            start = process_timestamp(db_state.start)
+            start = dt_util.utc_from_timestamp(db_state.start_ts)
             end = start + table.duration
             ent_results.append(
                 {
@@ -1029,7 +1041,9 @@ def _statistics_exists(
     """Return id if a statistics entry already exists."""
     result = (
         session.query(table.id)
-        .filter((table.metadata_id == metadata_id) & (table.start == start))
+        .filter(
+            (table.metadata_id == metadata_id) & (table.start_ts == start.timestamp())
+        )
         .first()
     )
     return result["id"] if result else None
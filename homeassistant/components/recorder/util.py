@@ -1,7 +1,7 @@
 """SQLAlchemy util functions."""
 from __future__ import annotations
 
-from collections.abc import Callable, Generator
+from collections.abc import Callable, Generator, Iterable
 from contextlib import contextmanager
 from datetime import timedelta
 import functools
@@ -15,7 +15,7 @@ from awesomeversion import (
     AwesomeVersionException,
     AwesomeVersionStrategy,
 )
-from sqlalchemy import text
+from sqlalchemy import insert, text
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from sqlalchemy.orm.session import Session
 
@@ -32,6 +32,7 @@ from .models import (
     TABLE_STATISTICS_RUNS,
     TABLE_STATISTICS_SHORT_TERM,
     RecorderRuns,
+    StatesMeta,
     process_timestamp,
 )
 
@@ -57,6 +58,9 @@ MIN_VERSION_SQLITE_ROWNUM = AwesomeVersion("3.25.0", AwesomeVersionStrategy.SIMP
 # should do a check on the sqlite3 database.
 MAX_RESTART_TIME = timedelta(minutes=10)
 
+# Older SQLite versions allow at most 999 bound parameters per statement
+SQLITE_MAX_BIND_VARS = 999
+
 # Retry when one of the following MySQL errors occurred:
 RETRYABLE_MYSQL_ERRORS = (1205, 1206, 1213)
 # 1205: Lock wait timeout exceeded; try restarting transaction
@@ -154,6 +158,56 @@ def execute(qry, to_native=False, validate_entity_ids=True) -> list | None:
     return None
 
 
+def find_states_metadata_ids(session: Session, entity_ids: Iterable[str]) -> list[int]:
+    """Return the states_meta ids of the entity ids that have been recorded."""
+    return [
+        metadata_id
+        for (metadata_id,) in session.query(StatesMeta.metadata_id).filter(
+            StatesMeta.entity_id.in_(entity_ids)
+        )
+    ]
+
+
+def bulk_insert_and_set_ids(session: Session, objects: list) -> None:
+    """Insert new ORM objects of one model and set their primary keys.
+
+    The objects are written with multi row INSERT statements rather than
+    one INSERT per object. PostgreSQL returns the new keys with RETURNING.
+    SQLite and MySQL assign the rows of one statement a contiguous range
+    of keys as the recorder is the only writer, so the range is derived
+    from the last inserted id. Other databases insert one row at a time.
+    """
+    table = objects[0].__table__
+    (primary_key,) = table.primary_key.columns
+    columns = [column for column in table.columns if column is not primary_key]
+    rows = [
+        {column.key: obj.__dict__.get(column.key) for column in columns}
+        for obj in objects
+    ]
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name not in ("sqlite", "mysql", "postgresql"):
+        for obj, row in zip(objects, rows):
+            result = session.execute(insert(table).values(row))
+            setattr(obj, primary_key.key, result.inserted_primary_key[0])
+        return
+
+    batch_size = SQLITE_MAX_BIND_VARS // len(columns)
+    for offset in range(0, len(rows), batch_size):
+        batch = rows[offset : offset + batch_size]
+        stmt = insert(table).values(batch)
+        if dialect_name == "postgresql":
+            ids = session.execute(stmt.returning(primary_key)).scalars().all()
+        elif dialect_name == "mysql":
+            # LAST_INSERT_ID() is the id of the first row
+            first_id = session.execute(stmt).lastrowid
+            ids = range(first_id, first_id + len(batch))
+        else:
+            last_id = session.execute(stmt).lastrowid
+            ids = range(last_id - len(batch) + 1, last_id + 1)
+        for obj, obj_id in zip(objects[offset : offset + batch_size], ids):
+            setattr(obj, primary_key.key, obj_id)
+
+
 def validate_or_move_away_sqlite_database(dburl: str) -> bool:
     """Ensure that the database is valid or move it away."""
     dbpath = dburl_to_path(dburl)
@@ -102,10 +102,12 @@ def ws_info(
     migration_in_progress = async_migration_in_progress(hass)
     recording = instance.recording if instance else False
     thread_alive = instance.is_alive() if instance else False
+    metrics = instance.metrics.as_dict() if instance else None
 
     recorder_info = {
         "backlog": backlog,
         "max_backlog": MAX_QUEUE_BACKLOG,
+        "metrics": metrics,
         "migration_in_progress": migration_in_progress,
         "recording": recording,
         "thread_running": thread_alive,
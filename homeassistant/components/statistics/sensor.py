@@ -7,7 +7,11 @@ import statistics
 import voluptuous as vol
 
 from homeassistant.components.recorder.models import States
-from homeassistant.components.recorder.util import execute, session_scope
+from homeassistant.components.recorder.util import (
+    execute,
+    find_states_metadata_ids,
+    session_scope,
+)
 from homeassistant.components.sensor import (
     PLATFORM_SCHEMA,
     STATE_CLASS_MEASUREMENT,
@@ -459,7 +463,9 @@ class StatisticsSensor(SensorEntity):
 
         with session_scope(hass=self.hass) as session:
             query = session.query(States).filter(
-                States.entity_id == self._source_entity_id.lower()
+                States.metadata_id.in_(
+                    find_states_metadata_ids(session, [self._source_entity_id.lower()])
+                )
             )
 
             if self._samples_max_age is not None:
@@ -469,11 +475,13 @@ class StatisticsSensor(SensorEntity):
                     self.entity_id,
                     records_older_then,
                 )
-                query = query.filter(States.last_updated >= records_older_then)
+                query = query.filter(
+                    States.last_updated_ts >= records_older_then.timestamp()
+                )
             else:
                 _LOGGER.debug("%s: retrieving all records", self.entity_id)
 
-            query = query.order_by(States.last_updated.desc()).limit(
+            query = query.order_by(States.last_updated_ts.desc()).limit(
                 self._samples_max_buffer_size
             )
             states = execute(query, to_native=True, validate_entity_ids=False)
@@ -136,6 +136,7 @@ async def async_attach_trigger(
         hass,
         [TrackTemplate(value_template, automation_info["variables"])],
         template_listener,
+        owner=automation_info["name"],
     )
     unsub = info.async_remove
 
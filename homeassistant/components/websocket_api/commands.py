@@ -24,6 +24,7 @@ from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.event import (
     TrackTemplate,
     TrackTemplateResult,
+    async_track_state_change_event,
     async_track_template_result,
 )
 from homeassistant.helpers.json import ExtendedJSONEncoder
@@ -42,6 +43,7 @@ def async_register_commands(
 ) -> None:
     """Register commands."""
     async_reg(hass, handle_call_service)
+    async_reg(hass, handle_connection_stats)
     async_reg(hass, handle_entity_source)
     async_reg(hass, handle_execute_script)
     async_reg(hass, handle_get_config)
@@ -53,8 +55,10 @@ def async_register_commands(
     async_reg(hass, handle_ping)
     async_reg(hass, handle_render_template)
     async_reg(hass, handle_subscribe_bootstrap_integrations)
+    async_reg(hass, handle_subscribe_entities)
     async_reg(hass, handle_subscribe_events)
     async_reg(hass, handle_subscribe_trigger)
+    async_reg(hass, handle_supported_features)
     async_reg(hass, handle_test_condition)
     async_reg(hass, handle_unsubscribe_events)
 
@@ -113,6 +117,77 @@ def handle_subscribe_events(
     connection.send_message(messages.result_message(msg["id"]))
 
 
+@callback
+@decorators.websocket_command(
+    {
+        vol.Required("type"): "subscribe_entities",
+        vol.Optional("entity_ids"): cv.entity_ids,
+    }
+)
+def handle_subscribe_entities(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Handle subscribe entities command.
+
+    Sends the compressed states of the entities followed by
+    the changed fields of every state change of them.
+    """
+    entity_perm = connection.user.permissions.check_entity
+    # Only check the permission of each entity once
+    allowed_entities: dict[str, bool] = {}
+
+    def check_allowed(entity_id: str) -> bool:
+        """Return if the user can read the entity."""
+        if (is_allowed := allowed_entities.get(entity_id)) is None:
+            is_allowed = allowed_entities[entity_id] = entity_perm(
+                entity_id, POLICY_READ
+            )
+        return is_allowed
+
+    allowed: Callable[[str], bool] | None = None
+    if not connection.user.permissions.access_all_entities(POLICY_READ):
+        allowed = check_allowed
+
+    entity_ids: list[str] | None = msg.get("entity_ids")
+    if entity_ids is not None:
+        if allowed is not None:
+            entity_ids = [entity_id for entity_id in entity_ids if allowed(entity_id)]
+            allowed = None
+        states = [
+            state for entity_id in entity_ids if (state := hass.states.get(entity_id))
+        ]
+    else:
+        states = hass.states.async_all()
+        if allowed is not None:
+            states = [state for state in states if allowed(state.entity_id)]
+
+    @callback
+    def forward_entity_changes(event: Event) -> None:
+        """Forward the changes of the entities to websocket."""
+        if allowed is not None and not allowed(event.data["entity_id"]):
+            return
+        connection.send_message(messages.cached_state_diff_message(msg["id"], event))
+
+    if entity_ids is not None:
+        unsub = async_track_state_change_event(hass, entity_ids, forward_entity_changes)
+    else:
+        unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, forward_entity_changes)
+    connection.subscriptions[msg["id"]] = unsub
+
+    connection.send_message(messages.result_message(msg["id"]))
+    connection.send_message(
+        messages.event_message(
+            msg["id"],
+            {
+                messages.ENTITY_EVENT_ADD: {
+                    state.entity_id: messages.compressed_state(state)
+                    for state in states
+                }
+            },
+        )
+    )
+
+
 @callback
 @decorators.websocket_command(
     {
@@ -238,7 +313,45 @@ def handle_get_states(
             if entity_perm(state.entity_id, "read")
         ]
 
-    connection.send_message(messages.result_message(msg["id"], states))
+    try:
+        serialized_states = [state.as_json() for state in states]
+    except (ValueError, TypeError):
+        # Let message_to_json find and report the bad data
+        connection.send_message(messages.result_message(msg["id"], states))
+        return
+
+    connection.send_message(
+        messages.construct_result_message(msg["id"], f'[{",".join(serialized_states)}]')
+    )
+
+
+@callback
+@decorators.websocket_command({vol.Required("type"): "connection_stats"})
+def handle_connection_stats(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Handle getting the number of messages and frames sent to the client."""
+    if connection.get_send_stats is None:
+        connection.send_error(
+            msg["id"], const.ERR_NOT_SUPPORTED, "Connection stats not available"
+        )
+        return
+    connection.send_result(msg["id"], connection.get_send_stats())
+
+
+@callback
+@decorators.websocket_command(
+    {
+        vol.Required("type"): "supported_features",
+        vol.Required("features"): {str: int},
+    }
+)
+def handle_supported_features(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Handle setting the features supported by the client."""
+    connection.supported_features = msg["features"]
+    connection.send_result(msg["id"])
 
 
 @decorators.websocket_command({vol.Required("type"): "get_services"})
@@ -36,6 +36,9 @@ class ActiveConnection:
         self.refresh_token_id = refresh_token.id
         self.subscriptions: dict[Hashable, Callable[[], Any]] = {}
         self.last_id = 0
+        self.supported_features: dict[str, int] = {}
+        # Returns the messages and frames sent so far, set by the handler
+        self.get_send_stats: Callable[[], dict[str, int]] | None = None
 
     def context(self, msg: dict[str, Any]) -> Context:
         """Return a context."""
@@ -17,9 +17,13 @@ from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.event import async_call_later
 
 from .auth import AuthPhase, auth_required_message
+from .connection import ActiveConnection
 from .const import (
     CANCELLATION_ERRORS,
     DATA_CONNECTIONS,
+    FEATURE_COALESCE_MESSAGES,
+    FEATURE_COALESCE_WINDOW,
+    MAX_COALESCE_WINDOW,
     MAX_PENDING_MSG,
     PENDING_MSG_PEAK,
     PENDING_MSG_PEAK_TIME,
@@ -67,23 +71,62 @@ class WebSocketHandler:
         self._writer_task: asyncio.Task | None = None
         self._logger = WebSocketAdapter(_WS_LOGGER, {"connid": id(self)})
         self._peak_checker_unsub: Callable[[], None] | None = None
+        self._connection: ActiveConnection | None = None
+        self.messages_sent = 0
+        self.frames_sent = 0
 
     async def _writer(self) -> None:
-        """Write outgoing messages."""
+        """Write outgoing messages.
+
+        Clients that support coalesced messages get all pending
+        messages in one frame as a JSON array.
+        """
+        to_write = self._to_write
         # Exceptions if Socket disconnected or cancelled by connection handler
         with suppress(RuntimeError, ConnectionResetError, *CANCELLATION_ERRORS):
             while not self.wsock.closed:
-                if (message := await self._to_write.get()) is None:
+                if (message := await to_write.get()) is None:
                     break
 
+                if self._connection is None or not (
+                    features := self._connection.supported_features
+                ).get(FEATURE_COALESCE_MESSAGES):
+                    self._logger.debug("Sending %s", message)
+                    await self.wsock.send_str(message)
+                    self.messages_sent += 1
+                    self.frames_sent += 1
+                    continue
+
+                if window := features.get(FEATURE_COALESCE_WINDOW):
+                    await asyncio.sleep(min(window, MAX_COALESCE_WINDOW) / 1000)
+
+                messages = [message]
+                closing = False
+                while not to_write.empty():
+                    if (message := to_write.get_nowait()) is None:
+                        closing = True
+                        break
+                    messages.append(message)
+
+                if len(messages) > 1:
+                    message = f'[{",".join(messages)}]'
                 self._logger.debug("Sending %s", message)
                 await self.wsock.send_str(message)
+                self.messages_sent += len(messages)
+                self.frames_sent += 1
+                if closing:
+                    break
 
         # Clean up the peaker checker when we shut down the writer
         if self._peak_checker_unsub is not None:
             self._peak_checker_unsub()
             self._peak_checker_unsub = None
 
+    @callback
+    def _get_send_stats(self) -> dict[str, int]:
+        """Return the number of messages and frames sent so far."""
+        return {"messages_sent": self.messages_sent, "frames_sent": self.frames_sent}
+
     @callback
     def _send_message(self, message: str | dict[str, Any]) -> None:
         """Send a message to the client.
@@ -196,7 +239,8 @@ class WebSocketHandler:
                 raise Disconnect from err
 
             self._logger.debug("Received %s", msg_data)
-            connection = await auth.async_handle(msg_data)
+            connection = self._connection = await auth.async_handle(msg_data)
+            connection.get_send_stats = self._get_send_stats
             self.hass.data[DATA_CONNECTIONS] = (
                 self.hass.data.get(DATA_CONNECTIONS, 0) + 1
             )
@@ -248,6 +292,11 @@ class WebSocketHandler:
                 self._writer_task.cancel()
 
             finally:
+                self._logger.debug(
+                    "Sent %s messages in %s frames",
+                    self.messages_sent,
+                    self.frames_sent,
+                )
                 if disconnect_warn is None:
                     self._logger.debug("Disconnected")
                 else:
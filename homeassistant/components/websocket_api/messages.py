@@ -7,7 +7,7 @@ from typing import Any, Final
 
 import voluptuous as vol
 
-from homeassistant.core import Event
+from homeassistant.core import Event, State
 from homeassistant.helpers import config_validation as cv
 from homeassistant.util.json import (
     find_paths_unserializable_data,
@@ -31,12 +31,33 @@ BASE_COMMAND_MESSAGE_SCHEMA: Final = vol.Schema({vol.Required("id"): cv.positive
 IDEN_TEMPLATE: Final = "__IDEN__"
 IDEN_JSON_TEMPLATE: Final = '"__IDEN__"'
 
+# Keys of a compressed state
+COMPRESSED_STATE_STATE: Final = "s"
+COMPRESSED_STATE_ATTRIBUTES: Final = "a"
+COMPRESSED_STATE_CONTEXT: Final = "c"
+COMPRESSED_STATE_LAST_CHANGED: Final = "lc"
+COMPRESSED_STATE_LAST_UPDATED: Final = "lu"
+
+# Keys of a compressed state diff
+STATE_DIFF_ADDITIONS: Final = "+"
+STATE_DIFF_REMOVALS: Final = "-"
+
+# Keys of an entities event
+ENTITY_EVENT_ADD: Final = "a"
+ENTITY_EVENT_REMOVE: Final = "r"
+ENTITY_EVENT_CHANGE: Final = "c"
+
 
 def result_message(iden: int, result: Any = None) -> dict[str, Any]:
     """Return a success result message."""
     return {"id": iden, "type": const.TYPE_RESULT, "success": True, "result": result}
 
 
+def construct_result_message(iden: int, payload: str) -> str:
+    """Return a success result message with a JSON serialized result."""
+    return f'{{"id":{iden},"type":"{const.TYPE_RESULT}","success":true,"result":{payload}}}'
+
+
 def error_message(iden: int | None, code: str, message: str) -> dict[str, Any]:
     """Return an error result message."""
     return {
@@ -74,6 +95,86 @@ def _cached_event_message(event: Event) -> str:
     return message_to_json(event_message(IDEN_TEMPLATE, event))
 
 
+def cached_state_diff_message(iden: int, event: Event) -> str:
+    """Return an entities event message for a state changed event.
+
+    Serialize to json once per message like cached_event_message.
+    """
+    return _cached_state_diff_message(event).replace(IDEN_JSON_TEMPLATE, str(iden), 1)
+
+
+@lru_cache(maxsize=128)
+def _cached_state_diff_message(event: Event) -> str:
+    """Cache and serialize the state diff of the event to json."""
+    return message_to_json(event_message(IDEN_TEMPLATE, _state_diff_event(event)))
+
+
+def _state_diff_event(event: Event) -> dict[str, Any]:
+    """Convert a state changed event to an entities event.
+
+    Added entities carry their compressed state, changed entities
+    only the fields that differ from their old state.
+    """
+    if (new_state := event.data["new_state"]) is None:
+        return {ENTITY_EVENT_REMOVE: [event.data["entity_id"]]}
+    if (old_state := event.data["old_state"]) is None:
+        return {ENTITY_EVENT_ADD: {new_state.entity_id: compressed_state(new_state)}}
+    return {
+        ENTITY_EVENT_CHANGE: {new_state.entity_id: _state_diff(old_state, new_state)}
+    }
+
+
+def compressed_state(state: State) -> dict[str, Any]:
+    """Return a compressed representation of a state.
+
+    The context is only sent as a dict if it has a parent or user,
+    last_updated is only sent if it differs from last_changed.
+    """
+    context = state.context
+    compressed: dict[str, Any] = {
+        COMPRESSED_STATE_STATE: state.state,
+        COMPRESSED_STATE_ATTRIBUTES: dict(state.attributes),
+        COMPRESSED_STATE_CONTEXT: context.id
+        if context.parent_id is None and context.user_id is None
+        else context.as_dict(),
+        COMPRESSED_STATE_LAST_CHANGED: state.last_changed.timestamp(),
+    }
+    if state.last_changed != state.last_updated:
+        compressed[COMPRESSED_STATE_LAST_UPDATED] = state.last_updated.timestamp()
+    return compressed
+
+
+def _state_diff(old_state: State, new_state: State) -> dict[str, dict[str, Any]]:
+    """Return the fields of new_state that differ from old_state."""
+    additions: dict[str, Any] = {}
+    diff: dict[str, dict[str, Any]] = {STATE_DIFF_ADDITIONS: additions}
+    if old_state.state != new_state.state:
+        additions[COMPRESSED_STATE_STATE] = new_state.state
+    if old_state.last_changed != new_state.last_changed:
+        additions[COMPRESSED_STATE_LAST_CHANGED] = new_state.last_changed.timestamp()
+    elif old_state.last_updated != new_state.last_updated:
+        additions[COMPRESSED_STATE_LAST_UPDATED] = new_state.last_updated.timestamp()
+    old_context = old_state.context
+    new_context = new_state.context
+    if old_context.id != new_context.id:
+        if new_context.parent_id is None and new_context.user_id is None:
+            additions[COMPRESSED_STATE_CONTEXT] = new_context.id
+        else:
+            additions[COMPRESSED_STATE_CONTEXT] = new_context.as_dict()
+    old_attributes = old_state.attributes
+    new_attributes = new_state.attributes
+    if old_attributes is not new_attributes:
+        if changed := {
+            key: value
+            for key, value in new_attributes.items()
+            if key not in old_attributes or old_attributes[key] != value
+        }:
+            additions[COMPRESSED_STATE_ATTRIBUTES] = changed
+        if removed := [key for key in old_attributes if key not in new_attributes]:
+            diff[STATE_DIFF_REMOVALS] = {COMPRESSED_STATE_ATTRIBUTES: removed}
+    return diff
+
+
 def message_to_json(message: dict[str, Any]) -> str:
     """Serialize a websocket message to json."""
     try:
@@ -11,6 +11,7 @@ from collections.abc import Awaitable, Collection, Coroutine, Iterable, Mapping
 import datetime
 import enum
 import functools
+import json
 import logging
 import os
 import pathlib
@@ -21,7 +22,6 @@ from types import MappingProxyType
 from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, cast
 from urllib.parse import urlparse
 
-import attr
 import voluptuous as vol
 import yarl
 
@@ -60,6 +60,7 @@ from homeassistant.exceptions import (
     ServiceNotFound,
     Unauthorized,
 )
+from homeassistant.helpers.json import JSONEncoder
 from homeassistant.util import location
 from homeassistant.util.async_ import (
     fire_coroutine_threadsafe,
@@ -69,7 +70,7 @@ from homeassistant.util.async_ import (
 import homeassistant.util.dt as dt_util
 from homeassistant.util.timeout import TimeoutManager
 from homeassistant.util.unit_system import IMPERIAL_SYSTEM, METRIC_SYSTEM, UnitSystem
-import homeassistant.util.uuid as uuid_util
+from homeassistant.util.uuid import random_uuid_hex
 
 # Typing imports that create a circular dependency
 if TYPE_CHECKING:
@@ -111,6 +112,9 @@ SOURCE_YAML = "yaml"
 # How long to wait until things that run on startup have to finish.
 TIMEOUT_EVENT_START = 15
 
+# Events that are not sent to MATCH_ALL listeners
+_MATCH_ALL_EXCLUDED_EVENTS = {EVENT_HOMEASSISTANT_CLOSE, EVENT_TIME_CHANGED}
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -576,13 +580,77 @@ class HomeAssistant:
             self._stopped.set()
 
 
-@attr.s(slots=True, frozen=True)
+class _ContextIdUnset:
+    """Marker for a context id that has not been generated yet."""
+
+    __slots__ = ()
+
+
+_CONTEXT_ID_UNSET = _ContextIdUnset()
+# Guards generating the id of a context read from several threads
+_CONTEXT_ID_LOCK = threading.Lock()
+
+
 class Context:
-    """The context that triggered something."""
+    """The context that triggered something.
+
+    Most contexts are never stored or inspected, so the random id is only
+    generated the first time it is read.
+    """
+
+    __slots__ = ("user_id", "parent_id", "_id")
+
+    def __init__(
+        self,
+        user_id: str | None = None,
+        parent_id: str | None = None,
+        # pylint: disable-next=redefined-builtin
+        id: str | None | _ContextIdUnset = _CONTEXT_ID_UNSET,
+    ) -> None:
+        """Initialize a context."""
+        self.user_id = user_id
+        self.parent_id = parent_id
+        self._id = id
+
+    @property
+    def id(self) -> str:
+        """Return the id of the context, generating it on first access.
 
-    user_id: str = attr.ib(default=None)
-    parent_id: str | None = attr.ib(default=None)
-    id: str = attr.ib(factory=uuid_util.random_uuid_hex)
+        The recorder thread reads the ids of the events it stores while
+        the event loop may read them too, so the id is generated under a
+        lock to make all readers see the same id.
+        """
+        if (id_ := self._id) is _CONTEXT_ID_UNSET:
+            with _CONTEXT_ID_LOCK:
+                if self._id is _CONTEXT_ID_UNSET:
+                    self._id = random_uuid_hex()
+                id_ = self._id
+        return id_  # type: ignore[return-value]
+
+    def __eq__(self, other: Any) -> bool:
+        """Return the comparison."""
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return bool(
+            self.id == other.id
+            and self.user_id == other.user_id
+            and self.parent_id == other.parent_id
+        )
+
+    def __hash__(self) -> int:
+        """Make hashable."""
+        return hash((self.user_id, self.parent_id, self.id))
+
+    def __reduce__(self) -> tuple[type[Context], tuple[str | None, ...]]:
+        """Return the state for copy and pickle."""
+        return (self.__class__, (self.user_id, self.parent_id, self.id))
+
+    def __repr__(self) -> str:
+        """Return the representation."""
+        return (
+            f"Context(user_id={self.user_id!r}, parent_id={self.parent_id!r}, "
+            f"id={self.id!r})"
+        )
 
     def as_dict(self) -> dict[str, str | None]:
         """Return a dictionary representation of the context."""
@@ -657,6 +725,116 @@ class Event:
         )
 
 
+class ListenerStats:
+    """Calls and run time of an event listener."""
+
+    __slots__ = ["calls", "total_time", "max_time"]
+
+    def __init__(self) -> None:
+        """Initialize the stats."""
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+
+class EventListenerProfiler:
+    """Record how often event listeners run and how long they take.
+
+    The time of coroutine and executor listeners is the wall time
+    until they finish, the time of callbacks is the time they
+    blocked the event loop.
+    """
+
+    def __init__(self, hass: HomeAssistant, slow_threshold: float) -> None:
+        """Initialize the profiler."""
+        self._hass = hass
+        self.slow_threshold = slow_threshold
+        self.stats: dict[tuple[str, HassJob], ListenerStats] = {}
+
+    @callback
+    def async_add_hass_job(self, job: HassJob, event: Event) -> None:
+        """Run a listener for an event like HomeAssistant.async_add_hass_job."""
+        key = (event.event_type, job)
+        if job.job_type == HassJobType.Coroutinefunction:
+            self._hass.async_create_task(self._async_run_coroutine(key, event))
+        elif job.job_type == HassJobType.Callback:
+            self._hass.loop.call_soon(self._run_callback, key, event)
+        else:
+            self._hass.async_add_executor_job(self._run_executor, key, event)
+
+    def _run_callback(self, key: tuple[str, HassJob], event: Event) -> None:
+        """Run a callback listener."""
+        start = monotonic()
+        try:
+            key[1].target(event)
+        finally:
+            self._async_record(key, monotonic() - start)
+
+    async def _async_run_coroutine(
+        self, key: tuple[str, HassJob], event: Event
+    ) -> None:
+        """Run a coroutine function listener."""
+        start = monotonic()
+        try:
+            await key[1].target(event)
+        finally:
+            self._async_record(key, monotonic() - start)
+
+    def _run_executor(self, key: tuple[str, HassJob], event: Event) -> None:
+        """Run a listener in the executor."""
+        start = monotonic()
+        try:
+            key[1].target(event)
+        finally:
+            self._hass.loop.call_soon_threadsafe(
+                self._async_record, key, monotonic() - start
+            )
+
+    @callback
+    def _async_record(self, key: tuple[str, HassJob], duration: float) -> None:
+        """Record a run of a listener and log it if it was slow."""
+        if (stats := self.stats.get(key)) is None:
+            stats = self.stats[key] = ListenerStats()
+        stats.calls += 1
+        stats.total_time += duration
+        if duration > stats.max_time:
+            stats.max_time = duration
+        if duration > self.slow_threshold:
+            _LOGGER.warning(
+                "Listener %s for %s took %.3f seconds",
+                _job_name(key[1]),
+                key[0],
+                duration,
+            )
+
+    @callback
+    def async_as_list(self) -> list[dict[str, Any]]:
+        """Return the stats of the listeners, slowest first."""
+        return sorted(
+            (
+                {
+                    "event_type": event_type,
+                    "listener": _job_name(job),
+                    "job_type": job.job_type.name,
+                    "calls": stats.calls,
+                    "total_time": stats.total_time,
+                    "max_time": stats.max_time,
+                }
+                for (event_type, job), stats in self.stats.items()
+            ),
+            key=lambda listener: listener["total_time"],  # type: ignore[no-any-return]
+            reverse=True,
+        )
+
+
+def _job_name(job: HassJob) -> str:
+    """Return the module and name of the target of a job."""
+    target = job.target
+    while isinstance(target, functools.partial):
+        target = target.func
+    return f"{getattr(target, '__module__', None)}.{getattr(target, '__qualname__', target)}"
+
+
 class EventBus:
     """Allow the firing of and listening for events."""
 
@@ -664,6 +842,33 @@ class EventBus:
         """Initialize a new event bus."""
         self._listeners: dict[str, list[tuple[HassJob, Callable | None]]] = {}
         self._hass = hass
+        self._profiler: EventListenerProfiler | None = None
+
+    @property
+    def profiler(self) -> EventListenerProfiler | None:
+        """Return the running listener profiler."""
+        return self._profiler
+
+    @callback
+    def async_start_profiler(self, slow_threshold: float) -> EventListenerProfiler:
+        """Start recording the calls and run time of the listeners.
+
+        Listeners that take longer than slow_threshold seconds are logged.
+        A running profiler is replaced.
+
+        This method must be run in the event loop.
+        """
+        self._profiler = EventListenerProfiler(self._hass, slow_threshold)
+        return self._profiler
+
+    @callback
+    def async_stop_profiler(self) -> EventListenerProfiler | None:
+        """Stop the listener profiler and return it.
+
+        This method must be run in the event loop.
+        """
+        profiler, self._profiler = self._profiler, None
+        return profiler
 
     @callback
     def async_listeners(self) -> dict[str, int]:
@@ -673,6 +878,17 @@ class EventBus:
         """
         return {key: len(listeners) for key, listeners in self._listeners.items()}
 
+    @callback
+    def async_has_listeners(self, event_type: str) -> bool:
+        """Return if an event of the type would be passed to any listener.
+
+        This method must be run in the event loop.
+        """
+        return event_type in self._listeners or (
+            MATCH_ALL in self._listeners
+            and event_type not in _MATCH_ALL_EXCLUDED_EVENTS
+        )
+
     @property
     def listeners(self) -> dict[str, int]:
         """Return dictionary with events and the number of listeners."""
@@ -708,12 +924,7 @@ class EventBus:
                 event_type, "event_type", MAX_LENGTH_EVENT_EVENT_TYPE
             )
 
-        listeners = self._listeners.get(event_type, [])
-
-        # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
-        match_all_listeners = self._listeners.get(MATCH_ALL)
-        if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
-            listeners = match_all_listeners + listeners
+        listeners = self._async_event_type_listeners(event_type)
 
         event = Event(event_type, event_data, origin, time_fired, context)
 
@@ -723,6 +934,59 @@ class EventBus:
         if not listeners:
             return
 
+        self._async_dispatch(listeners, event)
+
+    @callback
+    def _async_fire_many(
+        self,
+        event_type: str,
+        events: Iterable[tuple[dict[str, Any], Context]],
+        origin: EventOrigin = EventOrigin.local,
+        time_fired: datetime.datetime | None = None,
+    ) -> None:
+        """Fire events of the same type back to back.
+
+        The listeners are looked up once for the whole batch.
+
+        This method must be run in the event loop.
+        """
+        if len(event_type) > MAX_LENGTH_EVENT_EVENT_TYPE:
+            raise MaxLengthExceeded(
+                event_type, "event_type", MAX_LENGTH_EVENT_EVENT_TYPE
+            )
+
+        listeners = self._async_event_type_listeners(event_type)
+
+        for event_data, context in events:
+            event = Event(event_type, event_data, origin, time_fired, context)
+            _LOGGER.debug("Bus:Handling %s", event)
+            if listeners:
+                self._async_dispatch(listeners, event)
+
+    @callback
+    def _async_event_type_listeners(
+        self, event_type: str
+    ) -> list[tuple[HassJob, Callable | None]]:
+        """Return the listeners an event of the type is sent to."""
+        listeners = self._listeners.get(event_type, [])
+
+        # EVENT_HOMEASSISTANT_CLOSE and EVENT_TIME_CHANGED should go only
+        # to their own listeners
+        match_all_listeners = self._listeners.get(MATCH_ALL)
+        if (
+            match_all_listeners is not None
+            and event_type not in _MATCH_ALL_EXCLUDED_EVENTS
+        ):
+            listeners = match_all_listeners + listeners
+
+        return listeners
+
+    @callback
+    def _async_dispatch(
+        self, listeners: list[tuple[HassJob, Callable | None]], event: Event
+    ) -> None:
+        """Schedule the listeners that accept the event."""
+        profiler = self._profiler
         for job, event_filter in listeners:
             if event_filter is not None:
                 try:
@@ -731,7 +995,10 @@ class EventBus:
                 except Exception:  # pylint: disable=broad-except
                     _LOGGER.exception("Error in event filter")
                     continue
-            self._hass.async_add_hass_job(job, event)
+            if profiler is None:
+                self._hass.async_add_hass_job(job, event)
+            else:
+                profiler.async_add_hass_job(job, event)
 
     def listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
@@ -887,6 +1154,7 @@ class State:
         "domain",
         "object_id",
         "_as_dict",
+        "_as_json",
     ]
 
     def __init__(
@@ -916,12 +1184,17 @@ class State:
 
         self.entity_id = entity_id.lower()
         self.state = state
-        self.attributes = MappingProxyType(attributes or {})
+        if attributes.__class__ is MappingProxyType:
+            # Already read only, share it with the previous state
+            self.attributes = attributes
+        else:
+            self.attributes = MappingProxyType(attributes or {})
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
         self.context = context or Context()
         self.domain, self.object_id = split_entity_id(self.entity_id)
         self._as_dict: dict[str, Collection[Any]] | None = None
+        self._as_json: str | None = None
 
     @property
     def name(self) -> str:
@@ -954,6 +1227,19 @@ class State:
             }
         return self._as_dict
 
+    def as_json(self) -> str:
+        """Return the JSON representation of the State.
+
+        Async friendly.
+
+        Cached like as_dict so snapshots of many states only
+        encode the states that changed since the last snapshot.
+        Raises ValueError or TypeError if the state is not serializable.
+        """
+        if not self._as_json:
+            self._as_json = json.dumps(self.as_dict(), cls=JSONEncoder, allow_nan=False)
+        return self._as_json
+
     @classmethod
     def from_dict(cls, json_dict: dict) -> Any:
         """Initialize a state from a dict.
@@ -1013,6 +1299,9 @@ class StateMachine:
     def __init__(self, bus: EventBus, loop: asyncio.events.AbstractEventLoop) -> None:
         """Initialize state machine."""
         self._states: dict[str, State] = {}
+        # The states of each domain, so filtering by domain
+        # does not have to look at every state
+        self._domain_index: dict[str, dict[str, State]] = {}
         self._reservations: set[str] = set()
         self._bus = bus
         self._loop = loop
@@ -1036,13 +1325,12 @@ class StateMachine:
             return list(self._states)
 
         if isinstance(domain_filter, str):
-            domain_filter = (domain_filter.lower(),)
+            return list(self._domain_index.get(domain_filter.lower(), ()))
 
-        return [
-            state.entity_id
-            for state in self._states.values()
-            if state.domain in domain_filter
-        ]
+        entity_ids: list[str] = []
+        for domain_states in self._async_domain_states(domain_filter):
+            entity_ids.extend(domain_states)
+        return entity_ids
 
     @callback
     def async_entity_ids_count(
@@ -1056,10 +1344,11 @@ class StateMachine:
             return len(self._states)
 
         if isinstance(domain_filter, str):
-            domain_filter = (domain_filter.lower(),)
+            return len(self._domain_index.get(domain_filter.lower(), ()))
 
-        return len(
-            [None for state in self._states.values() if state.domain in domain_filter]
+        return sum(
+            len(domain_states)
+            for domain_states in self._async_domain_states(domain_filter)
         )
 
     def all(self, domain_filter: str | Iterable | None = None) -> list[State]:
@@ -1078,10 +1367,22 @@ class StateMachine:
             return list(self._states.values())
 
         if isinstance(domain_filter, str):
-            domain_filter = (domain_filter.lower(),)
+            if (domain_states := self._domain_index.get(domain_filter.lower())) is None:
+                return []
+            return list(domain_states.values())
+
+        states: list[State] = []
+        for domain_states in self._async_domain_states(domain_filter):
+            states.extend(domain_states.values())
+        return states
 
+    @callback
+    def _async_domain_states(self, domains: Iterable[str]) -> list[dict[str, State]]:
+        """Return the states of each domain that has any, grouped by domain."""
         return [
-            state for state in self._states.values() if state.domain in domain_filter
+            domain_states
+            for domain in dict.fromkeys(domains)
+            if (domain_states := self._domain_index.get(domain))
         ]
 
     def get(self, entity_id: str) -> State | None:
@@ -1125,6 +1426,8 @@ class StateMachine:
         if old_state is None:
             return False
 
+        del self._domain_index[old_state.domain][entity_id]
+
         self._bus.async_fire(
             EVENT_STATE_CHANGED,
             {"entity_id": entity_id, "old_state": old_state, "new_state": None},
@@ -1199,6 +1502,96 @@ class StateMachine:
 
         This method must be run in the event loop.
         """
+        if (
+            changed := self._async_store_state(
+                entity_id, new_state, attributes, force_update, context, None
+            )
+        ) is None:
+            return
+
+        old_state, state = changed
+        self._bus.async_fire(
+            EVENT_STATE_CHANGED,
+            {"entity_id": state.entity_id, "old_state": old_state, "new_state": state},
+            EventOrigin.local,
+            state.context,
+            time_fired=state.last_updated,
+        )
+
+    @callback
+    def async_set_many(
+        self,
+        states: Iterable[
+            tuple[str, str, Mapping[str, Any] | None, bool, Context | None]
+        ],
+        context: Context | None = None,
+    ) -> None:
+        """Set the states of several entities at once.
+
+        Each item is a tuple of entity_id, new_state, attributes, force_update
+        and a context that is used instead of the shared one when not None.
+
+        The states are written with the same last updated time and the state
+        changed events are fired back to back after all of them are stored.
+        An invalid entity id or state does not stop the other states from
+        being written, the first error is raised once their events are fired.
+
+        This method must be run in the event loop.
+        """
+        now = dt_util.utcnow()
+        events: list[tuple[dict[str, Any], Context]] = []
+        errors: list[HomeAssistantError] = []
+
+        for entity_id, new_state, attributes, force_update, state_context in states:
+            if state_context is None:
+                if context is None:
+                    context = Context()
+                state_context = context
+            try:
+                changed = self._async_store_state(
+                    entity_id, new_state, attributes, force_update, state_context, now
+                )
+            except (InvalidEntityFormatError, InvalidStateError) as err:
+                errors.append(err)
+                continue
+            if changed is None:
+                continue
+            old_state, state = changed
+            events.append(
+                (
+                    {
+                        "entity_id": state.entity_id,
+                        "old_state": old_state,
+                        "new_state": state,
+                    },
+                    state_context,
+                )
+            )
+
+        if events:
+            # pylint: disable-next=protected-access
+            self._bus._async_fire_many(
+                EVENT_STATE_CHANGED, events, EventOrigin.local, time_fired=now
+            )
+
+        if errors:
+            raise errors[0]
+
+    @callback
+    def _async_store_state(
+        self,
+        entity_id: str,
+        new_state: str,
+        attributes: Mapping[str, Any] | None,
+        force_update: bool,
+        context: Context | None,
+        now: datetime.datetime | None,
+    ) -> tuple[State | None, State] | None:
+        """Store a state and return the old and new state.
+
+        Returns None if neither the state nor the attributes changed.
+        Passing the attributes of the current state skips comparing them.
+        """
         entity_id = entity_id.lower()
         new_state = str(new_state)
         attributes = attributes or {}
@@ -1208,16 +1601,22 @@ class StateMachine:
             last_changed = None
         else:
             same_state = old_state.state == new_state and not force_update
-            same_attr = old_state.attributes == MappingProxyType(attributes)
+            old_attributes = old_state.attributes
+            same_attr = old_attributes is attributes or old_attributes == attributes
             last_changed = old_state.last_changed if same_state else None
 
         if same_state and same_attr:
-            return
+            return None
+
+        if same_attr:
+            # Keep the same mapping so consumers can compare by identity
+            attributes = old_attributes
 
         if context is None:
             context = Context()
 
-        now = dt_util.utcnow()
+        if now is None:
+            now = dt_util.utcnow()
 
         state = State(
             entity_id,
@@ -1229,13 +1628,10 @@ class StateMachine:
             old_state is None,
         )
         self._states[entity_id] = state
-        self._bus.async_fire(
-            EVENT_STATE_CHANGED,
-            {"entity_id": entity_id, "old_state": old_state, "new_state": state},
-            EventOrigin.local,
-            context,
-            time_fired=now,
-        )
+        if (domain_states := self._domain_index.get(state.domain)) is None:
+            domain_states = self._domain_index[state.domain] = {}
+        domain_states[entity_id] = state
+        return old_state, state
 
 
 class Service:
@@ -1786,9 +2182,15 @@ def _async_create_timer(hass: HomeAssistant) -> None:
         """Fire next time event."""
         now = dt_util.utcnow()
 
-        hass.bus.async_fire(
-            EVENT_TIME_CHANGED, {ATTR_NOW: now}, time_fired=now, context=timer_context
-        )
+        # Time tracking runs on loop timers, so the event is only
+        # fired for integrations that listen to it directly
+        if hass.bus.async_has_listeners(EVENT_TIME_CHANGED):
+            hass.bus.async_fire(
+                EVENT_TIME_CHANGED,
+                {ATTR_NOW: now},
+                time_fired=now,
+                context=timer_context,
+            )
 
         # If we are more than a second late, a tick was missed
         if (late := monotonic() - target) > 1:
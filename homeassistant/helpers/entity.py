@@ -3,14 +3,17 @@ from __future__ import annotations
 
 from abc import ABC
 import asyncio
-from collections.abc import Awaitable, Iterable, Mapping, MutableMapping
+from collections.abc import Awaitable, Iterable, Iterator, Mapping, MutableMapping
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import functools as ft
 import logging
 import math
+from operator import is_
 import sys
 from timeit import default_timer as timer
+from types import MappingProxyType
 from typing import Any, Final, Literal, TypedDict, final
 
 import voluptuous as vol
@@ -48,6 +51,7 @@ from homeassistant.util import dt as dt_util, ensure_unique_string, slugify
 _LOGGER = logging.getLogger(__name__)
 SLOW_UPDATE_WARNING = 10
 DATA_ENTITY_SOURCE = "entity_info"
+DATA_STATE_WRITE_BATCH = "entity_state_write_batch"
 SOURCE_CONFIG_ENTRY = "config_entry"
 SOURCE_PLATFORM_CONFIG = "platform_config"
 
@@ -66,6 +70,28 @@ def entity_sources(hass: HomeAssistant) -> dict[str, dict[str, str]]:
     return hass.data.get(DATA_ENTITY_SOURCE, {})
 
 
+@contextmanager
+def async_batch_state_writes(hass: HomeAssistant) -> Iterator[None]:
+    """Write the states of the entities updated in the block at once.
+
+    States are collected while the block runs and written with
+    StateMachine.async_set_many when it exits. The block must not yield
+    to the event loop.
+    """
+    if DATA_STATE_WRITE_BATCH in hass.data:
+        yield
+        return
+
+    batch: list[tuple[str, str, Mapping[str, Any], bool, Context | None]] = []
+    hass.data[DATA_STATE_WRITE_BATCH] = batch
+    try:
+        yield
+    finally:
+        del hass.data[DATA_STATE_WRITE_BATCH]
+        if batch:
+            hass.states.async_set_many(batch)
+
+
 def generate_entity_id(
     entity_id_format: str,
     name: str | None,
@@ -260,6 +286,11 @@ class Entity(ABC):
     _context: Context | None = None
     _context_set: datetime | None = None
 
+    # Attributes written to the state machine last
+    _written_attributes: MappingProxyType[str, Any] | None = None
+    # Version and state attributes read last with a version
+    _versioned_attributes: tuple[Any, dict[str, Any]] | None = None
+
     # If entity is added to an entity platform
     _added = False
 
@@ -279,6 +310,7 @@ class Entity(ABC):
     _attr_name: str | None
     _attr_should_poll: bool = True
     _attr_state: StateType = STATE_UNKNOWN
+    _attr_state_attributes_version: Any = None
     _attr_supported_features: int | None = None
     _attr_unique_id: str | None = None
     _attr_unit_of_measurement: str | None
@@ -350,6 +382,17 @@ class Entity(ABC):
             return self._attr_extra_state_attributes
         return None
 
+    @property
+    def state_attributes_version(self) -> Any:
+        """Return the version of the state and extra state attributes.
+
+        While the version is not None and does not change, the state
+        attributes and extra state attributes are not read again and the
+        state machine does not compare them. Entities with large attributes,
+        such as forecasts, should change it whenever those attributes change.
+        """
+        return self._attr_state_attributes_version
+
     @property
     def device_info(self) -> DeviceInfo | None:
         """Return device specific attributes.
@@ -516,6 +559,41 @@ class Entity(ABC):
             return f"{state:.{FLOAT_PRECISION}}"
         return str(state)
 
+    @callback
+    def _async_state_attributes(self) -> dict[str, Any]:
+        """Return the state and extra state attributes to write."""
+        version = self.state_attributes_version
+        if (
+            version is not None
+            and (versioned := self._versioned_attributes) is not None
+            and versioned[0] == version
+        ):
+            return versioned[1]
+
+        attr = dict(self.state_attributes or {})
+        extra_state_attributes = self.extra_state_attributes
+        # Backwards compatibility for "device_state_attributes" deprecated in 2021.4
+        # Warning added in 2021.12, will be removed in 2022.4
+        if (
+            self.device_state_attributes is not None
+            and not self._deprecated_device_state_attributes_reported
+        ):
+            report_issue = self._suggest_report_issue()
+            _LOGGER.warning(
+                "Entity %s (%s) implements device_state_attributes. Please %s",
+                self.entity_id,
+                type(self),
+                report_issue,
+            )
+            self._deprecated_device_state_attributes_reported = True
+        if extra_state_attributes is None:
+            extra_state_attributes = self.device_state_attributes
+        attr.update(extra_state_attributes or {})
+
+        if version is not None:
+            self._versioned_attributes = (version, attr)
+        return attr
+
     @callback
     def _async_write_ha_state(self) -> None:
         """Write the state to the state machine."""
@@ -537,25 +615,7 @@ class Entity(ABC):
 
         state = self._stringify_state()
         if self.available:
-            attr.update(self.state_attributes or {})
-            extra_state_attributes = self.extra_state_attributes
-            # Backwards compatibility for "device_state_attributes" deprecated in 2021.4
-            # Warning added in 2021.12, will be removed in 2022.4
-            if (
-                self.device_state_attributes is not None
-                and not self._deprecated_device_state_attributes_reported
-            ):
-                report_issue = self._suggest_report_issue()
-                _LOGGER.warning(
-                    "Entity %s (%s) implements device_state_attributes. Please %s",
-                    self.entity_id,
-                    type(self),
-                    report_issue,
-                )
-                self._deprecated_device_state_attributes_reported = True
-            if extra_state_attributes is None:
-                extra_state_attributes = self.device_state_attributes
-            attr.update(extra_state_attributes or {})
+            attr.update(self._async_state_attributes())
 
         unit_of_measurement = self.unit_of_measurement
         if unit_of_measurement is not None:
@@ -626,8 +686,25 @@ class Entity(ABC):
             self._context = None
             self._context_set = None
 
+        # When every attribute is the same object as last time, pass the
+        # written attributes through so the state machine does not compare
+        if (
+            (written_attributes := self._written_attributes) is not None
+            and attr.keys() == written_attributes.keys()
+            and all(map(is_, attr.values(), written_attributes.values()))
+        ):
+            attributes = written_attributes
+        else:
+            attributes = self._written_attributes = MappingProxyType(attr)
+
+        if DATA_STATE_WRITE_BATCH in self.hass.data:
+            self.hass.data[DATA_STATE_WRITE_BATCH].append(
+                (self.entity_id, state, attributes, self.force_update, self._context)
+            )
+            return
+
         self.hass.states.async_set(
-            self.entity_id, state, attr, self.force_update, self._context
+            self.entity_id, state, attributes, self.force_update, self._context
         )
 
     def schedule_update_ha_state(self, force_refresh: bool = False) -> None:
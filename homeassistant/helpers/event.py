@@ -36,7 +36,13 @@ from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
 from homeassistant.helpers.ratelimit import KeyedRateLimit
 from homeassistant.helpers.sun import get_astral_event_next
-from homeassistant.helpers.template import RenderInfo, Template, result_as_boolean
+from homeassistant.helpers.template import (
+    RenderInfo,
+    Template,
+    render_source_cv,
+    result_as_boolean,
+)
+from homeassistant.helpers.trace import trace_id_get
 from homeassistant.helpers.typing import TemplateVarsType
 from homeassistant.loader import bind_hass
 from homeassistant.util import dt as dt_util
@@ -51,6 +57,8 @@ TRACK_STATE_ADDED_DOMAIN_LISTENER = "track_state_added_domain_listener"
 TRACK_STATE_REMOVED_DOMAIN_CALLBACKS = "track_state_removed_domain_callbacks"
 TRACK_STATE_REMOVED_DOMAIN_LISTENER = "track_state_removed_domain_listener"
 
+TRACK_STATE_DOMAIN_BATCHERS = "track_state_domain_batchers"
+
 TRACK_ENTITY_REGISTRY_UPDATED_CALLBACKS = "track_entity_registry_updated_callbacks"
 TRACK_ENTITY_REGISTRY_UPDATED_LISTENER = "track_entity_registry_updated_listener"
 
@@ -512,6 +520,153 @@ def async_track_state_removed_domain(
     return remove_listener
 
 
+class _BatchedDomainListener:
+    """A listener of a _DomainStateChangeBatcher."""
+
+    __slots__ = ("job", "replay_job", "skip_entities")
+
+    def __init__(self, action: Callable[..., Any], skip_entities: set[str]) -> None:
+        """Initialize the listener."""
+        self.job = HassJob(action)
+        self.replay_job = HassJob(ft.partial(action, replayed=True))
+        # Entities the listener already tracks on its own
+        self.skip_entities = skip_entities
+
+
+class _DomainStateChangeBatcher:
+    """Dispatch the state changes of whole domains in batches.
+
+    All listeners with the same window share one state_changed listener.
+    The first change in a domain is dispatched right away and opens a
+    window. Later changes in the window are coalesced and the last of them
+    is dispatched once, as replayed, when the window closes. Listeners are
+    not passed changes of the entities they skip.
+    """
+
+    def __init__(self, hass: HomeAssistant, window: timedelta) -> None:
+        """Initialize the batcher."""
+        self.hass = hass
+        self._window = window.total_seconds()
+        self._callbacks: dict[str, list[_BatchedDomainListener]] = {}
+        # The last event of each entity changed in a window, oldest first
+        self._pending: dict[str, dict[str, Event]] = {}
+        self._windows: dict[str, asyncio.TimerHandle] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add(
+        self, domains: Iterable[str], listener: _BatchedDomainListener
+    ) -> None:
+        """Add a listener for state changes in domains."""
+        for domain in domains:
+            self._callbacks.setdefault(domain, []).append(listener)
+        if self._unsub is None:
+            self._unsub = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED,
+                self._async_state_listener,
+                event_filter=self._async_state_filter,
+            )
+
+    @callback
+    def async_remove(
+        self, domains: Iterable[str], listener: _BatchedDomainListener
+    ) -> bool:
+        """Remove a listener, return True if no listeners are left."""
+        for domain in domains:
+            self._callbacks[domain].remove(listener)
+            if self._callbacks[domain]:
+                continue
+            del self._callbacks[domain]
+            self._pending.pop(domain, None)
+            if (timer := self._windows.pop(domain, None)) is not None:
+                timer.cancel()
+        if self._callbacks:
+            return False
+        assert self._unsub is not None
+        self._unsub()
+        self._unsub = None
+        return True
+
+    @callback
+    def _async_state_filter(self, event: Event) -> bool:
+        """Filter state changes by domain."""
+        return split_entity_id(event.data["entity_id"])[0] in self._callbacks
+
+    @callback
+    def _async_state_listener(self, event: Event) -> None:
+        """Dispatch a state change or coalesce it while its window is open."""
+        entity_id = event.data["entity_id"]
+        domain = split_entity_id(entity_id)[0]
+        if domain not in self._windows:
+            self._async_dispatch(domain, {entity_id: event}, False)
+            return
+        pending = self._pending.setdefault(domain, {})
+        pending.pop(entity_id, None)
+        pending[entity_id] = event
+
+    @callback
+    def _async_window_closed(self, domain: str) -> None:
+        """Dispatch the changes coalesced while the window was open."""
+        del self._windows[domain]
+        if (pending := self._pending.pop(domain, None)) is not None:
+            self._async_dispatch(domain, pending, True)
+
+    @callback
+    def _async_dispatch(
+        self, domain: str, events: dict[str, Event], replayed: bool
+    ) -> None:
+        """Dispatch the last event each listener does not skip and open a window."""
+        self._windows[domain] = self.hass.loop.call_later(
+            self._window, self._async_window_closed, domain
+        )
+        for listener in list(self._callbacks.get(domain, ())):
+            for entity_id in reversed(events):
+                if entity_id not in listener.skip_entities:
+                    break
+            else:
+                continue
+            event = events[entity_id]
+            try:
+                self.hass.async_run_hass_job(
+                    listener.replay_job if replayed else listener.job, event
+                )
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception(
+                    "Error while processing event %s for domain %s", event, domain
+                )
+
+
+@callback
+def _async_track_state_change_domain_batched(
+    hass: HomeAssistant,
+    domains: Iterable[str],
+    action: Callable[..., Any],
+    window: timedelta,
+    skip_entities: set[str],
+) -> CALLBACK_TYPE:
+    """Track all state changes in domains, batched per window.
+
+    Changes of the entities in skip_entities, a set that may be updated
+    while tracking, are not passed to the action.
+    """
+    batchers: dict[timedelta, _DomainStateChangeBatcher] = hass.data.setdefault(
+        TRACK_STATE_DOMAIN_BATCHERS, {}
+    )
+    if (batcher := batchers.get(window)) is None:
+        batcher = batchers[window] = _DomainStateChangeBatcher(hass, window)
+    listener = _BatchedDomainListener(action, skip_entities)
+    domains = list(domains)
+    batcher.async_add(domains, listener)
+
+    @callback
+    def remove_listener() -> None:
+        """Remove the state change listener."""
+        if batcher.async_remove(domains, listener):
+            del batchers[window]
+
+    return remove_listener
+
+
 @callback
 def _async_string_to_lower_list(instr: str | Iterable[str]) -> list[str]:
     if isinstance(instr, str):
@@ -528,12 +683,16 @@ class _TrackStateChangeFiltered:
         hass: HomeAssistant,
         track_states: TrackStates,
         action: Callable[[Event], Any],
+        domains_window: timedelta | None = None,
     ) -> None:
         """Handle removal / refresh of tracker init."""
         self.hass = hass
         self._action = action
         self._listeners: dict[str, Callable] = {}
         self._last_track_states: TrackStates = track_states
+        self._domains_window = domains_window
+        # Entities with their own listener, skipped by the batched domains
+        self._entities_listened: set[str] = set()
 
     @callback
     def async_setup(self) -> None:
@@ -565,10 +724,16 @@ class _TrackStateChangeFiltered:
         }
 
     @callback
-    def async_update_listeners(self, new_track_states: TrackStates) -> None:
+    def async_update_listeners(
+        self,
+        new_track_states: TrackStates,
+        domains_window: timedelta | None = None,
+    ) -> None:
         """Update the listeners based on the new TrackStates."""
         last_track_states = self._last_track_states
         self._last_track_states = new_track_states
+        window_changed = domains_window != self._domains_window
+        self._domains_window = domains_window
 
         had_all_listener = last_track_states.all_states
 
@@ -583,7 +748,9 @@ class _TrackStateChangeFiltered:
         if had_all_listener:
             self._cancel_listener(_ALL_LISTENER)
 
-        domains_changed = new_track_states.domains != last_track_states.domains
+        domains_changed = (
+            window_changed or new_track_states.domains != last_track_states.domains
+        )
 
         if had_all_listener or domains_changed:
             domains_changed = True
@@ -615,7 +782,8 @@ class _TrackStateChangeFiltered:
 
     @callback
     def _setup_entities_listener(self, domains: set[str], entities: set[str]) -> None:
-        if domains:
+        self._entities_listened.clear()
+        if domains and self._domains_window is None:
             entities = entities.copy()
             entities.update(self.hass.states.async_entity_ids(domains))
 
@@ -623,6 +791,8 @@ class _TrackStateChangeFiltered:
         if not entities:
             return
 
+        if self._domains_window is not None:
+            self._entities_listened.update(entities)
         self._listeners[_ENTITIES_LISTENER] = async_track_state_change_event(
             self.hass, entities, self._action
         )
@@ -632,6 +802,18 @@ class _TrackStateChangeFiltered:
         if not domains:
             return
 
+        if self._domains_window is not None:
+            self._listeners[
+                _DOMAINS_LISTENER
+            ] = _async_track_state_change_domain_batched(
+                self.hass,
+                domains,
+                self._action,
+                self._domains_window,
+                self._entities_listened,
+            )
+            return
+
         self._listeners[_DOMAINS_LISTENER] = async_track_state_added_domain(
             self.hass, domains, self._action
         )
@@ -649,6 +831,7 @@ def async_track_state_change_filtered(
     hass: HomeAssistant,
     track_states: TrackStates,
     action: Callable[[Event], Any],
+    domains_window: timedelta | None = None,
 ) -> _TrackStateChangeFiltered:
     """Track state changes with a TrackStates filter that can be updated.
 
@@ -660,6 +843,11 @@ def async_track_state_change_filtered(
         A TrackStates data class.
     action
         Callable to call with results.
+    domains_window
+        When set, changes in the tracked domains are dispatched through a
+        listener shared with all trackers using the same window. Changes
+        within a window are coalesced and the last one is passed to the
+        action with replayed=True when the window closes.
 
     Returns
     -------
@@ -667,7 +855,7 @@ def async_track_state_change_filtered(
     cancel the tracking (async_remove).
 
     """
-    tracker = _TrackStateChangeFiltered(hass, track_states, action)
+    tracker = _TrackStateChangeFiltered(hass, track_states, action, domains_window)
     tracker.async_setup()
     return tracker
 
@@ -770,10 +958,18 @@ class _TrackTemplateResultInfo:
         track_templates: Sequence[TrackTemplate],
         action: Callable,
         has_super_template: bool = False,
+        owner: str | None = None,
     ) -> None:
         """Handle removal / refresh of tracker init."""
         self.hass = hass
         self._job = HassJob(action)
+        if owner is None:
+            if (trace_id := trace_id_get()) is not None:
+                owner = trace_id[0]
+            else:
+                module = getattr(action, "__module__", None)
+                owner = f"{module}.{getattr(action, '__qualname__', action)}"
+        self._owner = owner
 
         for track_template_ in track_templates:
             track_template_.template.hass = hass
@@ -794,11 +990,7 @@ class _TrackTemplateResultInfo:
 
         # Render the super template first
         if super_template is not None:
-            template = super_template.template
-            variables = super_template.variables
-            self._info[template] = info = template.async_render_to_info(
-                variables, strict=strict
-            )
+            info = self._render_to_info(super_template, "setup", strict=strict)
 
             # If the super template did not render to True, don't update other templates
             try:
@@ -815,11 +1007,7 @@ class _TrackTemplateResultInfo:
         for track_template_ in self._track_templates:
             if block_render or track_template_ == super_template:
                 continue
-            template = track_template_.template
-            variables = track_template_.variables
-            self._info[template] = info = template.async_render_to_info(
-                variables, strict=strict
-            )
+            info = self._render_to_info(track_template_, "setup", strict=strict)
 
             if info.exception:
                 if raise_on_template_error:
@@ -831,7 +1019,10 @@ class _TrackTemplateResultInfo:
                 )
 
         self._track_state_changes = async_track_state_change_filtered(
-            self.hass, _render_infos_to_track_states(self._info.values()), self._refresh
+            self.hass,
+            _render_infos_to_track_states(self._info.values()),
+            self._refresh,
+            self._domains_window(),
         )
         self._update_time_listeners()
         _LOGGER.debug(
@@ -841,6 +1032,28 @@ class _TrackTemplateResultInfo:
             block_render,
         )
 
+    @callback
+    def _domains_window(self) -> timedelta | None:
+        """Return the window to batch changes of tracked domains in.
+
+        Domain changes are rate limited, so they are only dispatched once
+        per the shortest rate limit of the templates tracking domains.
+        """
+        windows = []
+        for track_template_ in self._track_templates:
+            info = self._info.get(track_template_.template)
+            if info is None or not (info.domains or info.domains_lifecycle):
+                continue
+            if track_template_.rate_limit is not None:
+                windows.append(track_template_.rate_limit)
+            elif info.rate_limit is not None:
+                windows.append(info.rate_limit)
+            else:
+                return None
+        if not windows or not (window := min(windows)):
+            return None
+        return window
+
     @property
     def listeners(self) -> dict:
         """State changes that will cause a re-render."""
@@ -894,14 +1107,46 @@ class _TrackTemplateResultInfo:
         """Force recalculate the template."""
         self._refresh(None)
 
+    def _render_to_info(
+        self,
+        track_template_: TrackTemplate,
+        trigger: str,
+        last_info: RenderInfo | None = None,
+        strict: bool = False,
+    ) -> RenderInfo:
+        """Render a template on behalf of the owner of the tracker.
+
+        The last render is reused if it is passed and the states it
+        read are unchanged.
+        """
+        template = track_template_.template
+        token = render_source_cv.set((self._owner, trigger))
+        try:
+            if last_info is not None:
+                info = template.async_render_to_info_memoized(
+                    last_info, track_template_.variables
+                )
+            else:
+                info = template.async_render_to_info(
+                    track_template_.variables, strict=strict
+                )
+        finally:
+            render_source_cv.reset(token)
+        self._info[template] = info
+        return info
+
     def _render_template_if_ready(
         self,
         track_template_: TrackTemplate,
         now: datetime,
         event: Event | None,
+        memoize: bool = False,
     ) -> bool | TrackTemplateResult:
         """Re-render the template if conditions match.
 
+        If memoize is True the last render is reused when the states
+        it read are unchanged.
+
         Returns False if the template was not re-rendered.
 
         Returns True if the template re-rendered and did not
@@ -938,8 +1183,10 @@ class _TrackTemplateResultInfo:
             )
 
         self._rate_limit.async_triggered(template, now)
-        self._info[template] = info = template.async_render_to_info(
-            track_template_.variables
+        info = self._render_to_info(
+            track_template_,
+            event.data[ATTR_ENTITY_ID] if event else "refresh",
+            self._info.get(template) if memoize else None,
         )
 
         try:
@@ -988,6 +1235,10 @@ class _TrackTemplateResultInfo:
         updates = []
         info_changed = False
         now = event.time_fired if not replayed and event else dt_util.utcnow()
+        # Renders caused by state changes can reuse results when the states a
+        # template read are unchanged, a refresh always renders as templates
+        # can read more than states
+        memoize = event is not None
 
         def _apply_update(
             update: bool | TrackTemplateResult, template: Template
@@ -1010,7 +1261,7 @@ class _TrackTemplateResultInfo:
 
         # Update the super template first
         if super_template is not None:
-            update = self._render_template_if_ready(super_template, now, event)
+            update = self._render_template_if_ready(super_template, now, event, memoize)
             info_changed |= _apply_update(update, super_template.template)
 
             if isinstance(update, TrackTemplateResult):
@@ -1041,7 +1292,9 @@ class _TrackTemplateResultInfo:
                 if track_template_ == super_template:
                     continue
 
-                update = self._render_template_if_ready(track_template_, now, event)
+                update = self._render_template_if_ready(
+                    track_template_, now, event, memoize
+                )
                 info_changed |= _apply_update(update, track_template_.template)
 
         if info_changed:
@@ -1054,7 +1307,8 @@ class _TrackTemplateResultInfo:
                         else info
                         for template, info in self._info.items()
                     ]
-                )
+                ),
+                self._domains_window(),
             )
             _LOGGER.debug(
                 "Template group %s listens for %s, re-render blocker by super template: %s",
@@ -1100,6 +1354,7 @@ def async_track_template_result(
     raise_on_template_error: bool = False,
     strict: bool = False,
     has_super_template: bool = False,
+    owner: str | None = None,
 ) -> _TrackTemplateResultInfo:
     """Add a listener that fires when the result of a template changes.
 
@@ -1133,6 +1388,9 @@ def async_track_template_result(
     has_super_template
         When set to True, the first template will block rendering of other
         templates if it doesn't render as True.
+    owner
+        What the renders are attributed to by the template profiler,
+        defaults to the running automation or script, or the action.
 
     Returns
     -------
@@ -1140,7 +1398,7 @@ def async_track_template_result(
 
     """
     tracker = _TrackTemplateResultInfo(
-        hass, track_templates, action, has_super_template
+        hass, track_templates, action, has_super_template, owner
     )
     tracker.async_setup(raise_on_template_error, strict=strict)
     return tracker
@@ -1582,7 +1840,9 @@ def _event_triggers_rerender(event: Event, info: RenderInfo) -> bool:
     entity_id = cast(str, event.data.get(ATTR_ENTITY_ID))
 
     if info.filter(entity_id):
-        return True
+        return info.state_change_affects_render(
+            entity_id, event.data.get("old_state"), event.data.get("new_state")
+        )
 
     if (
         event.data.get("new_state") is not None
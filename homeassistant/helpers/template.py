@@ -10,8 +10,11 @@ from contextlib import contextmanager, suppress
 from contextvars import ContextVar
 from datetime import datetime, timedelta
 from functools import partial, wraps
+import hashlib
+from importlib.util import MAGIC_NUMBER
 import json
 import logging
+import marshal
 import math
 from operator import attrgetter
 import random
@@ -19,6 +22,8 @@ import re
 import statistics
 from struct import error as StructError, pack, unpack_from
 import sys
+from time import monotonic
+from types import CodeType
 from typing import Any, cast
 from urllib.parse import urlencode as urllib_urlencode
 import weakref
@@ -35,9 +40,14 @@ from homeassistant.const import (
     ATTR_LONGITUDE,
     ATTR_UNIT_OF_MEASUREMENT,
     LENGTH_METERS,
+    EVENT_HOMEASSISTANT_CLOSE,
+    EVENT_HOMEASSISTANT_STARTED,
+    EVENT_HOMEASSISTANT_STOP,
     STATE_UNKNOWN,
+    __version__,
 )
 from homeassistant.core import (
+    Event,
     HomeAssistant,
     State,
     callback,
@@ -51,6 +61,8 @@ from homeassistant.helpers import (
     entity_registry,
     location as loc_helper,
 )
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.trace import trace_add_template_render, trace_id_get
 from homeassistant.helpers.typing import TemplateVarsType
 from homeassistant.loader import bind_hass
 from homeassistant.util import convert, dt as dt_util, location as loc_util
@@ -67,6 +79,12 @@ _RENDER_INFO = "template.render_info"
 _ENVIRONMENT = "template.environment"
 _ENVIRONMENT_LIMITED = "template.environment_limited"
 _ENVIRONMENT_STRICT = "template.environment_strict"
+_BYTECODE_CACHE = "template.bytecode_cache"
+_PROFILER = "template.profiler"
+
+BYTECODE_STORAGE_KEY = "template.bytecode"
+BYTECODE_STORAGE_VERSION = 1
+BYTECODE_SAVE_DELAY = 60
 
 _RE_JINJA_DELIMITERS = re.compile(r"\{%|\{\{|\{#")
 # Match "simple" ints and floats. -1.0, 1, +5, 5.0
@@ -76,6 +94,11 @@ _RESERVED_NAMES = {"contextfunction", "evalcontextfunction", "environmentfunctio
 
 _GROUP_DOMAIN_PREFIX = "group."
 
+# Owner of the templates rendered and what caused them to render
+render_source_cv: ContextVar[tuple[str, str] | None] = ContextVar(
+    "render_source_cv", default=None
+)
+
 _COLLECTABLE_STATE_ATTRIBUTES = {
     "state",
     "attributes",
@@ -235,8 +258,16 @@ class RenderInfo:
         self.domains: collections.abc.Set[str] = set()
         self.domains_lifecycle: collections.abc.Set[str] = set()
         self.entities: collections.abc.Set[str] = set()
+        # The state fields and attributes read from each entity, None when
+        # the entity was used in a way that depends on the whole state
+        self.entity_fields: dict[str, set[str] | None] = {}
+        self.entity_attributes: dict[str, set[str]] = {}
         self.rate_limit: timedelta | None = None
         self.has_time = False
+        # The states read by the render and the variables it used, set when
+        # the result depends on nothing else and can be memoized
+        self._input_states: dict[str, State | None] | None = None
+        self._variables: TemplateVarsType = None
 
     def __repr__(self) -> str:
         """Representation of RenderInfo."""
@@ -256,6 +287,41 @@ class RenderInfo:
         """Template should re-render if the entity is added or removed with domains watched."""
         return split_entity_id(entity_id)[0] in self.domains_lifecycle
 
+    def state_change_affects_render(
+        self, entity_id: str, old_state: State | None, new_state: State | None
+    ) -> bool:
+        """Return if a state change can alter the result of the template.
+
+        Changes can only be skipped for entities the template referenced
+        directly and read specific fields or attributes from.
+        """
+        if (
+            old_state is None
+            or new_state is None
+            or self.all_states
+            or (fields := self.entity_fields.get(entity_id)) is None
+            or split_entity_id(entity_id)[0] in self.domains
+        ):
+            return True
+
+        for field in fields:
+            if (old_value := getattr(old_state, field)) is not (
+                new_value := getattr(new_state, field)
+            ) and old_value != new_value:
+                return True
+
+        if (attributes := self.entity_attributes.get(entity_id)) is None:
+            return False
+        old_attributes = old_state.attributes
+        new_attributes = new_state.attributes
+        if old_attributes is new_attributes:
+            return False
+        return any(
+            old_attributes.get(attribute, _SENTINEL)
+            != new_attributes.get(attribute, _SENTINEL)
+            for attribute in attributes
+        )
+
     def result(self) -> str:
         """Results of the template computation."""
         if self.exception is not None:
@@ -272,6 +338,40 @@ class RenderInfo:
         self.domains = frozenset(self.domains)
         self.domains_lifecycle = frozenset(self.domains_lifecycle)
 
+    def _collect_input_states(
+        self, hass: HomeAssistant, variables: TemplateVarsType
+    ) -> None:
+        """Remember the states read so the result can be memoized."""
+        if (
+            self.exception
+            or not self.entities
+            or self.all_states
+            or self.all_states_lifecycle
+            or self.domains
+            or self.domains_lifecycle
+            or self.has_time
+        ):
+            return
+        self._input_states = {
+            entity_id: hass.states.get(entity_id) for entity_id in self.entities
+        }
+        self._variables = variables
+
+    def _inputs_unchanged(
+        self, hass: HomeAssistant, variables: TemplateVarsType
+    ) -> bool:
+        """Return if rendering again would read the same states."""
+        if self._input_states is None or variables is not self._variables:
+            return False
+        for entity_id, old_state in self._input_states.items():
+            if (new_state := hass.states.get(entity_id)) is not old_state and (
+                old_state is None
+                or new_state is None
+                or self.state_change_affects_render(entity_id, old_state, new_state)
+            ):
+                return False
+        return True
+
     def _freeze(self) -> None:
         self._freeze_sets()
 
@@ -314,6 +414,8 @@ class Template:
         "_exc_info",
         "_limited",
         "_strict",
+        "memo_hits",
+        "memo_misses",
     )
 
     def __init__(self, template, hass=None):
@@ -322,6 +424,8 @@ class Template:
             raise TypeError("Expected template to be a string")
 
         self.template: str = template.strip()
+        self.memo_hits = 0
+        self.memo_misses = 0
         self._compiled_code = None
         self._compiled: jinja2.Template | None = None
         self.hass = hass
@@ -343,6 +447,7 @@ class Template:
         ret: TemplateEnvironment | None = self.hass.data.get(wanted_env)
         if ret is None:
             ret = self.hass.data[wanted_env] = TemplateEnvironment(self.hass, self._limited, self._strict)  # type: ignore[no-untyped-call]
+            ret.code_cache = self.hass.data.get(_BYTECODE_CACHE)
         return ret
 
     def ensure_valid(self) -> None:
@@ -402,10 +507,15 @@ class Template:
         if variables is not None:
             kwargs.update(variables)
 
+        if (profiler := self.hass.data.get(_PROFILER)) is not None:
+            start = monotonic()
         try:
             render_result = _render_with_context(self.template, compiled, **kwargs)
         except Exception as err:
             raise TemplateError(err) from err
+        finally:
+            if profiler is not None:
+                profiler.async_record(self.template, monotonic() - start)
 
         render_result = render_result.strip()
 
@@ -525,9 +635,27 @@ class Template:
         finally:
             del self.hass.data[_RENDER_INFO]
 
+        if not kwargs:
+            render_info._collect_input_states(self.hass, variables)
         render_info._freeze()
         return render_info
 
+    @callback
+    def async_render_to_info_memoized(
+        self, last_info: RenderInfo, variables: TemplateVarsType = None
+    ) -> RenderInfo:
+        """Render the template unless the states the last render read are unchanged.
+
+        The last RenderInfo is returned as is when rendering again would
+        produce the same result.
+        """
+        # pylint: disable=protected-access
+        if last_info._inputs_unchanged(self.hass, variables):
+            self.memo_hits += 1
+            return last_info
+        self.memo_misses += 1
+        return self.async_render_to_info(variables)
+
     def render_with_possible_json_value(self, value, error_value=_SENTINEL):
         """Render template with value exposed.
 
@@ -731,16 +859,43 @@ class TemplateState(State):
 
     def _collect_state(self) -> None:
         if self._collect and _RENDER_INFO in self._hass.data:
-            self._hass.data[_RENDER_INFO].entities.add(self._state.entity_id)
+            _collect_state(self._hass, self._state.entity_id)
+
+    def _collect_field(self, field: str) -> RenderInfo | None:
+        """Collect the state and the field read from it."""
+        if (
+            not self._collect
+            or (render_info := self._hass.data.get(_RENDER_INFO)) is None
+        ):
+            return None
+        entity_id = self._state.entity_id
+        render_info.entities.add(entity_id)
+        if (
+            fields := render_info.entity_fields.setdefault(entity_id, set())
+        ) is not None:
+            fields.add(field)
+        return render_info
+
+    def _collected_attributes(self) -> collections.abc.Mapping[str, Any]:
+        """Return the attributes, collecting the ones the template reads."""
+        if (
+            not self._collect
+            or (render_info := self._hass.data.get(_RENDER_INFO)) is None
+        ):
+            return self._state.attributes
+        entity_id = self._state.entity_id
+        render_info.entities.add(entity_id)
+        render_info.entity_fields.setdefault(entity_id, set())
+        return TemplateStateAttributes(self._state, render_info)
 
     # Jinja will try __getitem__ first and it avoids the need
     # to call is_safe_attribute
     def __getitem__(self, item):
         """Return a property as an attribute for jinja."""
         if item in _COLLECTABLE_STATE_ATTRIBUTES:
-            # _collect_state inlined here for performance
-            if self._collect and _RENDER_INFO in self._hass.data:
-                self._hass.data[_RENDER_INFO].entities.add(self._state.entity_id)
+            if item == "attributes":
+                return self._collected_attributes()
+            self._collect_field(item)
             return getattr(self._state, item)
         if item == "entity_id":
             return self._state.entity_id
@@ -759,55 +914,57 @@ class TemplateState(State):
     @property
     def state(self):
         """Wrap State.state."""
-        self._collect_state()
+        self._collect_field("state")
         return self._state.state
 
     @property
     def attributes(self):
         """Wrap State.attributes."""
-        self._collect_state()
-        return self._state.attributes
+        return self._collected_attributes()
 
     @property
     def last_changed(self):
         """Wrap State.last_changed."""
-        self._collect_state()
+        self._collect_field("last_changed")
         return self._state.last_changed
 
     @property
     def last_updated(self):
         """Wrap State.last_updated."""
-        self._collect_state()
+        self._collect_field("last_updated")
         return self._state.last_updated
 
     @property
     def context(self):
         """Wrap State.context."""
-        self._collect_state()
+        self._collect_field("context")
         return self._state.context
 
     @property
     def domain(self):
         """Wrap State.domain."""
-        self._collect_state()
+        self._collect_field("domain")
         return self._state.domain
 
     @property
     def object_id(self):
         """Wrap State.object_id."""
-        self._collect_state()
+        self._collect_field("object_id")
         return self._state.object_id
 
     @property
     def name(self):
         """Wrap State.name."""
-        self._collect_state()
+        self._collect_field("name")
         return self._state.name
 
     @property
     def state_with_unit(self) -> str:
         """Return the state concatenated with the unit if available."""
-        self._collect_state()
+        if (render_info := self._collect_field("state")) is not None:
+            render_info.entity_attributes.setdefault(self._state.entity_id, set()).add(
+                ATTR_UNIT_OF_MEASUREMENT
+            )
         unit = self._state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
         return f"{self._state.state} {unit}" if unit else self._state.state
 
@@ -821,9 +978,49 @@ class TemplateState(State):
         return f"<template TemplateState({self._state.__repr__()})>"
 
 
+class TemplateStateAttributes(collections.abc.Mapping):
+    """Attributes of a state that collect which of them a template reads."""
+
+    __slots__ = ("_state", "_render_info")
+
+    def __init__(self, state: State, render_info: RenderInfo) -> None:
+        """Initialize the attributes."""
+        self._state = state
+        self._render_info = render_info
+
+    def __getitem__(self, key: str) -> Any:
+        """Return an attribute and collect it."""
+        self._render_info.entity_attributes.setdefault(
+            self._state.entity_id, set()
+        ).add(key)
+        return self._state.attributes[key]
+
+    def __iter__(self):
+        """Iterate the attributes, the template depends on all of them."""
+        self._collect_all()
+        return iter(self._state.attributes)
+
+    def __len__(self) -> int:
+        """Return the number of attributes, depending on all of them."""
+        self._collect_all()
+        return len(self._state.attributes)
+
+    def _collect_all(self) -> None:
+        """Collect all attributes."""
+        if (
+            fields := self._render_info.entity_fields.get(self._state.entity_id)
+        ) is not None:
+            fields.add("attributes")
+
+    def __repr__(self) -> str:
+        """Representation of the attributes."""
+        return repr(dict(self._state.attributes))
+
+
 def _collect_state(hass: HomeAssistant, entity_id: str) -> None:
     if (entity_collect := hass.data.get(_RENDER_INFO)) is not None:
         entity_collect.entities.add(entity_id)
+        entity_collect.entity_fields[entity_id] = None
 
 
 def _state_generator(hass: HomeAssistant, domain: str | None) -> Generator:
@@ -1824,6 +2021,7 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
         super().__init__(undefined=undefined)
         self.hass = hass
         self.template_cache = weakref.WeakValueDictionary()
+        self.code_cache: TemplateBytecodeCache | None = None
         self.filters["round"] = forgiving_round
         self.filters["multiply"] = multiply
         self.filters["log"] = logarithm
@@ -2013,9 +2211,188 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
             return super().compile(source, name, filename, raw, defer_init)
 
         if (cached := self.template_cache.get(source)) is None:
-            cached = self.template_cache[source] = super().compile(source)
+            if self.code_cache is None:
+                cached = super().compile(source)
+            else:
+                cached = self.code_cache.compile(source, super().compile)
+            self.template_cache[source] = cached
 
         return cached
 
 
 _NO_HASS_ENV = TemplateEnvironment(None)  # type: ignore[no-untyped-call]
+
+
+def _bytecode_build() -> str:
+    """Return the versions the stored template code is valid for."""
+    return f"{__version__}-{jinja2.__version__}-{MAGIC_NUMBER.hex()}"
+
+
+class TemplateBytecodeCache:
+    """Compiled template code that is kept in storage between restarts.
+
+    The code is keyed by the hash of the template source. Stored code is
+    dropped when Home Assistant, Jinja or Python is upgraded, and only the
+    templates compiled since startup are written back.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store = Store(hass, BYTECODE_STORAGE_VERSION, BYTECODE_STORAGE_KEY)
+        self._stored: dict[str, str] = {}
+        self._used: dict[str, str] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored code if it was written by the same versions."""
+        data = await self._store.async_load()
+        if isinstance(data, dict) and data.get("build") == _bytecode_build():
+            self._stored = data["templates"]
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Schedule writing the code of the templates compiled so far."""
+        self._store.async_delay_save(self._data_to_save, BYTECODE_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to store."""
+        return {"build": _bytecode_build(), "templates": dict(self._used)}
+
+    def compile(
+        self, source: str, compile_source: Callable[[str], CodeType]
+    ) -> CodeType:
+        """Return the stored code of a template or compile it."""
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        if (encoded := self._stored.get(key)) is not None:
+            try:
+                code = marshal.loads(base64.b64decode(encoded))
+            except (EOFError, TypeError, ValueError):
+                _LOGGER.debug("Discarding unreadable stored code for %s", source)
+            else:
+                self._used[key] = encoded
+                return code
+
+        code = compile_source(source)
+        self._used[key] = base64.b64encode(marshal.dumps(code)).decode("ascii")
+        return code
+
+
+class TemplateRenderStats:
+    """Renders and render time of a template."""
+
+    __slots__ = ["renders", "total_time", "max_time", "triggers"]
+
+    def __init__(self) -> None:
+        """Initialize the stats."""
+        self.renders = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.triggers: collections.Counter[str] = collections.Counter()
+
+
+class TemplateProfiler:
+    """Record how often templates render, how long they take and why.
+
+    Renders are attributed to the owner and trigger set in
+    render_source_cv, or else to the automation or script run they
+    are part of.
+    """
+
+    def __init__(self, slow_threshold: float) -> None:
+        """Initialize the profiler."""
+        self.slow_threshold = slow_threshold
+        self.stats: dict[tuple[str, str], TemplateRenderStats] = {}
+
+    @callback
+    def async_record(self, template: str, duration: float) -> None:
+        """Record a render of a template and log it if it was slow."""
+        if (source := render_source_cv.get()) is not None:
+            owner, trigger = source
+        elif (trace_id := trace_id_get()) is not None:
+            owner, trigger = trace_id[0], "run"
+        else:
+            owner, trigger = "unknown", "unknown"
+
+        key = (owner, template)
+        if (stats := self.stats.get(key)) is None:
+            stats = self.stats[key] = TemplateRenderStats()
+        stats.renders += 1
+        stats.total_time += duration
+        if duration > stats.max_time:
+            stats.max_time = duration
+        stats.triggers[trigger] += 1
+        trace_add_template_render(template, duration)
+        if duration > self.slow_threshold:
+            _LOGGER.warning(
+                "Template %s of %s took %.3f seconds", template, owner, duration
+            )
+
+    @callback
+    def async_as_list(self) -> list[dict[str, Any]]:
+        """Return the stats of the templates, slowest first."""
+        return sorted(
+            (
+                {
+                    "owner": owner,
+                    "template": template,
+                    "renders": stats.renders,
+                    "total_time": stats.total_time,
+                    "max_time": stats.max_time,
+                    "triggers": dict(stats.triggers),
+                }
+                for (owner, template), stats in self.stats.items()
+            ),
+            key=lambda template: template["total_time"],  # type: ignore[no-any-return]
+            reverse=True,
+        )
+
+
+@callback
+def async_get_profiler(hass: HomeAssistant) -> TemplateProfiler | None:
+    """Return the running template profiler."""
+    return hass.data.get(_PROFILER)
+
+
+@callback
+def async_start_profiler(
+    hass: HomeAssistant, slow_threshold: float
+) -> TemplateProfiler:
+    """Start recording the renders of templates.
+
+    Renders that take longer than slow_threshold seconds are logged.
+    A running profiler is replaced.
+    """
+    profiler = hass.data[_PROFILER] = TemplateProfiler(slow_threshold)
+    return profiler
+
+
+@callback
+def async_stop_profiler(hass: HomeAssistant) -> TemplateProfiler | None:
+    """Stop the template profiler and return it."""
+    return hass.data.pop(_PROFILER, None)
+
+
+async def async_load_bytecode_cache(hass: HomeAssistant) -> None:
+    """Load the stored template code and compile templates through it."""
+    cache = TemplateBytecodeCache(hass)
+    await cache.async_load()
+    hass.data[_BYTECODE_CACHE] = cache
+
+    _NO_HASS_ENV.code_cache = cache
+    for wanted_env in (_ENVIRONMENT, _ENVIRONMENT_LIMITED, _ENVIRONMENT_STRICT):
+        if (env := hass.data.get(wanted_env)) is not None:
+            env.code_cache = cache
+
+    @callback
+    def _async_save(_: Event) -> None:
+        """Write the compiled code once started and again on shutdown."""
+        cache.async_schedule_save()
+
+    @callback
+    def _async_detach(_: Event) -> None:
+        """Stop compiling templates without hass through the cache."""
+        if _NO_HASS_ENV.code_cache is cache:
+            _NO_HASS_ENV.code_cache = None
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, _async_save)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_save)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_detach)
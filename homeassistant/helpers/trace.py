@@ -23,6 +23,7 @@ class TraceElement:
         self.path: str = path
         self._result: dict[str, Any] | None = None
         self.reuse_by_child = False
+        self._template_renders: list[dict[str, Any]] | None = None
         self._timestamp = dt_util.utcnow()
 
         if variables is None:
@@ -58,6 +59,12 @@ class TraceElement:
         old_result = self._result or {}
         self._result = {**old_result, **kwargs}
 
+    def add_template_render(self, template: str, duration: float) -> None:
+        """Add the render of a template recorded by the template profiler."""
+        if self._template_renders is None:
+            self._template_renders = []
+        self._template_renders.append({"template": template, "duration": duration})
+
     def as_dict(self) -> dict[str, Any]:
         """Return dictionary version of this TraceElement."""
         result: dict[str, Any] = {"path": self.path, "timestamp": self._timestamp}
@@ -74,6 +81,8 @@ class TraceElement:
             result["error"] = str(self._error)
         if self._result is not None:
             result["result"] = self._result
+        if self._template_renders is not None:
+            result["template_renders"] = self._template_renders
         return result
 
 
@@ -202,6 +211,12 @@ def trace_update_result(**kwargs: Any) -> None:
     node.update_result(**kwargs)
 
 
+def trace_add_template_render(template: str, duration: float) -> None:
+    """Add a template render to the TraceElement at the top of the stack."""
+    if node := cast(TraceElement, trace_stack_top(trace_stack_cv)):
+        node.add_template_render(template, duration)
+
+
 class StopReason:
     """Mutable container class for script_execution."""
 
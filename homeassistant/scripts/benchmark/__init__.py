@@ -4,19 +4,23 @@ from __future__ import annotations
 import argparse
 import asyncio
 import collections
-from collections.abc import Callable
-from contextlib import suppress
-from datetime import datetime
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 import json
 import logging
+import os
+import tempfile
 from timeit import default_timer as timer
 from typing import TypeVar
 
-from homeassistant import core
+from homeassistant import config_entries, core
 from homeassistant.components.websocket_api.const import JSON_DUMP
 from homeassistant.const import ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED
 from homeassistant.helpers.entityfilter import convert_include_exclude_filter
 from homeassistant.helpers.json import JSONEncoder
+from homeassistant.setup import async_setup_component
 from homeassistant.util import dt as dt_util
 
 # mypy: allow-untyped-calls, allow-untyped-defs, no-check-untyped-defs
@@ -27,6 +31,21 @@ CALLABLE_T = TypeVar("CALLABLE_T", bound=Callable)  # pylint: disable=invalid-na
 BENCHMARKS: dict[str, Callable] = {}
 
 
+@dataclass
+class RecorderOptions:
+    """Load generated by the recorder benchmarks."""
+
+    entities: int = 100
+    attribute_size: int = 100
+    event_rate: int = 0
+    events: int = 10 ** 5
+    days: int = 30
+    state_interval: int = 300
+
+
+RECORDER_OPTIONS = RecorderOptions()
+
+
 def run(args):
     """Handle benchmark commandline script."""
     # Disable logging
@@ -35,15 +54,64 @@ def run(args):
     parser = argparse.ArgumentParser(description=("Run a Home Assistant benchmark."))
     parser.add_argument("name", choices=BENCHMARKS)
     parser.add_argument("--script", choices=["benchmark"])
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=0,
+        help="Number of runs, runs until interrupted when 0",
+    )
+    recorder_group = parser.add_argument_group("recorder benchmarks")
+    recorder_group.add_argument(
+        "--entities", type=int, default=RECORDER_OPTIONS.entities
+    )
+    recorder_group.add_argument(
+        "--attribute-size",
+        type=int,
+        default=RECORDER_OPTIONS.attribute_size,
+        help="Size in bytes of the attributes of each state",
+    )
+    recorder_group.add_argument(
+        "--event-rate",
+        type=int,
+        default=RECORDER_OPTIONS.event_rate,
+        help="State changes per second to write, unthrottled when 0",
+    )
+    recorder_group.add_argument(
+        "--events",
+        type=int,
+        default=RECORDER_OPTIONS.events,
+        help="Number of state changes to write",
+    )
+    recorder_group.add_argument(
+        "--days",
+        type=int,
+        default=RECORDER_OPTIONS.days,
+        help="Days of history to generate before querying or purging",
+    )
+    recorder_group.add_argument(
+        "--state-interval",
+        type=int,
+        default=RECORDER_OPTIONS.state_interval,
+        help="Seconds between the generated states of an entity",
+    )
 
     args = parser.parse_args()
 
+    RECORDER_OPTIONS.entities = args.entities
+    RECORDER_OPTIONS.attribute_size = args.attribute_size
+    RECORDER_OPTIONS.event_rate = args.event_rate
+    RECORDER_OPTIONS.events = args.events
+    RECORDER_OPTIONS.days = args.days
+    RECORDER_OPTIONS.state_interval = args.state_interval
+
     bench = BENCHMARKS[args.name]
     print("Using event loop:", asyncio.get_event_loop_policy().loop_name)
 
     with suppress(KeyboardInterrupt):
-        while True:
+        runs = 0
+        while not args.runs or runs < args.runs:
             asyncio.run(run_benchmark(bench))
+            runs += 1
 
 
 async def run_benchmark(bench):
@@ -391,6 +459,272 @@ async def json_serialize_states(hass):
     return timer() - start
 
 
+@asynccontextmanager
+async def _async_recorder(hass) -> AsyncIterator:
+    """Run a started Home Assistant with a recorder on a new SQLite database."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.components import recorder
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass.config.config_dir = config_dir
+        hass.config.skip_pip = True
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        db_path = os.path.join(config_dir, "benchmark.db")
+        assert await async_setup_component(
+            hass,
+            recorder.DOMAIN,
+            {recorder.DOMAIN: {"db_url": f"sqlite:///{db_path}", "auto_purge": False}},
+        )
+        await hass.async_start()
+        instance = hass.data[recorder.DATA_INSTANCE]
+        await instance.async_recorder_ready.wait()
+        try:
+            yield instance, db_path
+        finally:
+            await hass.async_stop()
+
+
+def _db_size(db_path):
+    """Return the size of a SQLite database including its write ahead log."""
+    return sum(
+        os.path.getsize(path)
+        for path in (db_path, f"{db_path}-wal")
+        if os.path.exists(path)
+    )
+
+
+def _benchmark_entities(options):
+    """Return entity ids and the attributes to write with them."""
+    return [
+        (
+            f"sensor.benchmark_{idx}",
+            {
+                "friendly_name": f"Benchmark {idx}",
+                "unit_of_measurement": "W",
+                "payload": "x" * options.attribute_size,
+            },
+        )
+        for idx in range(options.entities)
+    ]
+
+
+async def _async_wait_recorder_queue(instance):
+    """Throttle writers while the recorder works through its queue."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.components.recorder.const import MAX_QUEUE_BACKLOG
+
+    while instance.queue.qsize() > MAX_QUEUE_BACKLOG // 2:
+        await asyncio.sleep(0.01)
+
+
+async def _async_recorder_flush(hass, instance):
+    """Commit everything that was queued for the recorder."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.components.recorder import CommitTask
+
+    await hass.async_block_till_done()
+    instance.queue.put(CommitTask())
+    await hass.async_add_executor_job(instance.block_till_done)
+
+
+async def _async_fill_recorder(hass, instance, options):
+    """Write options.days of history and hourly statistics for each entity."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.components.recorder import statistics
+    from homeassistant.components.recorder.models import RecorderRuns
+    from homeassistant.components.recorder.util import session_scope
+
+    entities = _benchmark_entities(options)
+    end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=options.days)
+
+    old_states = {}
+    time = start
+    value = 0
+    while time < end:
+        await _async_wait_recorder_queue(instance)
+        for entity_id, attributes in entities:
+            new_state = core.State(
+                entity_id,
+                str(value % 1000),
+                attributes,
+                last_changed=time,
+                last_updated=time,
+            )
+            hass.bus.async_fire(
+                EVENT_STATE_CHANGED,
+                {
+                    "entity_id": entity_id,
+                    "old_state": old_states.get(entity_id),
+                    "new_state": new_state,
+                },
+                time_fired=time,
+            )
+            old_states[entity_id] = new_state
+            value += 1
+        time += timedelta(seconds=options.state_interval)
+        await asyncio.sleep(0)
+
+    hours = options.days * 24
+    for entity_id, _ in entities:
+        statistics.async_add_external_statistics(
+            hass,
+            {
+                "has_mean": True,
+                "has_sum": False,
+                "name": entity_id,
+                "source": "benchmark",
+                "statistic_id": entity_id.replace("sensor.", "benchmark:"),
+                "unit_of_measurement": "W",
+            },
+            [
+                {
+                    "start": start + timedelta(hours=hour),
+                    "mean": hour % 1000,
+                    "min": hour % 1000 - 1,
+                    "max": hour % 1000 + 1,
+                }
+                for hour in range(hours)
+            ],
+        )
+
+    await _async_recorder_flush(hass, instance)
+
+    def _add_run():
+        """Cover the generated history with a recorder run."""
+        with session_scope(session=instance.get_session()) as session:
+            session.add(RecorderRuns(start=start, end=end, closed_incorrect=False))
+
+    await hass.async_add_executor_job(_add_run)
+    return end
+
+
+@benchmark
+async def recorder_write(hass):
+    """Write state changes to the recorder and report its throughput."""
+    options = RECORDER_OPTIONS
+    entities = _benchmark_entities(options)
+    batch = min(1000, options.event_rate // 10 or 1000) or 1
+    commit_latencies = []
+
+    async with _async_recorder(hass) as (instance, db_path):
+        record_commit = instance.metrics.record_commit
+
+        def _record_commit(rows, latency):
+            """Keep every commit latency."""
+            commit_latencies.append(latency)
+            record_commit(rows, latency)
+
+        instance.metrics.record_commit = _record_commit
+        await _async_recorder_flush(hass, instance)
+        commit_latencies.clear()
+        db_size = _db_size(db_path)
+
+        start = timer()
+        for index in range(options.events):
+            if index % batch == 0:
+                delay = 0.0
+                if options.event_rate:
+                    delay = max(0, start + index / options.event_rate - timer())
+                await asyncio.sleep(delay)
+                await _async_wait_recorder_queue(instance)
+            entity_id, attributes = entities[index % len(entities)]
+            hass.states.async_set(entity_id, str(index), attributes)
+        await _async_recorder_flush(hass, instance)
+        runtime = timer() - start
+
+        db_growth = _db_size(db_path) - db_size
+
+    commit_latencies.sort()
+    print(f"Sustained rate: {options.events / runtime:.0f} events/s")
+    if commit_latencies:
+        print(
+            f"Commits: {len(commit_latencies)}, latency "
+            f"mean {sum(commit_latencies) / len(commit_latencies) * 1000:.1f}ms "
+            f"p95 {commit_latencies[int(len(commit_latencies) * 0.95)] * 1000:.1f}ms "
+            f"max {commit_latencies[-1] * 1000:.1f}ms"
+        )
+    print(
+        f"Database growth: {db_growth} bytes, "
+        f"{db_growth / options.events:.0f} bytes/event"
+    )
+    return runtime
+
+
+@benchmark
+async def recorder_queries(hass):
+    """Query history and statistics over 1, 7 and 30 days of recorded states."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.components.recorder import history, statistics
+
+    options = RECORDER_OPTIONS
+    entity_ids = [entity_id for entity_id, _ in _benchmark_entities(options)]
+    statistic_ids = [
+        entity_id.replace("sensor.", "benchmark:") for entity_id in entity_ids
+    ]
+    runtime = 0.0
+
+    async with _async_recorder(hass) as (instance, _):
+        end = await _async_fill_recorder(hass, instance, options)
+
+        for days in (1, 7, 30):
+            if days > options.days:
+                break
+            start_time = end - timedelta(days=days)
+
+            start = timer()
+            await hass.async_add_executor_job(
+                history.get_significant_states, hass, start_time, end, entity_ids
+            )
+            history_latency = timer() - start
+
+            start = timer()
+            await hass.async_add_executor_job(
+                statistics.statistics_during_period,
+                hass,
+                start_time,
+                end,
+                statistic_ids,
+                "hour",
+            )
+            statistics_latency = timer() - start
+
+            print(
+                f"{days} days: history {history_latency * 1000:.0f}ms, "
+                f"statistics {statistics_latency * 1000:.0f}ms"
+            )
+            runtime += history_latency + statistics_latency
+
+    return runtime
+
+
+@benchmark
+async def recorder_purge(hass):
+    """Purge the older half of the recorded states."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.components.recorder import purge
+
+    options = RECORDER_OPTIONS
+
+    async with _async_recorder(hass) as (instance, db_path):
+        end = await _async_fill_recorder(hass, instance, options)
+        purge_before = end - timedelta(days=options.days / 2)
+        db_size = _db_size(db_path)
+
+        def _purge():
+            """Purge in batches like the recorder does."""
+            while not purge.purge_old_data(instance, purge_before, repack=False):
+                pass
+
+        start = timer()
+        await hass.async_add_executor_job(_purge)
+        runtime = timer() - start
+
+        print(f"Database size before purge: {db_size} bytes")
+
+    return runtime
+
+
 def _create_state_changed_event_from_old_new(
     entity_id, event_time_fired, old_state, new_state
 ):
@@ -406,6 +740,7 @@ def _create_state_changed_event_from_old_new(
         [
             "event_type"
             "event_data"
+            "shared_data"
             "time_fired"
             "context_id"
             "context_user_id"
@@ -413,6 +748,7 @@ def _create_state_changed_event_from_old_new(
             "entity_id"
             "domain"
             "attributes"
+            "shared_attrs"
             "state_id",
             "old_state_id",
         ],
@@ -420,7 +756,9 @@ def _create_state_changed_event_from_old_new(
 
     row.event_type = EVENT_STATE_CHANGED
     row.event_data = "{}"
+    row.shared_data = "{}"
     row.attributes = attributes_json
+    row.shared_attrs = attributes_json
     row.time_fired = event_time_fired
     row.state = new_state and new_state.get("state")
     row.entity_id = entity_id
@@ -5,12 +5,21 @@ from http import HTTPStatus
 import json
 from unittest.mock import patch, sentinel
 
+from aiohttp import ClientPayloadError
 import pytest
 from pytest import approx
+from sqlalchemy.exc import SQLAlchemyError
 
 from homeassistant.components import history, recorder
-from homeassistant.components.recorder.history import get_significant_states
-from homeassistant.components.recorder.models import process_timestamp
+from homeassistant.components.recorder.history import (
+    get_significant_states,
+    stream_significant_states_with_session,
+)
+from homeassistant.components.recorder.models import (
+    Statistics,
+    StatisticsMeta,
+    process_timestamp,
+)
 import homeassistant.core as ha
 from homeassistant.helpers.json import JSONEncoder
 from homeassistant.setup import async_setup_component
@@ -76,6 +85,37 @@ def test_get_significant_states_minimal_response(hass_history):
     assert states == hist
 
 
+@pytest.mark.parametrize("offset", [0, 2])
+@pytest.mark.parametrize("minimal_response", [False, True])
+def test_stream_significant_states(hass_history, minimal_response, offset):
+    """Test streaming the significant states returns the same states."""
+    hass = hass_history
+    zero, four, _ = record_states(hass)
+    zero += timedelta(seconds=offset)
+    hist = get_significant_states(
+        hass,
+        zero,
+        four,
+        filters=history.Filters(),
+        minimal_response=minimal_response,
+    )
+
+    with recorder.session_scope(hass=hass) as session:
+        streamed = {
+            entity_id: list(states)
+            for entity_id, states in stream_significant_states_with_session(
+                hass,
+                session,
+                zero,
+                four,
+                filters=history.Filters(),
+                minimal_response=minimal_response,
+            )
+        }
+
+    assert streamed == hist
+
+
 def test_get_significant_states_with_initial(hass_history):
     """Test that only significant states are returned.
 
@@ -590,6 +630,387 @@ async def test_fetch_period_api(hass, hass_client):
     assert response.status == HTTPStatus.OK
 
 
+@pytest.mark.parametrize("query", ["", "&minimal_response"])
+async def test_fetch_period_api_stream(hass, hass_client, query):
+    """Test the fetch period view streams the same states."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow()
+    for state in ("on", "off", "on"):
+        hass.states.async_set("light.kitchen", state)
+        hass.states.async_set("switch.kitchen", state, {"count": 1})
+    hass.states.async_set("media_player.test", "on")
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    response = await client.get(f"/api/history/period/{start.isoformat()}?{query}")
+    assert response.status == HTTPStatus.OK
+    expected = await response.json()
+
+    with patch.object(history, "STREAM_CHUNK_SIZE", 1):
+        response = await client.get(
+            f"/api/history/period/{start.isoformat()}?stream{query}"
+        )
+    assert response.status == HTTPStatus.OK
+    assert response.headers["Transfer-Encoding"] == "chunked"
+    streamed = await response.json()
+
+    assert len(streamed) == 3
+    assert sorted(streamed, key=lambda states: states[0]["entity_id"]) == sorted(
+        expected, key=lambda states: states[0]["entity_id"]
+    )
+
+
+async def test_fetch_period_api_stream_fails_before_first_chunk(
+    hass, hass_client, caplog
+):
+    """Test a database error before anything is streamed returns an error."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await hass_client()
+
+    with patch(
+        "homeassistant.components.recorder.history."
+        "stream_significant_states_with_session",
+        side_effect=SQLAlchemyError("query failed"),
+    ):
+        response = await client.get(
+            f"/api/history/period/{dt_util.utcnow().isoformat()}?stream"
+        )
+    assert response.status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert "Error streaming history" in caplog.text
+
+
+async def test_fetch_period_api_stream_cut_off(hass, hass_client, caplog):
+    """Test a database error while streaming ends the response incomplete."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await hass_client()
+
+    def _stream_significant_states(*args, **kwargs):
+        yield "light.kitchen", iter([ha.State("light.kitchen", "on")])
+        raise SQLAlchemyError("connection lost")
+
+    with patch.object(history, "STREAM_CHUNK_SIZE", 1), patch(
+        "homeassistant.components.recorder.history."
+        "stream_significant_states_with_session",
+        side_effect=_stream_significant_states,
+    ):
+        response = await client.get(
+            f"/api/history/period/{dt_util.utcnow().isoformat()}?stream"
+        )
+        assert response.status == HTTPStatus.OK
+        with pytest.raises(ClientPayloadError):
+            await response.read()
+    assert "Error streaming history" in caplog.text
+
+
+async def _async_record_compressible_states(hass):
+    """Record states of a light which change state and attributes."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow()
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("light.kitchen", "off")
+    hass.states.async_set("light.kitchen", "off", {"brightness": 1})
+    hass.states.async_set("light.kitchen", "on", {"brightness": 1})
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    return start
+
+
+def _assert_compressed_states(compressed, states, minimal_response):
+    """Assert the compressed format matches the full states of the light."""
+    last_updated = [
+        dt_util.parse_datetime(state["last_updated"]).timestamp() for state in states
+    ]
+    if minimal_response:
+        assert compressed == {
+            "s": ["on", "off", "on"],
+            "lu": [pytest.approx(last_updated[index]) for index in (0, 1, 3)],
+            "lc": [],
+            "a": [[0, {}]],
+        }
+    else:
+        assert compressed == {
+            "s": ["on", "off", "off", "on"],
+            "lu": [pytest.approx(timestamp) for timestamp in last_updated],
+            "lc": [[2, pytest.approx(last_updated[1])]],
+            "a": [[0, {}], [2, {"brightness": 1}]],
+        }
+
+
+@pytest.mark.parametrize("minimal_response", [False, True])
+@pytest.mark.parametrize("stream", [False, True])
+async def test_fetch_period_api_compressed(hass, hass_client, minimal_response, stream):
+    """Test the fetch period view with the compressed state format."""
+    start = await _async_record_compressible_states(hass)
+    client = await hass_client()
+    url = (
+        f"/api/history/period/{start.isoformat()}"
+        "?filter_entity_id=light.kitchen&significant_changes_only=0"
+    )
+
+    response = await client.get(url)
+    assert response.status == HTTPStatus.OK
+    states = (await response.json())[0]
+    assert len(states) == 4
+
+    url += "&compressed_state_format"
+    if minimal_response:
+        url += "&minimal_response"
+    if stream:
+        url += "&stream"
+    response = await client.get(url)
+    assert response.status == HTTPStatus.OK
+    compressed = await response.json()
+
+    assert list(compressed) == ["light.kitchen"]
+    _assert_compressed_states(compressed["light.kitchen"], states, minimal_response)
+
+
+@pytest.mark.parametrize("minimal_response", [False, True])
+async def test_history_during_period_compressed(hass, hass_ws_client, minimal_response):
+    """Test fetching the history in the compressed state format."""
+    start = await _async_record_compressible_states(hass)
+    client = await hass_ws_client()
+    msg = {
+        "type": "history/history_during_period",
+        "start_time": start.isoformat(),
+        "significant_changes_only": False,
+    }
+    await client.send_json({**msg, "id": 1})
+    response = await client.receive_json()
+    assert response["success"]
+    states = response["result"]["states"]["light.kitchen"]
+    assert len(states) == 4
+
+    await client.send_json(
+        {
+            **msg,
+            "id": 2,
+            "minimal_response": minimal_response,
+            "compressed_state_format": True,
+        }
+    )
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"]["cursor"] is None
+    compressed = response["result"]["states"]
+
+    assert list(compressed) == ["light.kitchen"]
+    _assert_compressed_states(compressed["light.kitchen"], states, minimal_response)
+
+
+@pytest.mark.parametrize("minimal_response", [False, True])
+async def test_history_during_period_compressed_pages(
+    hass, hass_ws_client, minimal_response
+):
+    """Test compressed pages continue the states of the previous page."""
+    start = await _async_record_compressible_states(hass)
+    client = await hass_ws_client()
+    msg = {
+        "type": "history/history_during_period",
+        "start_time": start.isoformat(),
+        "significant_changes_only": False,
+        "minimal_response": minimal_response,
+        "compressed_state_format": True,
+    }
+    await client.send_json({**msg, "id": 1})
+    response = await client.receive_json()
+    assert response["success"]
+    expected = response["result"]["states"]["light.kitchen"]
+
+    paged = {"s": [], "lu": [], "lc": [], "a": []}
+    cursor = None
+    msg_id = 2
+    while True:
+        page_msg = {**msg, "id": msg_id, "page_size": 1}
+        if cursor:
+            page_msg["cursor"] = cursor
+        await client.send_json(page_msg)
+        response = await client.receive_json()
+        assert response["success"]
+        if compressed := response["result"]["states"].get("light.kitchen"):
+            offset = len(paged["s"])
+            paged["s"].extend(compressed["s"])
+            paged["lu"].extend(compressed["lu"])
+            for key in ("lc", "a"):
+                paged[key].extend(
+                    [index + offset, value] for index, value in compressed[key]
+                )
+        if (cursor := response["result"]["cursor"]) is None:
+            break
+        msg_id += 1
+
+    assert msg_id > 4
+    assert paged == expected
+
+
+async def _async_record_states_at(hass, states):
+    """Record (entity_id, state, time) tuples in a run started before them."""
+    with patch(
+        "homeassistant.components.recorder.dt_util.utcnow",
+        return_value=states[0][2] - timedelta(seconds=1),
+    ):
+        await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    for entity_id, state, time in states:
+        with patch("homeassistant.util.dt.utcnow", return_value=time):
+            hass.states.async_set(entity_id, state)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+
+@pytest.mark.parametrize("query", [{"resolution": "60"}, {"max_points": "3"}])
+async def test_fetch_period_api_downsampled(hass, hass_client, query):
+    """Test the fetch period view reduces numeric states to buckets."""
+    start = dt_util.utcnow().replace(microsecond=0) - timedelta(hours=1)
+    await _async_record_states_at(
+        hass,
+        [
+            ("sensor.temperature", "5", start - timedelta(seconds=10)),
+            ("binary_sensor.door", "on", start + timedelta(seconds=10)),
+            ("sensor.temperature", "20", start + timedelta(seconds=30)),
+            ("binary_sensor.door", "off", start + timedelta(seconds=50)),
+            ("sensor.temperature", "30", start + timedelta(seconds=60)),
+            ("sensor.temperature", "unavailable", start + timedelta(seconds=90)),
+            ("sensor.temperature", "40", start + timedelta(seconds=120)),
+        ],
+    )
+    client = await hass_client()
+
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}",
+        params={
+            "end_time": (start + timedelta(seconds=180)).isoformat(),
+            "filter_entity_id": "sensor.temperature,binary_sensor.door",
+            **query,
+        },
+    )
+    assert response.status == HTTPStatus.OK
+    result = await response.json()
+
+    assert list(result) == ["sensor.temperature", "binary_sensor.door"]
+    assert result["sensor.temperature"] == [
+        {
+            "start": (start + timedelta(seconds=offset)).isoformat(),
+            "end": (start + timedelta(seconds=offset + 60)).isoformat(),
+            "min": min_,
+            "mean": approx(mean),
+            "max": max_,
+        }
+        for offset, min_, mean, max_ in (
+            (0, 5, 12.5, 20),
+            (60, 30, 30, 30),
+            (120, 40, 40, 40),
+        )
+    ]
+    # Entities which are not numeric return their states
+    assert [state["state"] for state in result["binary_sensor.door"]] == [
+        "on",
+        "off",
+    ]
+
+
+async def test_fetch_period_api_downsampled_from_statistics(hass, hass_client):
+    """Test downsampled states are reduced from the statistics they cover."""
+    hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = hour - timedelta(hours=3)
+    await _async_record_states_at(
+        hass,
+        [
+            ("sensor.power", "1", start - timedelta(hours=1)),
+            # Covered by the statistics, not read
+            ("sensor.power", "100", start + timedelta(minutes=30)),
+            ("sensor.power", "1", start + timedelta(minutes=40)),
+            ("sensor.power", "30", start + timedelta(hours=2, minutes=10)),
+        ],
+    )
+
+    def _add_statistics():
+        with recorder.session_scope(hass=hass) as session:
+            metadata = StatisticsMeta(
+                statistic_id="sensor.power",
+                source="recorder",
+                unit_of_measurement=None,
+                has_mean=True,
+                has_sum=False,
+            )
+            session.add(metadata)
+            session.flush()
+            for hours, min_, mean, max_ in ((0, 5, 10, 15), (1, 18, 20, 22)):
+                session.add(
+                    Statistics.from_stats(
+                        metadata.id,
+                        {
+                            "start": start + timedelta(hours=hours),
+                            "min": min_,
+                            "mean": mean,
+                            "max": max_,
+                        },
+                    )
+                )
+
+    await hass.async_add_executor_job(_add_statistics)
+    client = await hass_client()
+
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}",
+        params={
+            "end_time": hour.isoformat(),
+            "filter_entity_id": "sensor.power",
+            "resolution": "3600",
+        },
+    )
+    assert response.status == HTTPStatus.OK
+    result = await response.json()
+
+    assert [
+        (bucket["min"], approx(bucket["mean"]), bucket["max"])
+        for bucket in result["sensor.power"]
+    ] == [(5, 10, 15), (18, 20, 22), (1, (600 * 1 + 3000 * 30) / 3600, 30)]
+
+    # Without statistics covering the buckets the states are read
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}",
+        params={
+            "end_time": hour.isoformat(),
+            "filter_entity_id": "sensor.power",
+            "resolution": "60",
+        },
+    )
+    assert response.status == HTTPStatus.OK
+    result = await response.json()
+    assert max(bucket["max"] for bucket in result["sensor.power"]) == 100
+
+
+@pytest.mark.parametrize(
+    "query",
+    [{"max_points": "0"}, {"max_points": "cats"}, {"resolution": "-1"}],
+)
+async def test_fetch_period_api_downsampled_invalid(hass, hass_client, query):
+    """Test invalid downsampling parameters are rejected."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    client = await hass_client()
+
+    response = await client.get("/api/history/period", params=query)
+    assert response.status == HTTPStatus.BAD_REQUEST
+
+
 async def test_fetch_period_api_with_use_include_order(hass, hass_client):
     """Test the fetch period view for history with include order."""
     await hass.async_add_executor_job(init_recorder_component, hass)
@@ -922,6 +1343,91 @@ async def test_statistics_during_period(
     }
 
 
+@pytest.mark.parametrize("minimal_response", [False, True])
+async def test_history_during_period_pages(hass, hass_ws_client, minimal_response):
+    """Test fetching the history page by page."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("sensor.temperature", "19")
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    start = dt_util.utcnow()
+    for state in ("off", "off", "on", "off", "on"):
+        hass.states.async_set("light.kitchen", state, {"brightness": state})
+    for state in ("19", "20", "21"):
+        hass.states.async_set("sensor.temperature", state)
+    hass.states.async_set("switch.new", "on")
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_ws_client()
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "history/history_during_period",
+            "start_time": start.isoformat(),
+            "minimal_response": minimal_response,
+        }
+    )
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"]["cursor"] is None
+    expected = response["result"]["states"]
+    assert set(expected) == {"light.kitchen", "sensor.temperature", "switch.new"}
+
+    paged = {}
+    cursor = None
+    msg_id = 2
+    while True:
+        msg = {
+            "id": msg_id,
+            "type": "history/history_during_period",
+            "start_time": start.isoformat(),
+            "minimal_response": minimal_response,
+            "page_size": 2,
+        }
+        if cursor:
+            msg["cursor"] = cursor
+        await client.send_json(msg)
+        response = await client.receive_json()
+        assert response["success"]
+        for entity_id, states in response["result"]["states"].items():
+            paged.setdefault(entity_id, []).extend(states)
+        if (cursor := response["result"]["cursor"]) is None:
+            break
+        msg_id += 1
+
+    assert msg_id > 3
+    assert paged == expected
+
+    light_states = expected["light.kitchen"]
+    assert light_states[0]["state"] == "on"
+    assert light_states[-1]["state"] == "on"
+    assert len(light_states) == 5
+    assert "attributes" in light_states[1]
+    assert "attributes" in light_states[-1]
+    assert ("attributes" in light_states[2]) is not minimal_response
+
+
+async def test_history_during_period_bad_start_time(hass, hass_ws_client):
+    """Test history_during_period with an invalid start time."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+
+    client = await hass_ws_client()
+    await client.send_json(
+        {"id": 1, "type": "history/history_during_period", "start_time": "cats"}
+    )
+    response = await client.receive_json()
+    assert not response["success"]
+    assert response["error"]["code"] == "invalid_start_time"
+
+
 async def test_statistics_during_period_bad_start_time(hass, hass_ws_client):
     """Test statistics_during_period."""
     await hass.async_add_executor_job(init_recorder_component, hass)
@@ -1,6 +1,8 @@
 """Test the Profiler config flow."""
+import asyncio
 from datetime import timedelta
 import os
+import time
 from unittest.mock import patch
 
 from homeassistant.components.profiler import (
@@ -10,11 +12,19 @@ from homeassistant.components.profiler import (
     SERVICE_LOG_THREAD_FRAMES,
     SERVICE_MEMORY,
     SERVICE_START,
+    SERVICE_START_EVENT_LISTENER_PROFILER,
     SERVICE_START_LOG_OBJECTS,
+    SERVICE_START_TEMPLATE_PROFILER,
+    SERVICE_STOP_EVENT_LISTENER_PROFILER,
     SERVICE_STOP_LOG_OBJECTS,
+    SERVICE_STOP_TEMPLATE_PROFILER,
 )
 from homeassistant.components.profiler.const import DOMAIN
+from homeassistant.components.profiler.loop_lag import LoopLagMonitor
 from homeassistant.const import CONF_SCAN_INTERVAL, CONF_TYPE
+from homeassistant.core import callback
+from homeassistant.helpers.event import TrackTemplate, async_track_template_result
+from homeassistant.helpers.template import Template, async_get_profiler
 import homeassistant.util.dt as dt_util
 
 from tests.common import MockConfigEntry, async_fire_time_changed
@@ -185,3 +195,170 @@ async def test_log_scheduled(hass, caplog):
 
     assert await hass.config_entries.async_unload(entry.entry_id)
     await hass.async_block_till_done()
+
+
+async def test_event_listener_profiler(hass, hass_ws_client, caplog):
+    """Test we can record and report slow event listeners."""
+
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    client = await hass_ws_client(hass)
+
+    await client.send_json({"id": 1, "type": "profiler/event_listeners"})
+    msg = await client.receive_json()
+    assert not msg["success"]
+    assert msg["error"]["code"] == "not_running"
+
+    @callback
+    def _callback_listener(event):
+        """Handle event in the event loop."""
+
+    async def _coroutine_listener(event):
+        """Handle event in a coroutine."""
+
+    def _executor_listener(event):
+        """Handle event in the executor."""
+
+    hass.bus.async_listen("test_event", _callback_listener)
+    hass.bus.async_listen("test_event", _coroutine_listener)
+    hass.bus.async_listen("other_event", _executor_listener)
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_START_EVENT_LISTENER_PROFILER,
+        {"slow_threshold": 0},
+        blocking=True,
+    )
+    hass.bus.async_fire("test_event")
+    hass.bus.async_fire("test_event")
+    hass.bus.async_fire("other_event")
+    await hass.async_block_till_done()
+
+    assert "_callback_listener for test_event took" in caplog.text
+
+    await client.send_json({"id": 2, "type": "profiler/event_listeners"})
+    msg = await client.receive_json()
+    assert msg["success"]
+    listeners = {
+        (listener["event_type"], listener["listener"].rsplit(".", 1)[-1]): listener
+        for listener in msg["result"]
+    }
+    assert listeners[("test_event", "_callback_listener")]["calls"] == 2
+    assert listeners[("test_event", "_callback_listener")]["job_type"] == "Callback"
+    assert listeners[("test_event", "_coroutine_listener")]["calls"] == 2
+    assert listeners[("other_event", "_executor_listener")]["calls"] == 1
+    assert listeners[("other_event", "_executor_listener")]["job_type"] == "Executor"
+    for listener in msg["result"]:
+        assert 0 <= listener["max_time"] <= listener["total_time"]
+
+    caplog.clear()
+    await hass.services.async_call(DOMAIN, SERVICE_STOP_EVENT_LISTENER_PROFILER, {})
+    await hass.async_block_till_done()
+
+    assert "Event listener:" in caplog.text
+    assert hass.bus.profiler is None
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_loop_lag_sensors(hass):
+    """Test the loop lag percentiles are reported as sensors."""
+
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    await asyncio.sleep(0.3)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=31))
+    await hass.async_block_till_done()
+
+    for entity_id in (
+        "sensor.profiler_event_loop_lag_median",
+        "sensor.profiler_event_loop_lag_95th_percentile",
+        "sensor.profiler_event_loop_lag_99th_percentile",
+    ):
+        state = hass.states.get(entity_id)
+        assert float(state.state) >= 0
+        assert state.attributes["unit_of_measurement"] == "ms"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_loop_lag_monitor_samples_blocked_loop(hass, caplog):
+    """Test a stalled loop is measured and attributed to an integration."""
+    monitor = LoopLagMonitor(hass, threshold=0.05, interval=0.02)
+    assert monitor.percentile(50) is None
+    monitor.async_start()
+    try:
+        await asyncio.sleep(0.1)
+        time.sleep(0.3)
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.async_stop()
+
+    assert monitor.percentile(100) >= 0.25
+    assert monitor.percentile(50) < 0.25
+    assert monitor.blocking_integrations == {"profiler": 1}
+    assert "Event loop blocked for more than" in caplog.text
+    assert "in profiler" in caplog.text
+
+
+async def test_template_profiler(hass, hass_ws_client, caplog):
+    """Test we can record and report template renders."""
+
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    client = await hass_ws_client(hass)
+
+    await client.send_json({"id": 1, "type": "profiler/templates"})
+    msg = await client.receive_json()
+    assert not msg["success"]
+    assert msg["error"]["code"] == "not_running"
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_START_TEMPLATE_PROFILER, {"slow_threshold": 0}, blocking=True
+    )
+
+    @callback
+    def _listener(event, updates):
+        """Handle template results."""
+
+    async_track_template_result(
+        hass,
+        [TrackTemplate(Template("{{ states('sensor.test') }}", hass), None)],
+        _listener,
+        owner="test_owner",
+    )
+    hass.states.async_set("sensor.test", "on")
+    await hass.async_block_till_done()
+
+    await client.send_json({"id": 2, "type": "profiler/templates"})
+    msg = await client.receive_json()
+    assert msg["success"]
+    assert len(msg["result"]) == 1
+    template = msg["result"][0]
+    assert template["owner"] == "test_owner"
+    assert template["template"] == "{{ states('sensor.test') }}"
+    assert template["renders"] == 2
+    assert template["triggers"] == {"setup": 1, "sensor.test": 1}
+    assert 0 <= template["max_time"] <= template["total_time"]
+
+    caplog.clear()
+    await hass.services.async_call(DOMAIN, SERVICE_STOP_TEMPLATE_PROFILER, {})
+    await hass.async_block_till_done()
+
+    assert "Template:" in caplog.text
+    assert async_get_profiler(hass) is None
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
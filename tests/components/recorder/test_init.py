@@ -6,6 +6,7 @@ import sqlite3
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.exc import DatabaseError, OperationalError, SQLAlchemyError
 
 from homeassistant.components import recorder
@@ -27,17 +28,24 @@ from homeassistant.components.recorder import (
 )
 from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.models import (
+    EventData,
     Events,
     RecorderRuns,
+    StateAttributes,
     States,
+    StatesMeta,
     StatisticsRuns,
     process_timestamp,
 )
-from homeassistant.components.recorder.util import session_scope
+from homeassistant.components.recorder.util import (
+    bulk_insert_and_set_ids,
+    session_scope,
+)
 from homeassistant.const import (
     EVENT_HOMEASSISTANT_FINAL_WRITE,
     EVENT_HOMEASSISTANT_STARTED,
     EVENT_HOMEASSISTANT_STOP,
+    EVENT_STATE_CHANGED,
     MATCH_ALL,
     STATE_LOCKED,
     STATE_UNLOCKED,
@@ -47,6 +55,7 @@ from homeassistant.setup import async_setup_component, setup_component
 from homeassistant.util import dt as dt_util
 
 from .common import (
+    async_recorder_block_till_done,
     async_wait_recording_done,
     async_wait_recording_done_without_instance,
     corrupt_db_file,
@@ -174,6 +183,167 @@ async def test_saving_many_states(
         assert db_states[0].event_id > 0
 
 
+async def test_saving_states_with_shared_attributes(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test states with identical attributes share a state_attributes row."""
+    instance = await async_setup_recorder_instance(hass)
+
+    attributes = {"test_attr": 5, "test_attr_10": "nice"}
+
+    hass.states.async_set("test.one", "on", attributes)
+    hass.states.async_set("test.two", "on", attributes)
+    await async_wait_recording_done(hass, instance)
+    hass.states.async_set("test.one", "off", attributes)
+    hass.states.async_set("test.two", "off", {"test_attr": 6})
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert len(db_states) == 4
+        assert len({db_state.attributes_id for db_state in db_states}) == 2
+        assert all(db_state.attributes is None for db_state in db_states)
+        assert session.query(StateAttributes).count() == 2
+        assert db_states[3].to_native().attributes == {"test_attr": 6}
+        assert db_states[2].to_native().attributes == attributes
+
+    assert len(instance._state_attributes_ids) == 2
+    assert not instance._pending_state_attributes
+
+
+async def test_saving_states_in_one_batch(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test states written in the same commit are linked to their old state."""
+    instance = await async_setup_recorder_instance(hass)
+
+    hass.states.async_set("test.one", "on")
+    await async_wait_recording_done(hass, instance)
+    hass.states.async_set("test.one", "off")
+    hass.states.async_set("test.one", "on")
+    hass.states.async_set("test.two", "on")
+    hass.states.async_remove("test.two")
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert [(db_state.entity_id, db_state.state) for db_state in db_states] == [
+            ("test.one", "on"),
+            ("test.one", "off"),
+            ("test.one", "on"),
+            ("test.two", "on"),
+            ("test.two", None),
+        ]
+        assert db_states[0].old_state_id is None
+        assert db_states[1].old_state_id == db_states[0].state_id
+        assert db_states[2].old_state_id == db_states[1].state_id
+        assert db_states[3].old_state_id is None
+        assert db_states[4].old_state_id == db_states[3].state_id
+        for db_state in db_states:
+            db_event = session.query(Events).get(db_state.event_id)
+            assert db_event.event_type == EVENT_STATE_CHANGED
+
+    assert not instance._pending_events
+    assert not instance._pending_states
+
+
+async def test_saving_states_with_states_meta(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test states of the same entity share a states_meta row."""
+    instance = await async_setup_recorder_instance(hass)
+
+    hass.states.async_set("test.one", "on")
+    hass.states.async_set("test.one", "off")
+    hass.states.async_set("test.two", "on")
+    await async_wait_recording_done(hass, instance)
+    hass.states.async_set("test.one", "on")
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        states_meta = {
+            meta.entity_id: meta.metadata_id for meta in session.query(StatesMeta)
+        }
+        assert set(states_meta) == {"test.one", "test.two"}
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert [db_state.metadata_id for db_state in db_states] == [
+            states_meta["test.one"],
+            states_meta["test.one"],
+            states_meta["test.two"],
+            states_meta["test.one"],
+        ]
+
+    assert not instance._pending_states_meta
+    assert instance._states_meta_ids["test.one"] == states_meta["test.one"]
+
+
+async def test_saving_states_with_few_statements(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test the states of a commit are written with a fixed number of statements."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass, instance)
+
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(instance.engine, "before_cursor_execute", _before_cursor_execute)
+    for index in range(50):
+        hass.states.async_set(f"test.entity_{index}", "on")
+    await async_wait_recording_done(hass, instance)
+    event.remove(instance.engine, "before_cursor_execute", _before_cursor_execute)
+
+    inserts = [statement for statement in statements if statement.startswith("INSERT")]
+    assert len([insert for insert in inserts if "INTO events" in insert]) == 1
+    assert len([insert for insert in inserts if "INTO states " in insert]) == 1
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert len(db_states) == 50
+        for index, db_state in enumerate(db_states):
+            assert db_state.entity_id == f"test.entity_{index}"
+            db_event = session.query(Events).get(db_state.event_id)
+            assert db_event.event_type == EVENT_STATE_CHANGED
+            assert db_event.time_fired_ts == db_state.last_updated_ts
+
+
+async def test_saving_events_with_shared_data(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test events with identical data share an event_data row."""
+    instance = await async_setup_recorder_instance(hass)
+
+    event_data = {"test_attr": 5, "test_attr_10": "nice"}
+
+    hass.bus.async_fire("EVENT_TEST", event_data)
+    hass.bus.async_fire("EVENT_TEST", event_data)
+    await async_wait_recording_done(hass, instance)
+    hass.bus.async_fire("EVENT_TEST", event_data)
+    hass.bus.async_fire("EVENT_TEST", {"test_attr": 6})
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_events = list(
+            session.query(Events)
+            .filter_by(event_type="EVENT_TEST")
+            .order_by(Events.event_id)
+        )
+        assert len(db_events) == 4
+        assert len({db_event.data_id for db_event in db_events}) == 2
+        assert all(db_event.event_data is None for db_event in db_events)
+        assert session.query(EventData).filter(
+            EventData.shared_data.in_(instance._event_data_ids.keys())
+        ).count() == len(instance._event_data_ids)
+        assert db_events[2].to_native().data == event_data
+        assert db_events[3].to_native().data == {"test_attr": 6}
+
+    assert '{"test_attr":5,"test_attr_10":"nice"}' in instance._event_data_ids
+    assert '{"test_attr":6}' in instance._event_data_ids
+    assert not instance._pending_event_data
+
+
 async def test_saving_state_with_intermixed_time_changes(
     hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
 ):
@@ -200,6 +370,27 @@ async def test_saving_state_with_intermixed_time_changes(
         assert db_states[0].event_id > 0
 
 
+async def test_commit_and_keep_alive_on_timers(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test the session is committed and kept alive by interval timers."""
+    instance = await async_setup_recorder_instance(hass, {"commit_interval": 5})
+
+    with patch.object(
+        instance, "_commit_event_session_or_retry"
+    ) as commit, patch.object(instance, "_send_keep_alive") as send_keep_alive:
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=6))
+        await async_recorder_block_till_done(hass, instance)
+        assert commit.called
+        assert not send_keep_alive.called
+
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=KEEPALIVE_TIME + 1)
+        )
+        await async_recorder_block_till_done(hass, instance)
+        assert send_keep_alive.called
+
+
 def test_saving_state_with_exception(hass, hass_recorder, caplog):
     """Test saving and restoring a state."""
     hass = hass_recorder()
@@ -208,17 +399,14 @@ def test_saving_state_with_exception(hass, hass_recorder, caplog):
     state = "restoring_from_db"
     attributes = {"test_attr": 5, "test_attr_10": "nice"}
 
-    def _throw_if_state_in_session(*args, **kwargs):
-        for obj in hass.data[DATA_INSTANCE].event_session:
-            if isinstance(obj, States):
-                raise OperationalError(
-                    "insert the state", "fake params", "forced to fail"
-                )
+    def _throw_if_state_in_batch(session, objects):
+        if isinstance(objects[0], States):
+            raise OperationalError("insert the state", "fake params", "forced to fail")
+        return bulk_insert_and_set_ids(session, objects)
 
-    with patch("time.sleep"), patch.object(
-        hass.data[DATA_INSTANCE].event_session,
-        "flush",
-        side_effect=_throw_if_state_in_session,
+    with patch("time.sleep"), patch(
+        "homeassistant.components.recorder.bulk_insert_and_set_ids",
+        side_effect=_throw_if_state_in_batch,
     ):
         hass.states.set(entity_id, "fail", attributes)
         wait_recording_done(hass)
@@ -246,17 +434,14 @@ def test_saving_state_with_sqlalchemy_exception(hass, hass_recorder, caplog):
     state = "restoring_from_db"
     attributes = {"test_attr": 5, "test_attr_10": "nice"}
 
-    def _throw_if_state_in_session(*args, **kwargs):
-        for obj in hass.data[DATA_INSTANCE].event_session:
-            if isinstance(obj, States):
-                raise SQLAlchemyError(
-                    "insert the state", "fake params", "forced to fail"
-                )
+    def _throw_if_state_in_batch(session, objects):
+        if isinstance(objects[0], States):
+            raise SQLAlchemyError("insert the state", "fake params", "forced to fail")
+        return bulk_insert_and_set_ids(session, objects)
 
-    with patch("time.sleep"), patch.object(
-        hass.data[DATA_INSTANCE].event_session,
-        "flush",
-        side_effect=_throw_if_state_in_session,
+    with patch("time.sleep"), patch(
+        "homeassistant.components.recorder.bulk_insert_and_set_ids",
+        side_effect=_throw_if_state_in_batch,
     ):
         hass.states.set(entity_id, "fail", attributes)
         wait_recording_done(hass)
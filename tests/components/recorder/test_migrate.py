@@ -342,6 +342,51 @@ def test_forgiving_add_column():
         migration._add_columns(session, "hello", ["context_id CHARACTER(36)"])
 
 
+@pytest.mark.parametrize("dialect_name", ["sqlite", "oracle"])
+def test_migrate_columns_to_timestamp(dialect_name):
+    """Test the datetime columns are copied to the float timestamp columns."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    time_fired = datetime.datetime(2021, 5, 3, 12, 0, 0, 123456, tzinfo=dt_util.UTC)
+    last_changed = datetime.datetime(2021, 5, 3, 23, 59, 59, 999999, tzinfo=dt_util.UTC)
+    with Session(engine) as session:
+        session.execute(
+            text(
+                "INSERT INTO events (event_type, time_fired) "
+                "VALUES ('test', '2021-05-03 12:00:00.123456')"
+            )
+        )
+        session.execute(
+            text(
+                "INSERT INTO states (entity_id, last_changed, last_updated) "
+                "VALUES ('test.one', '2021-05-03 23:59:59.999999', NULL)"
+            )
+        )
+        mock_engine = Mock()
+        mock_engine.dialect.name = dialect_name
+        migration._migrate_columns_to_timestamp(session, mock_engine)
+        event = session.query(models.Events).one()
+        state = session.query(States).one()
+
+    assert event.time_fired_ts == time_fired.timestamp()
+    assert state.last_changed_ts == last_changed.timestamp()
+    assert state.last_updated_ts is None
+
+
+def test_migrate_columns_to_timestamp_mysql():
+    """Test the MySQL timestamps are computed as doubles."""
+    connection = Mock()
+    mock_engine = Mock()
+    mock_engine.dialect.name = "mysql"
+    migration._migrate_columns_to_timestamp(connection, mock_engine)
+
+    statements = [str(call.args[0]) for call in connection.execute.call_args_list]
+    assert len(statements) == 5
+    for statement in statements:
+        assert "TIMESTAMPDIFF(MICROSECOND, '1970-01-01 00:00:00'," in statement
+        assert ") / 1E6 WHERE" in statement
+
+
 def test_forgiving_add_index():
     """Test that add index will continue if index exists."""
     engine = create_engine("sqlite://", poolclass=StaticPool)
@@ -7,6 +7,7 @@ from sqlalchemy.orm import scoped_session, sessionmaker
 
 from homeassistant.components.recorder.models import (
     Base,
+    EventData,
     Events,
     RecorderRuns,
     States,
@@ -23,7 +24,9 @@ import homeassistant.util.dt as dt_util
 def test_from_event_to_db_event():
     """Test converting event to db event."""
     event = ha.Event("test_event", {"some_data": 15})
-    assert event == Events.from_event(event).to_native()
+    db_event = Events.from_event(event)
+    db_event.event_data = EventData.from_event(event).shared_data
+    assert event == db_event.to_native()
 
 
 def test_from_event_to_db_state():
@@ -94,7 +97,9 @@ def test_entity_ids():
             entity_id="sensor.temperature",
             state="20",
             last_changed=before_run,
+            last_changed_ts=before_run.timestamp(),
             last_updated=before_run,
+            last_updated_ts=before_run.timestamp(),
         )
     )
     session.add(
@@ -102,7 +107,9 @@ def test_entity_ids():
             entity_id="sensor.sound",
             state="10",
             last_changed=after_run,
+            last_changed_ts=after_run.timestamp(),
             last_updated=after_run,
+            last_updated_ts=after_run.timestamp(),
         )
     )
 
@@ -111,7 +118,9 @@ def test_entity_ids():
             entity_id="sensor.humidity",
             state="76",
             last_changed=in_run,
+            last_changed_ts=in_run.timestamp(),
             last_updated=in_run,
+            last_updated_ts=in_run.timestamp(),
         )
     )
     session.add(
@@ -119,7 +128,9 @@ def test_entity_ids():
             entity_id="sensor.lux",
             state="5",
             last_changed=in_run3,
+            last_changed_ts=in_run3.timestamp(),
             last_updated=in_run3,
+            last_updated_ts=in_run3.timestamp(),
         )
     )
 
@@ -209,9 +220,11 @@ async def test_event_to_db_model():
     event = ha.Event(
         "state_changed", {"some": "attr"}, ha.EventOrigin.local, dt_util.utcnow()
     )
-    native = Events.from_event(event).to_native()
+    db_event = Events.from_event(event)
+    db_event.event_data = EventData.from_event(event).shared_data
+    native = db_event.to_native()
     assert native == event
 
-    native = Events.from_event(event, event_data="{}").to_native()
+    native = Events.from_event(event).to_native()
     event.data = {}
     assert native == event
@@ -6,14 +6,18 @@ from unittest.mock import MagicMock, patch
 
 from sqlalchemy.exc import DatabaseError, OperationalError
 from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.expression import distinct
 
 from homeassistant.components import recorder
 from homeassistant.components.recorder import PurgeTask
 from homeassistant.components.recorder.const import MAX_ROWS_TO_PURGE
 from homeassistant.components.recorder.models import (
+    EventData,
     Events,
     RecorderRuns,
+    StateAttributes,
     States,
+    StatesMeta,
     StatisticsRuns,
     StatisticsShortTerm,
 )
@@ -52,6 +56,14 @@ async def test_purge_old_states(
         assert events.count() == 6
         assert "test.recorder2" in instance._old_states
 
+        state_attributes = session.query(StateAttributes)
+        assert state_attributes.count() == 1
+        assert len(instance._state_attributes_ids) == 1
+
+        states_meta = session.query(StatesMeta)
+        assert states_meta.count() == 1
+        assert "test.recorder2" in instance._states_meta_ids
+
         purge_before = dt_util.utcnow() - timedelta(days=4)
 
         # run purge_old_data()
@@ -68,6 +80,7 @@ async def test_purge_old_states(
         assert finished
         assert states.count() == 2
         assert "test.recorder2" in instance._old_states
+        assert states_meta.count() == 1
 
         # run purge_old_data again
         purge_before = dt_util.utcnow()
@@ -75,6 +88,10 @@ async def test_purge_old_states(
         assert not finished
         assert states.count() == 0
         assert "test.recorder2" not in instance._old_states
+        assert state_attributes.count() == 0
+        assert len(instance._state_attributes_ids) == 0
+        assert states_meta.count() == 0
+        assert "test.recorder2" not in instance._states_meta_ids
 
     # Add some more states
     await _add_test_states(hass, instance)
@@ -89,6 +106,10 @@ async def test_purge_old_states(
         events = session.query(Events).filter(Events.event_type == "state_changed")
         assert events.count() == 6
         assert "test.recorder2" in instance._old_states
+        assert session.query(StatesMeta).count() == 1
+        assert {state.metadata_id for state in states} == {
+            instance._states_meta_ids["test.recorder2"]
+        }
 
 
 async def test_purge_old_states_encouters_database_corruption(
@@ -209,6 +230,55 @@ async def test_purge_old_events(
         assert events.count() == 2
 
 
+async def test_purge_old_events_removes_unused_event_data(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test event data is purged once no event refers to it."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass, instance)
+
+    utcnow = dt_util.utcnow()
+    eleven_days_ago = utcnow - timedelta(days=11)
+
+    with session_scope(hass=hass) as session:
+        purged_data = EventData(shared_data='{"test_attr":5}', hash=1234)
+        kept_data = EventData(shared_data='{"test_attr":6}', hash=5678)
+        for timestamp, event_data in (
+            (eleven_days_ago, purged_data),
+            (eleven_days_ago, kept_data),
+            (utcnow, kept_data),
+        ):
+            session.add(
+                Events(
+                    event_type="EVENT_TEST_PURGE",
+                    origin="LOCAL",
+                    created=timestamp,
+                    time_fired=timestamp,
+                    time_fired_ts=timestamp.timestamp(),
+                    event_data_rel=event_data,
+                )
+            )
+        session.flush()
+        instance._event_data_ids[purged_data.shared_data] = purged_data.data_id
+        instance._event_data_ids[kept_data.shared_data] = kept_data.data_id
+
+    with session_scope(hass=hass) as session:
+        events = session.query(Events).filter(Events.event_type == "EVENT_TEST_PURGE")
+        event_data = session.query(EventData).filter(EventData.hash.in_([1234, 5678]))
+        assert events.count() == 3
+        assert event_data.count() == 2
+
+        purge_before = utcnow - timedelta(days=4)
+        finished = purge_old_data(instance, purge_before, repack=False)
+        assert not finished
+        assert events.count() == 1
+        assert event_data.count() == 1
+        assert event_data.first().shared_data == '{"test_attr":6}'
+
+    assert '{"test_attr":5}' not in instance._event_data_ids
+    assert '{"test_attr":6}' in instance._event_data_ids
+
+
 async def test_purge_old_recorder_runs(
     hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
 ):
@@ -358,6 +428,7 @@ async def test_purge_edge_case(
                     origin="LOCAL",
                     created=timestamp,
                     time_fired=timestamp,
+                    time_fired_ts=timestamp.timestamp(),
                 )
             )
             session.add(
@@ -367,7 +438,9 @@ async def test_purge_edge_case(
                     state="purgeme",
                     attributes="{}",
                     last_changed=timestamp,
+                    last_changed_ts=timestamp.timestamp(),
                     last_updated=timestamp,
+                    last_updated_ts=timestamp.timestamp(),
                     created=timestamp,
                     event_id=1001,
                 )
@@ -418,6 +491,7 @@ async def test_purge_cutoff_date(
                     origin="LOCAL",
                     created=timestamp_keep,
                     time_fired=timestamp_keep,
+                    time_fired_ts=timestamp_keep.timestamp(),
                 )
             )
             session.add(
@@ -427,7 +501,9 @@ async def test_purge_cutoff_date(
                     state="keep",
                     attributes="{}",
                     last_changed=timestamp_keep,
+                    last_changed_ts=timestamp_keep.timestamp(),
                     last_updated=timestamp_keep,
+                    last_updated_ts=timestamp_keep.timestamp(),
                     created=timestamp_keep,
                     event_id=1000,
                 )
@@ -441,6 +517,7 @@ async def test_purge_cutoff_date(
                         origin="LOCAL",
                         created=timestamp_purge,
                         time_fired=timestamp_purge,
+                        time_fired_ts=timestamp_purge.timestamp(),
                     )
                 )
                 session.add(
@@ -450,7 +527,9 @@ async def test_purge_cutoff_date(
                         state="purge",
                         attributes="{}",
                         last_changed=timestamp_purge,
+                        last_changed_ts=timestamp_purge.timestamp(),
                         last_updated=timestamp_purge,
+                        last_updated_ts=timestamp_purge.timestamp(),
                         created=timestamp_purge,
                         event_id=1000 + row,
                     )
@@ -518,7 +597,9 @@ async def test_purge_filtered_states(
                     state="purgeme",
                     attributes="{}",
                     last_changed=timestamp,
+                    last_changed_ts=timestamp.timestamp(),
                     last_updated=timestamp,
+                    last_updated_ts=timestamp.timestamp(),
                     created=timestamp,
                 )
             )
@@ -540,7 +621,9 @@ async def test_purge_filtered_states(
                 state="keep",
                 attributes="{}",
                 last_changed=timestamp,
+                last_changed_ts=timestamp.timestamp(),
                 last_updated=timestamp,
+                last_updated_ts=timestamp.timestamp(),
                 created=timestamp,
                 old_state_id=1,
             )
@@ -551,7 +634,9 @@ async def test_purge_filtered_states(
                 state="keep",
                 attributes="{}",
                 last_changed=timestamp,
+                last_changed_ts=timestamp.timestamp(),
                 last_updated=timestamp,
+                last_updated_ts=timestamp.timestamp(),
                 created=timestamp,
                 old_state_id=2,
             )
@@ -561,7 +646,9 @@ async def test_purge_filtered_states(
                 state="keep",
                 attributes="{}",
                 last_changed=timestamp,
+                last_changed_ts=timestamp.timestamp(),
                 last_updated=timestamp,
+                last_updated_ts=timestamp.timestamp(),
                 created=timestamp,
                 old_state_id=62,  # keep
             )
@@ -575,8 +662,10 @@ async def test_purge_filtered_states(
                     origin="LOCAL",
                     created=timestamp,
                     time_fired=timestamp,
+                    time_fired_ts=timestamp.timestamp(),
                 )
             )
+            _link_states_to_states_meta(session)
 
     service_data = {"keep_days": 10}
     _add_db_entries(hass)
@@ -654,6 +743,7 @@ async def test_purge_filtered_events(
                             origin="LOCAL",
                             created=timestamp,
                             time_fired=timestamp,
+                            time_fired_ts=timestamp.timestamp(),
                         )
                     )
 
@@ -747,6 +837,7 @@ async def test_purge_filtered_events_state_changed(
                         origin="LOCAL",
                         created=timestamp,
                         time_fired=timestamp,
+                        time_fired_ts=timestamp.timestamp(),
                     )
                 )
             # Add states with linked old_state_ids that need to be handled
@@ -757,7 +848,9 @@ async def test_purge_filtered_events_state_changed(
                 state="keep",
                 attributes="{}",
                 last_changed=timestamp,
+                last_changed_ts=timestamp.timestamp(),
                 last_updated=timestamp,
+                last_updated_ts=timestamp.timestamp(),
                 created=timestamp,
                 old_state_id=1,
             )
@@ -768,7 +861,9 @@ async def test_purge_filtered_events_state_changed(
                 state="keep",
                 attributes="{}",
                 last_changed=timestamp,
+                last_changed_ts=timestamp.timestamp(),
                 last_updated=timestamp,
+                last_updated_ts=timestamp.timestamp(),
                 created=timestamp,
                 old_state_id=2,
             )
@@ -778,7 +873,9 @@ async def test_purge_filtered_events_state_changed(
                 state="keep",
                 attributes="{}",
                 last_changed=timestamp,
+                last_changed_ts=timestamp.timestamp(),
                 last_updated=timestamp,
+                last_updated_ts=timestamp.timestamp(),
                 created=timestamp,
                 old_state_id=62,  # keep
             )
@@ -870,6 +967,7 @@ async def test_purge_entities(
                         timestamp,
                         event_id * days,
                     )
+            _link_states_to_states_meta(session)
 
     def _add_keep_records(hass: HomeAssistant) -> None:
         with recorder.session_scope(hass=hass) as session:
@@ -883,6 +981,7 @@ async def test_purge_entities(
                     timestamp,
                     event_id,
                 )
+            _link_states_to_states_meta(session)
 
     _add_purge_records(hass)
     _add_keep_records(hass)
@@ -993,6 +1092,7 @@ async def _add_test_events(hass: HomeAssistant, instance: recorder.Recorder):
                     origin="LOCAL",
                     created=timestamp,
                     time_fired=timestamp,
+                    time_fired_ts=timestamp.timestamp(),
                 )
             )
 
@@ -1021,6 +1121,7 @@ async def _add_test_statistics(hass: HomeAssistant, instance: recorder.Recorder)
             session.add(
                 StatisticsShortTerm(
                     start=timestamp,
+                    start_ts=timestamp.timestamp(),
                     state=state,
                 )
             )
@@ -1093,7 +1194,9 @@ def _add_state_and_state_changed_event(
             state=state,
             attributes="{}",
             last_changed=timestamp,
+            last_changed_ts=timestamp.timestamp(),
             last_updated=timestamp,
+            last_updated_ts=timestamp.timestamp(),
             created=timestamp,
             event_id=event_id,
         )
@@ -1106,5 +1209,22 @@ def _add_state_and_state_changed_event(
             origin="LOCAL",
             created=timestamp,
             time_fired=timestamp,
+            time_fired_ts=timestamp.timestamp(),
         )
     )
+
+
+def _link_states_to_states_meta(session: Session) -> None:
+    """Link states added without a metadata id to their states_meta row."""
+    session.flush()
+    for (entity_id,) in session.query(distinct(States.entity_id)).filter(
+        States.metadata_id.is_(None)
+    ):
+        states_meta = session.query(StatesMeta).filter_by(entity_id=entity_id).first()
+        if not states_meta:
+            states_meta = StatesMeta(entity_id=entity_id)
+            session.add(states_meta)
+            session.flush()
+        session.query(States).filter(
+            States.entity_id == entity_id, States.metadata_id.is_(None)
+        ).update({"metadata_id": states_meta.metadata_id}, synchronize_session=False)
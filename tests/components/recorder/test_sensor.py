@@ -0,0 +1,73 @@
+"""The tests for the recorder sensors."""
+from unittest.mock import patch
+
+from sqlalchemy.exc import OperationalError
+
+from homeassistant.components.recorder.const import DOMAIN
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+
+from .common import async_wait_recording_done
+from .conftest import SetupRecorderInstanceT
+
+
+async def test_sensors_disabled_by_default(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test the recorder sensors are registered but disabled."""
+    await async_setup_recorder_instance(hass)
+    assert await async_setup_component(hass, SENSOR_DOMAIN, {})
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    entry = registry.async_get("sensor.recorder_queue_backlog")
+    assert entry
+    assert entry.disabled_by == er.DISABLED_INTEGRATION
+    assert entry.entity_category == "diagnostic"
+    assert hass.states.get("sensor.recorder_queue_backlog") is None
+
+
+async def test_sensors(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test the recorder sensors report the recorder metrics."""
+    registry = er.async_get(hass)
+    for key in ("queue_backlog", "commit_latency", "rows_per_commit", "commit_retries"):
+        registry.async_get_or_create(
+            SENSOR_DOMAIN, DOMAIN, key, suggested_object_id=f"recorder_{key}"
+        )
+
+    instance = await async_setup_recorder_instance(hass)
+    assert await async_setup_component(hass, SENSOR_DOMAIN, {})
+    await hass.async_block_till_done()
+
+    hass.states.async_set("test.one", "on")
+    hass.states.async_set("test.two", "on")
+    await async_wait_recording_done(hass, instance)
+
+    event_session = instance.event_session
+    commit = event_session.commit
+    failures = [OperationalError("statement", {}, [])]
+
+    def _fail_once():
+        if failures:
+            raise failures.pop()
+        commit()
+
+    with patch("time.sleep"), patch.object(
+        event_session, "commit", side_effect=_fail_once
+    ):
+        hass.states.async_set("test.one", "off")
+        await async_wait_recording_done(hass, instance)
+
+    for key in ("queue_backlog", "commit_latency", "rows_per_commit", "commit_retries"):
+        await hass.helpers.entity_component.async_update_entity(
+            f"sensor.recorder_{key}"
+        )
+
+    assert hass.states.get("sensor.recorder_queue_backlog").state == "0"
+    assert float(hass.states.get("sensor.recorder_commit_latency").state) >= 0
+    assert hass.states.get("sensor.recorder_rows_per_commit").state == "2"
+    assert hass.states.get("sensor.recorder_commit_retries").state == "1"
@@ -261,6 +261,7 @@ async def test_recorder_info(hass, hass_ws_client):
     await client.send_json({"id": 1, "type": "recorder/info"})
     response = await client.receive_json()
     assert response["success"]
+    metrics = response["result"].pop("metrics")
     assert response["result"] == {
         "backlog": 0,
         "max_backlog": 30000,
@@ -268,6 +269,17 @@ async def test_recorder_info(hass, hass_ws_client):
         "recording": True,
         "thread_running": True,
     }
+    assert metrics["commits"] > 0
+    assert metrics["rows_committed"] > 0
+    assert metrics["commit_retries"] == 0
+    assert len(metrics["commit_latency_histogram"]) == 12
+    assert metrics["commit_latency_histogram"][-1]["le"] is None
+    assert (
+        sum(bucket["count"] for bucket in metrics["commit_latency_histogram"])
+        == metrics["commits"]
+    )
+    assert metrics["tasks"]["EventTask"]["count"] > 0
+    assert metrics["tasks"]["WaitTask"]["count"] > 0
 
 
 async def test_recorder_info_no_recorder(hass, hass_ws_client):
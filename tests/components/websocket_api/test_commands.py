@@ -1,5 +1,6 @@
 """Tests for WebSocket API commands."""
 import datetime
+import json
 from unittest.mock import ANY, patch
 
 from async_timeout import timeout
@@ -393,6 +394,145 @@ async def test_subscribe_unsubscribe_events(hass, websocket_client):
     assert sum(hass.bus.async_listeners().values()) == init_count
 
 
+async def test_subscribe_entities(hass, websocket_client):
+    """Test subscribe entities sends a snapshot followed by state diffs."""
+    hass.states.async_set("light.permitted", "off", {"color": "red", "brightness": 1})
+    original_state = hass.states.get("light.permitted")
+
+    await websocket_client.send_json({"id": 7, "type": "subscribe_entities"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["type"] == "event"
+    assert msg["event"] == {
+        "a": {
+            "light.permitted": {
+                "a": {"color": "red", "brightness": 1},
+                "c": original_state.context.id,
+                "lc": original_state.last_changed.timestamp(),
+                "s": "off",
+            }
+        }
+    }
+
+    hass.states.async_set("light.permitted", "on", {"color": "blue"})
+    new_state = hass.states.get("light.permitted")
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {
+        "c": {
+            "light.permitted": {
+                "+": {
+                    "a": {"color": "blue"},
+                    "c": new_state.context.id,
+                    "lc": new_state.last_changed.timestamp(),
+                    "s": "on",
+                },
+                "-": {"a": ["brightness"]},
+            }
+        }
+    }
+
+    hass.states.async_set("light.permitted", "on", {"color": "green"})
+    new_state = hass.states.get("light.permitted")
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {
+        "c": {
+            "light.permitted": {
+                "+": {
+                    "a": {"color": "green"},
+                    "c": new_state.context.id,
+                    "lu": new_state.last_updated.timestamp(),
+                }
+            }
+        }
+    }
+
+    hass.states.async_set("light.new", "off")
+    msg = await websocket_client.receive_json()
+    assert list(msg["event"]["a"]) == ["light.new"]
+
+    hass.states.async_remove("light.permitted")
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {"r": ["light.permitted"]}
+
+
+async def test_subscribe_entities_with_entity_ids(hass, websocket_client):
+    """Test subscribe entities only sends the requested entities."""
+    hass.states.async_set("light.permitted", "off")
+    hass.states.async_set("light.other", "off")
+
+    await websocket_client.send_json(
+        {
+            "id": 7,
+            "type": "subscribe_entities",
+            "entity_ids": ["light.permitted", "light.missing"],
+        }
+    )
+
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert list(msg["event"]["a"]) == ["light.permitted"]
+
+    hass.states.async_set("light.other", "on")
+    hass.states.async_set("light.permitted", "on")
+    msg = await websocket_client.receive_json()
+    assert msg["event"]["c"]["light.permitted"]["+"]["s"] == "on"
+
+    hass.states.async_set("light.missing", "on")
+    msg = await websocket_client.receive_json()
+    assert msg["event"]["a"]["light.missing"]["s"] == "on"
+
+
+async def test_subscribe_entities_filters_visible(
+    hass, hass_admin_user, websocket_client
+):
+    """Test subscribe entities only sends entities we are allowed to see."""
+    hass_admin_user.groups = []
+    hass_admin_user.mock_policy({"entities": {"entity_ids": {"test.entity": True}}})
+    hass.states.async_set("test.entity", "hello")
+    hass.states.async_set("test.not_visible_entity", "invisible")
+
+    await websocket_client.send_json({"id": 7, "type": "subscribe_entities"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert list(msg["event"]["a"]) == ["test.entity"]
+
+    hass.states.async_set("test.not_visible_entity", "still invisible")
+    hass.states.async_set("test.entity", "world")
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {"c": {"test.entity": {"+": ANY}}}
+    assert msg["event"]["c"]["test.entity"]["+"]["s"] == "world"
+
+    await websocket_client.send_json(
+        {
+            "id": 8,
+            "type": "subscribe_entities",
+            "entity_ids": ["test.not_visible_entity"],
+        }
+    )
+
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {"a": {}}
+
+    hass.states.async_set("test.not_visible_entity", "invisible")
+    hass.states.async_set("test.entity", "hello")
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+
+
 async def test_get_states(hass, websocket_client):
     """Test get_states command."""
     hass.states.async_set("greeting.hello", "world")
@@ -412,6 +552,25 @@ async def test_get_states(hass, websocket_client):
     assert msg["result"] == states
 
 
+async def test_get_states_reuses_serialized_states(hass, websocket_client):
+    """Test get_states only serializes states that changed."""
+    hass.states.async_set("greeting.hello", "world")
+    hass.states.async_set("greeting.bye", "universe")
+
+    await websocket_client.send_json({"id": 5, "type": "get_states"})
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    hass.states.async_set("greeting.bye", "moon")
+    with patch("homeassistant.core.json.dumps", wraps=json.dumps) as mock_dumps:
+        await websocket_client.send_json({"id": 6, "type": "get_states"})
+        msg = await websocket_client.receive_json()
+
+    assert msg["success"]
+    assert msg["result"] == [state.as_dict() for state in hass.states.async_all()]
+    assert mock_dumps.call_count == 1
+
+
 async def test_get_services(hass, websocket_client):
     """Test get_services command."""
     await websocket_client.send_json({"id": 5, "type": "get_services"})
@@ -459,6 +618,20 @@ async def test_ping(websocket_client):
     assert msg["type"] == "pong"
 
 
+async def test_connection_stats(websocket_client):
+    """Test getting the number of messages and frames sent."""
+    await websocket_client.send_json({"id": 5, "type": "ping"})
+    msg = await websocket_client.receive_json()
+    assert msg["type"] == "pong"
+
+    await websocket_client.send_json({"id": 6, "type": "connection_stats"})
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 6
+    assert msg["success"]
+    # auth_required, auth_ok and pong
+    assert msg["result"] == {"messages_sent": 3, "frames_sent": 3}
+
+
 async def test_call_service_context_with_user(
     hass, hass_client_no_auth, hass_access_token
 ):
@@ -67,6 +67,65 @@ async def test_pending_msg_peak(hass, mock_low_peak, hass_ws_client, caplog):
     assert "Client unable to keep up with pending messages" in caplog.text
 
 
+@pytest.mark.parametrize(
+    "features",
+    [{"coalesce_messages": 1}, {"coalesce_messages": 1, "coalesce_window": 10}],
+)
+async def test_coalesced_messages(hass, hass_ws_client, features):
+    """Test pending messages are sent in one frame once coalescing is enabled."""
+    orig_handler = http.WebSocketHandler
+    instance = None
+
+    def instantiate_handler(*args):
+        nonlocal instance
+        instance = orig_handler(*args)
+        return instance
+
+    with patch(
+        "homeassistant.components.websocket_api.http.WebSocketHandler",
+        instantiate_handler,
+    ):
+        websocket_client = await hass_ws_client()
+
+    await websocket_client.send_json(
+        {"id": 1, "type": "subscribe_events", "event_type": "test_event"}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    # Without the feature every message is sent in its own frame
+    hass.bus.async_fire("test_event", {"idx": 0})
+    hass.bus.async_fire("test_event", {"idx": 1})
+    for idx in range(2):
+        msg = await websocket_client.receive_json()
+        assert msg["event"]["data"] == {"idx": idx}
+
+    await websocket_client.send_json(
+        {"id": 2, "type": "supported_features", "features": features}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+    frames_sent = instance.frames_sent
+    messages_sent = instance.messages_sent
+
+    for idx in range(3):
+        hass.bus.async_fire("test_event", {"idx": idx})
+
+    msg = await websocket_client.receive_json()
+    assert [message["event"]["data"] for message in msg] == [
+        {"idx": 0},
+        {"idx": 1},
+        {"idx": 2},
+    ]
+    assert instance.frames_sent == frames_sent + 1
+    assert instance.messages_sent == messages_sent + 3
+
+    # A single pending message is not wrapped
+    await websocket_client.send_json({"id": 3, "type": "ping"})
+    msg = await websocket_client.receive_json()
+    assert msg == {"id": 3, "type": "pong"}
+
+
 async def test_non_json_message(hass, websocket_client, caplog):
     """Test trying to serialize non JSON objects."""
     bad_data = object()
@@ -2,11 +2,14 @@
 
 from homeassistant.components.websocket_api.messages import (
     _cached_event_message as lru_event_cache,
+    _cached_state_diff_message as lru_state_diff_cache,
+    _state_diff_event,
     cached_event_message,
+    cached_state_diff_message,
     message_to_json,
 )
 from homeassistant.const import EVENT_STATE_CHANGED
-from homeassistant.core import callback
+from homeassistant.core import Context, callback
 
 
 async def test_cached_event_message(hass):
@@ -96,3 +99,70 @@ async def test_message_to_json(caplog):
 
 class _Unserializeable:
     """A class that cannot be serialized."""
+
+
+async def test_state_diff_event(hass):
+    """Test the state diff of state changed events."""
+    events = []
+
+    @callback
+    def _event_listener(event):
+        events.append(event)
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _event_listener)
+
+    context = Context(user_id="user-id")
+    hass.states.async_set("light.window", "on", {"a": 1, "b": 2})
+    hass.states.async_set("light.window", "on", {"a": 1, "b": 3}, context=context)
+    hass.states.async_set("light.window", "on", {"a": 2, "b": 3})
+    await hass.async_block_till_done()
+
+    new_state = events[1].data["new_state"]
+    assert _state_diff_event(events[1]) == {
+        "c": {
+            "light.window": {
+                "+": {
+                    "a": {"b": 3},
+                    "c": context.as_dict(),
+                    "lu": new_state.last_updated.timestamp(),
+                }
+            }
+        }
+    }
+    new_state = events[2].data["new_state"]
+    assert _state_diff_event(events[2]) == {
+        "c": {
+            "light.window": {
+                "+": {
+                    "a": {"a": 2},
+                    "c": new_state.context.id,
+                    "lu": new_state.last_updated.timestamp(),
+                }
+            }
+        }
+    }
+
+
+async def test_cached_state_diff_message(hass):
+    """Test that we cache state diff messages."""
+    events = []
+
+    @callback
+    def _event_listener(event):
+        events.append(event)
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _event_listener)
+
+    hass.states.async_set("light.window", "on")
+    hass.states.async_set("light.window", "off")
+    await hass.async_block_till_done()
+
+    lru_state_diff_cache.cache_clear()
+
+    msg0 = cached_state_diff_message(2, events[1])
+    msg1 = cached_state_diff_message(3, events[1])
+    assert msg0 == msg1.replace('"id": 3', '"id": 2')
+
+    cache_info = lru_state_diff_cache.cache_info()
+    assert cache_info.hits == 1
+    assert cache_info.misses == 1
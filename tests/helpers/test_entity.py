@@ -797,6 +797,77 @@ async def test_float_conversion(hass):
     assert state.state == "3.6"
 
 
+async def test_unchanged_attributes_passed_by_identity(hass):
+    """Test attributes holding the same objects are written by identity."""
+    forecast = [{"temperature": 20}, {"temperature": 21}]
+    ent = entity.Entity()
+    ent.hass = hass
+    ent.entity_id = "hello.world"
+    ent._attr_extra_state_attributes = {"forecast": forecast}
+
+    ent._attr_state = "sunny"
+    ent.async_write_ha_state()
+    first = hass.states.get("hello.world")
+
+    ent._attr_state = "rainy"
+    ent.async_write_ha_state()
+    second = hass.states.get("hello.world")
+    assert second.state == "rainy"
+    assert second.attributes is first.attributes
+
+    ent._attr_extra_state_attributes = {"forecast": list(forecast)}
+    ent._attr_state = "sunny"
+    ent.async_write_ha_state()
+    third = hass.states.get("hello.world")
+    assert third.attributes is first.attributes
+
+    ent._attr_extra_state_attributes = {"forecast": forecast[:1]}
+    ent.async_write_ha_state()
+    fourth = hass.states.get("hello.world")
+    assert fourth.attributes == {"forecast": [{"temperature": 20}]}
+
+
+async def test_state_attributes_version(hass):
+    """Test state attributes are not read again while their version holds."""
+
+    class ForecastEntity(entity.Entity):
+        """Entity that rebuilds its forecast every time it is read."""
+
+        reads = 0
+
+        @property
+        def state_attributes(self):
+            """Return a newly built forecast."""
+            self.reads += 1
+            return {"forecast": [{"temperature": 20}, {"temperature": 21}]}
+
+    ent = ForecastEntity()
+    ent.hass = hass
+    ent.entity_id = "weather.home"
+    ent._attr_state_attributes_version = 1
+
+    ent._attr_state = "sunny"
+    ent.async_write_ha_state()
+    first = hass.states.get("weather.home")
+
+    ent._attr_state = "rainy"
+    ent.async_write_ha_state()
+    second = hass.states.get("weather.home")
+    assert ent.reads == 1
+    assert second.state == "rainy"
+    assert second.attributes is first.attributes
+
+    ent._attr_state_attributes_version = 2
+    ent.async_write_ha_state()
+    assert ent.reads == 2
+    assert hass.states.get("weather.home").attributes == first.attributes
+
+    ent._attr_state_attributes_version = None
+    ent.async_write_ha_state()
+    ent.async_write_ha_state()
+    assert ent.reads == 4
+
+
 async def test_attribution_attribute(hass):
     """Test attribution attribute."""
     mock_entity = entity.Entity()
@@ -10,7 +10,7 @@ import jinja2
 import pytest
 
 from homeassistant.components import sun
-from homeassistant.const import MATCH_ALL
+from homeassistant.const import EVENT_STATE_CHANGED, MATCH_ALL
 import homeassistant.core as ha
 from homeassistant.core import callback
 from homeassistant.exceptions import TemplateError
@@ -1654,6 +1654,89 @@ async def test_track_template_result_super_template_2_initially_false(
     assert wildercard_runs == [(0, 10), (10, 35)]
 
 
+async def test_track_template_result_domains_share_batched_listener(hass):
+    """Test templates on the same domain share one listener woken per window."""
+    hass.states.async_set("sensor.one", "1")
+    hass.states.async_set("sensor.two", "2")
+    listeners_before = hass.bus.async_listeners().get(EVENT_STATE_CHANGED, 0)
+    templates = [
+        Template(
+            "{{ states.sensor | map(attribute='state') | join(' ') }}" + suffix, hass
+        )
+        for suffix in ("", "!")
+    ]
+    runs = {template: [] for template in templates}
+
+    @ha.callback
+    def run_listener(event, updates):
+        for update in updates:
+            runs[update.template].append(update.result)
+
+    for template in templates:
+        async_track_template_result(hass, [TrackTemplate(template, None)], run_listener)
+    await hass.async_block_till_done()
+    assert hass.bus.async_listeners()[EVENT_STATE_CHANGED] == listeners_before + 1
+
+    hass.states.async_set("sensor.one", "3")
+    await hass.async_block_till_done()
+    assert runs == {templates[0]: ["3 2"], templates[1]: ["3 2!"]}
+
+    with patch(
+        "homeassistant.helpers.template.Template.async_render_to_info",
+        autospec=True,
+        side_effect=Template.async_render_to_info,
+    ) as mock_render:
+        hass.states.async_set("sensor.two", "4")
+        hass.states.async_set("sensor.two", "5")
+        await hass.async_block_till_done()
+        assert runs == {templates[0]: ["3 2"], templates[1]: ["3 2!"]}
+
+        next_time = dt_util.utcnow() + timedelta(seconds=2)
+        with patch("homeassistant.util.dt.utcnow", return_value=next_time):
+            async_fire_time_changed(hass, next_time)
+            await hass.async_block_till_done()
+        assert mock_render.call_count == 2
+    assert runs == {templates[0]: ["3 2", "3 5"], templates[1]: ["3 2!", "3 5!"]}
+
+
+async def test_track_template_result_domains_batched_skip_entities(hass):
+    """Test a change of an entity tracked on its own renders once."""
+    hass.states.async_set("sensor.a", "1")
+    hass.states.async_set("sensor.b", "2")
+    template = Template("{{ states.sensor | count }} {{ states('sensor.a') }}", hass)
+    runs = []
+
+    @ha.callback
+    def run_listener(event, updates):
+        runs.append(updates.pop().result)
+
+    async_track_template_result(hass, [TrackTemplate(template, None)], run_listener)
+    await hass.async_block_till_done()
+
+    with patch(
+        "homeassistant.helpers.template.Template.async_render_to_info",
+        autospec=True,
+        side_effect=Template.async_render_to_info,
+    ) as mock_render:
+        hass.states.async_set("sensor.a", "3")
+        await hass.async_block_till_done()
+        assert mock_render.call_count == 1
+        assert runs == ["2 3"]
+
+        hass.states.async_set("sensor.c", "4")
+        hass.states.async_set("sensor.a", "5")
+        await hass.async_block_till_done()
+        assert mock_render.call_count == 2
+        assert runs == ["2 3", "3 5"]
+
+        next_time = dt_util.utcnow() + timedelta(seconds=2)
+        with patch("homeassistant.util.dt.utcnow", return_value=next_time):
+            async_fire_time_changed(hass, next_time)
+            await hass.async_block_till_done()
+        assert mock_render.call_count == 3
+    assert runs == ["2 3", "3 5"]
+
+
 async def test_track_template_result_complex(hass):
     """Test tracking template."""
     specific_runs = []
@@ -2219,6 +2302,48 @@ async def test_track_template_rate_limit(hass):
     assert refresh_runs == [0, 1, 2, 4]
 
 
+async def test_track_template_result_super_template_memoized(hass):
+    """Test templates unblocked by the super template reuse unchanged renders."""
+    hass.states.async_set("sensor.available", "on")
+    hass.states.async_set("sensor.value", "5")
+    template_availability = Template("{{ is_state('sensor.available', 'on') }}", hass)
+    template_value = Template("{{ states('sensor.value') }}", hass)
+    runs = []
+
+    @ha.callback
+    def run_listener(event, updates):
+        runs.extend(update.result for update in updates)
+
+    async_track_template_result(
+        hass,
+        [
+            TrackTemplate(template_availability, None),
+            TrackTemplate(template_value, None),
+        ],
+        run_listener,
+        has_super_template=True,
+    )
+    await hass.async_block_till_done()
+
+    hass.states.async_set("sensor.available", "off")
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.value", "5", {"unit": "W"})
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.available", "on")
+    await hass.async_block_till_done()
+    assert runs == [False, True, 5]
+    assert template_value.memo_hits == 1
+
+    hass.states.async_set("sensor.available", "off")
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.value", "6")
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.available", "on")
+    await hass.async_block_till_done()
+    assert runs == [False, True, 5, False, True, 6]
+    assert template_value.memo_misses == 1
+
+
 async def test_track_template_rate_limit_super(hass):
     """Test template rate limit with super template."""
     template_availability = Template(
@@ -2757,6 +2882,44 @@ async def test_string(hass):
     assert refresh_runs == ["no_template"]
 
 
+async def test_track_template_result_skips_unread_attribute_changes(hass):
+    """Test changes to parts of a state the template did not read skip rendering."""
+    hass.states.async_set("sensor.test", "1", {"unit": "W", "power": 5})
+    template_state = Template(
+        "{{ states.sensor.test.state }} {{ state_attr('sensor.test', 'unit') }}", hass
+    )
+    runs = []
+
+    @ha.callback
+    def run_listener(event, updates):
+        runs.append(updates.pop().result)
+
+    async_track_template_result(
+        hass, [TrackTemplate(template_state, None)], run_listener
+    )
+    await hass.async_block_till_done()
+
+    with patch.object(
+        Template,
+        "async_render_to_info",
+        autospec=True,
+        side_effect=Template.async_render_to_info,
+    ) as mock_render:
+        hass.states.async_set("sensor.test", "1", {"unit": "W", "power": 6})
+        await hass.async_block_till_done()
+        assert not mock_render.called
+        assert runs == []
+
+        hass.states.async_set("sensor.test", "1", {"unit": "kW", "power": 6})
+        await hass.async_block_till_done()
+        assert runs == ["1 kW"]
+
+        hass.states.async_set("sensor.test", "2", {"unit": "kW", "power": 6})
+        await hass.async_block_till_done()
+        assert runs == ["1 kW", "2 kW"]
+        assert mock_render.call_count == 2
+
+
 async def test_track_template_result_refresh_cancel(hass):
     """Test cancelling and refreshing result."""
     template_refresh = Template("{{states.switch.test.state == 'on' and now() }}", hass)
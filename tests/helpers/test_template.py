@@ -13,6 +13,8 @@ from homeassistant.components import group
 from homeassistant.config import async_process_ha_core_config
 from homeassistant.const import (
     ATTR_UNIT_OF_MEASUREMENT,
+    EVENT_HOMEASSISTANT_CLOSE,
+    EVENT_HOMEASSISTANT_STARTED,
     LENGTH_METERS,
     LENGTH_MILLIMETERS,
     MASS_GRAMS,
@@ -22,7 +24,7 @@ from homeassistant.const import (
     VOLUME_LITERS,
 )
 from homeassistant.exceptions import TemplateError
-from homeassistant.helpers import device_registry as dr, entity, template
+from homeassistant.helpers import device_registry as dr, entity, template, trace
 from homeassistant.helpers.entity_platform import EntityPlatform
 from homeassistant.setup import async_setup_component
 import homeassistant.util.dt as dt_util
@@ -30,6 +32,7 @@ from homeassistant.util.unit_system import UnitSystem
 
 from tests.common import (
     MockConfigEntry,
+    async_fire_time_changed,
     mock_area_registry,
     mock_device_registry,
     mock_registry,
@@ -3474,3 +3477,133 @@ async def test_undefined_variable(hass, caplog):
         "Template variable warning: 'no_such_variable' is undefined when rendering '{{ no_such_variable }}'"
         in caplog.text
     )
+
+
+async def test_render_info_collects_fields_and_attributes(hass):
+    """Test the state fields and attributes read by a template are collected."""
+    hass.states.async_set("sensor.test", "on", {"a": 1, "b": 2})
+    hass.states.async_set("sensor.other", "off", {"a": 1})
+
+    info = render_to_info(
+        hass,
+        "{{ states.sensor.test.state }} {{ state_attr('sensor.test', 'a') }}"
+        " {{ expand('sensor.other') | count }}",
+    )
+    assert info.entity_fields == {"sensor.test": {"state"}, "sensor.other": None}
+    assert info.entity_attributes == {"sensor.test": {"a"}}
+
+    old_state = hass.states.get("sensor.test")
+    hass.states.async_set("sensor.test", "on", {"a": 1, "b": 3})
+    new_state = hass.states.get("sensor.test")
+    assert not info.state_change_affects_render("sensor.test", old_state, new_state)
+    hass.states.async_set("sensor.test", "on", {"a": 2, "b": 3})
+    assert info.state_change_affects_render(
+        "sensor.test", new_state, hass.states.get("sensor.test")
+    )
+    assert info.state_change_affects_render(
+        "sensor.other", old_state, hass.states.get("sensor.other")
+    )
+    assert info.state_change_affects_render("sensor.test", None, new_state)
+
+    info = render_to_info(hass, "{{ states.sensor.test.attributes | list }}")
+    assert info.entity_fields == {"sensor.test": {"attributes"}}
+
+
+async def test_render_to_info_memoized(hass):
+    """Test a render is reused while the states it read are unchanged."""
+    hass.states.async_set("sensor.test", "on", {"unit": "W"})
+    tpl = template.Template("{{ states.sensor.test.state }}", hass)
+    info = tpl.async_render_to_info()
+
+    hass.states.async_set("sensor.test", "on", {"unit": "kW"})
+    hass.states.async_set("sensor.test", "on", {"unit": "kW"}, force_update=True)
+    assert tpl.async_render_to_info_memoized(info) is info
+    assert tpl.memo_hits == 1
+
+    hass.states.async_set("sensor.test", "off", {"unit": "kW"})
+    info = tpl.async_render_to_info_memoized(info)
+    assert info.result() == "off"
+    assert tpl.memo_misses == 1
+
+    # Different variables or a template reading the time are rendered again
+    assert tpl.async_render_to_info_memoized(info, {"a": 1}) is not info
+    tpl = template.Template("{{ states('sensor.test') }} {{ now() }}", hass)
+    info = tpl.async_render_to_info()
+    assert tpl.async_render_to_info_memoized(info) is not info
+    assert tpl.memo_hits == 0
+
+
+async def test_template_profiler(hass, caplog):
+    """Test template renders are attributed to their owner and trace."""
+    tpl = template.Template("{{ 1 + 1 }}", hass)
+    tpl.async_render()
+    assert template.async_get_profiler(hass) is None
+
+    profiler = template.async_start_profiler(hass, 0)
+    assert template.async_get_profiler(hass) is profiler
+    tpl.async_render()
+
+    token = template.render_source_cv.set(("sensor.test", "sensor.source"))
+    tpl.async_render()
+    template.render_source_cv.reset(token)
+
+    token = trace.trace_id_cv.set(("automation.test", "1"))
+    trace.trace_stack_cv.set(None)
+    element = trace.TraceElement(None, "action/0")
+    trace.trace_stack_push(trace.trace_stack_cv, element)
+    tpl.async_render()
+    trace.trace_stack_pop(trace.trace_stack_cv)
+    trace.trace_id_cv.reset(token)
+
+    stats = {item["owner"]: item for item in profiler.async_as_list()}
+    assert stats["unknown"]["renders"] == 1
+    assert stats["sensor.test"]["triggers"] == {"sensor.source": 1}
+    assert stats["automation.test"]["triggers"] == {"run": 1}
+    assert stats["automation.test"]["template"] == "{{ 1 + 1 }}"
+    assert 0 <= stats["automation.test"]["max_time"]
+    assert element.as_dict()["template_renders"][0]["template"] == "{{ 1 + 1 }}"
+    assert "Template {{ 1 + 1 }} of automation.test took" in caplog.text
+
+    assert template.async_stop_profiler(hass) is profiler
+    assert template.async_get_profiler(hass) is None
+
+
+async def test_bytecode_cache(hass, hass_storage):
+    """Test compiled template code is stored and reused after a restart."""
+    source = "{{ 20 + 22 }}"
+    await template.async_load_bytecode_cache(hass)
+    assert template.Template(source, hass).async_render() == 42
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=template.BYTECODE_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+    stored = hass_storage[template.BYTECODE_STORAGE_KEY]["data"]
+    assert len(stored["templates"]) == 1
+
+    # Simulate a restart with fresh environments
+    hass.data.pop(template._ENVIRONMENT)
+    await template.async_load_bytecode_cache(hass)
+    with patch(
+        "homeassistant.helpers.template.ImmutableSandboxedEnvironment.compile",
+        side_effect=AssertionError("compiled again"),
+    ):
+        assert template.Template(source, hass).async_render() == 42
+
+    # Code stored by other versions is evicted
+    stored["build"] = "0.0.0"
+    hass.data.pop(template._ENVIRONMENT)
+    await template.async_load_bytecode_cache(hass)
+    compile_source = template.ImmutableSandboxedEnvironment.compile
+    with patch(
+        "homeassistant.helpers.template.ImmutableSandboxedEnvironment.compile",
+        side_effect=lambda source: compile_source(template._NO_HASS_ENV, source),
+    ) as mock_compile:
+        assert template.Template(source, hass).async_render() == 42
+    assert mock_compile.called
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+    assert template._NO_HASS_ENV.code_cache is None
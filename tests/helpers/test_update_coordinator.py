@@ -10,13 +10,17 @@ import pytest
 import requests
 
 from homeassistant import config_entries
-from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED
 from homeassistant.core import CoreState
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.exceptions import ConfigEntryNotReady, InvalidStateError
 from homeassistant.helpers import update_coordinator
 from homeassistant.util.dt import utcnow
 
-from tests.common import MockConfigEntry, async_fire_time_changed
+from tests.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -279,6 +283,71 @@ async def test_coordinator_entity(crd):
     assert entity.available is False
 
 
+async def test_coordinator_entities_written_at_once(hass, crd):
+    """Test the entities of a coordinator are written in one batch."""
+
+    class NumberEntity(update_coordinator.CoordinatorEntity):
+        """Entity with the coordinator data as state."""
+
+        @property
+        def state(self):
+            """Return the coordinator data."""
+            return self.coordinator.data
+
+    entities = []
+    for number in range(3):
+        entity = NumberEntity(crd)
+        entity.hass = hass
+        entity.entity_id = f"sensor.number_{number}"
+        await entity.async_added_to_hass()
+        entities.append(entity)
+
+    with patch.object(
+        hass.states, "async_set_many", wraps=hass.states.async_set_many
+    ) as async_set_many:
+        await crd.async_refresh()
+        crd.async_set_updated_data(5)
+
+    assert len(async_set_many.mock_calls) == 2
+    states = [hass.states.get(entity.entity_id) for entity in entities]
+    assert [state.state for state in states] == ["5", "5", "5"]
+    assert len({state.last_updated for state in states}) == 1
+    assert len({state.context for state in states}) == 1
+
+
+async def test_coordinator_entity_with_invalid_state(hass, crd):
+    """Test an entity with an invalid state does not hide the others."""
+
+    class NumberEntity(update_coordinator.CoordinatorEntity):
+        """Entity with the coordinator data as state."""
+
+        @property
+        def state(self):
+            """Return the coordinator data, too long for one entity."""
+            if self.entity_id == "sensor.number_1":
+                return "x" * 300
+            return self.coordinator.data
+
+    for number in range(3):
+        entity = NumberEntity(crd)
+        entity.hass = hass
+        entity.entity_id = f"sensor.number_{number}"
+        await entity.async_added_to_hass()
+
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    with pytest.raises(InvalidStateError):
+        crd.async_set_updated_data(5)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.number_0").state == "5"
+    assert hass.states.get("sensor.number_1") is None
+    assert hass.states.get("sensor.number_2").state == "5"
+    assert [event.data["entity_id"] for event in events] == [
+        "sensor.number_0",
+        "sensor.number_2",
+    ]
+
+
 async def test_async_set_updated_data(crd):
     """Test async_set_updated_data for update coordinator."""
     assert crd.data is None
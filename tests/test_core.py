@@ -1,11 +1,15 @@
 """Test to verify that Home Assistant core works."""
 # pylint: disable=protected-access
 import asyncio
+import copy
 from datetime import datetime, timedelta
 import functools
+import json
 import logging
 import os
 from tempfile import TemporaryDirectory
+import threading
+import time
 from unittest.mock import MagicMock, Mock, PropertyMock, patch
 
 import pytest
@@ -383,6 +387,24 @@ def test_state_as_dict():
     assert state.as_dict() is state.as_dict()
 
 
+def test_state_as_json():
+    """Test a State as JSON."""
+    last_time = datetime(1984, 12, 8, 12, 0, 0)
+    state = ha.State(
+        "happy.happy",
+        "on",
+        {"pig": "dog"},
+        last_updated=last_time,
+        last_changed=last_time,
+    )
+    assert json.loads(state.as_json()) == state.as_dict()
+    # 2nd time to verify cache
+    assert state.as_json() is state.as_json()
+
+    with pytest.raises(ValueError):
+        ha.State("happy.happy", "on", {"pig": float("NaN")}).as_json()
+
+
 async def test_eventbus_add_remove_listener(hass):
     """Test remove_listener method."""
     old_count = len(hass.bus.async_listeners())
@@ -402,6 +424,20 @@ async def test_eventbus_add_remove_listener(hass):
     unsub()
 
 
+async def test_eventbus_has_listeners(hass):
+    """Test checking if an event type has listeners."""
+    assert not hass.bus.async_has_listeners("test")
+    unsub = hass.bus.async_listen("test", lambda _: None)
+    assert hass.bus.async_has_listeners("test")
+    unsub()
+    assert not hass.bus.async_has_listeners("test")
+
+    unsub = hass.bus.async_listen(MATCH_ALL, lambda _: None)
+    assert hass.bus.async_has_listeners("test")
+    assert not hass.bus.async_has_listeners(EVENT_TIME_CHANGED)
+    unsub()
+
+
 async def test_eventbus_filtered_listener(hass):
     """Test we can prefilter events."""
     calls = []
@@ -1058,6 +1094,7 @@ def test_create_timer(mock_monotonic, loop):
         return orig_callback(func)
 
     mock_monotonic.side_effect = 10.2, 10.8, 11.3
+    hass.bus.async_has_listeners.return_value = True
 
     with patch.object(ha, "callback", mock_callback), patch(
         "homeassistant.core.dt_util.utcnow",
@@ -1110,6 +1147,7 @@ def test_timer_out_of_sync(mock_monotonic, loop):
         return orig_callback(func)
 
     mock_monotonic.side_effect = 10.2, 13.3, 13.4
+    hass.bus.async_has_listeners.return_value = True
 
     with patch.object(ha, "callback", mock_callback), patch(
         "homeassistant.core.dt_util.utcnow",
@@ -1151,6 +1189,44 @@ def test_timer_out_of_sync(mock_monotonic, loop):
     assert abs(target - 14.2) < 0.001
 
 
+@patch("homeassistant.core.monotonic")
+def test_timer_without_time_changed_listeners(mock_monotonic, loop):
+    """Test the timer does not fire time changed without listeners."""
+    hass = MagicMock()
+    hass.bus.async_has_listeners.return_value = False
+    mock_monotonic.side_effect = 10.2, 10.8, 11.3
+
+    with patch(
+        "homeassistant.core.dt_util.utcnow",
+        return_value=datetime(2018, 12, 31, 3, 4, 5, 333333),
+    ):
+        ha._async_create_timer(hass)
+
+    delay, callback, target = hass.loop.call_later.mock_calls[0][1]
+
+    with patch(
+        "homeassistant.core.dt_util.utcnow",
+        return_value=datetime(2018, 12, 31, 3, 4, 6, 100000),
+    ):
+        callback(target)
+
+    assert len(hass.bus.async_fire.mock_calls) == 0
+    assert len(hass.loop.call_later.mock_calls) == 2
+
+
+async def test_match_all_does_not_get_time_changed(hass):
+    """Test MATCH_ALL listeners are not sent time changed events."""
+    test_all = async_capture_events(hass, MATCH_ALL)
+    test_time = async_capture_events(hass, EVENT_TIME_CHANGED)
+
+    hass.bus.async_fire(EVENT_TIME_CHANGED, {ATTR_NOW: dt_util.utcnow()})
+    hass.bus.async_fire("test_event")
+    await hass.async_block_till_done()
+
+    assert len(test_time) == 1
+    assert [event.event_type for event in test_all] == ["test_event"]
+
+
 async def test_hass_start_starts_the_timer(loop):
     """Test when hass starts, it starts the timer."""
     hass = ha.HomeAssistant()
@@ -1271,6 +1347,47 @@ def test_context():
     assert c.id is not None
 
 
+def test_context_id_is_lazy():
+    """Test the context id is generated once on first access."""
+    with patch("homeassistant.core.random_uuid_hex", return_value="abc") as mock_uuid:
+        context = ha.Context(user_id="user")
+        assert not mock_uuid.called
+        assert context.id == "abc"
+        assert context.id == "abc"
+    assert len(mock_uuid.mock_calls) == 1
+
+    copied = copy.deepcopy(context)
+    assert copied == context
+    assert hash(copied) == hash(context)
+    assert copied.as_dict() == {"id": "abc", "parent_id": None, "user_id": "user"}
+    assert context != ha.Context(user_id="user")
+
+    assert ha.Context(id=None).id is None
+    assert copy.copy(ha.Context(id=None)).id is None
+
+
+def test_context_id_generated_once_across_threads():
+    """Test threads reading a new context id all see the same id."""
+    ids = iter(range(100))
+
+    def slow_uuid():
+        generated = f"id{next(ids)}"
+        time.sleep(0.01)
+        return generated
+
+    context = ha.Context()
+    seen = []
+    threads = [
+        threading.Thread(target=lambda: seen.append(context.id)) for _ in range(5)
+    ]
+    with patch("homeassistant.core.random_uuid_hex", side_effect=slow_uuid):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert seen == ["id0"] * 5
+
+
 async def test_async_functions_with_callback(hass):
     """Test we deal with async functions accidentally marked as callback."""
     runs = []
@@ -1547,6 +1664,109 @@ async def test_async_entity_ids_count(hass):
     assert hass.states.async_entity_ids_count("light") == 3
 
 
+async def test_statemachine_domain_index(hass):
+    """Test domain filtered lookups follow added, updated and removed states."""
+    hass.states.async_set("switch.link", "on")
+    hass.states.async_set("light.bowl", "on")
+    hass.states.async_set("light.frog", "on")
+
+    hass.states.async_set("light.bowl", "off")
+    assert hass.states.async_all("light") == [
+        hass.states.get("light.bowl"),
+        hass.states.get("light.frog"),
+    ]
+    assert hass.states.async_entity_ids(["switch", "light", "switch", "cover"]) == [
+        "switch.link",
+        "light.bowl",
+        "light.frog",
+    ]
+    assert hass.states.async_entity_ids_count(("light", "light")) == 2
+
+    hass.states.async_remove("light.frog")
+    assert hass.states.async_entity_ids("LIGHT") == ["light.bowl"]
+    assert hass.states.async_entity_ids_count("light") == 1
+
+    hass.states.async_remove("light.bowl")
+    assert hass.states.async_all("light") == []
+    assert hass.states.async_entity_ids_count(["light"]) == 0
+
+
+async def test_statemachine_async_set_many(hass):
+    """Test setting several states at once."""
+    hass.states.async_set("light.bowl", "on")
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    override_context = ha.Context()
+
+    hass.states.async_set_many(
+        [
+            ("light.bowl", "on", None, False, None),
+            ("light.Frog", "off", {"brightness": 10}, False, None),
+            ("switch.link", "on", None, False, override_context),
+            ("light.bowl", "off", None, False, None),
+        ]
+    )
+    await hass.async_block_till_done()
+
+    assert [event.data["entity_id"] for event in events] == [
+        "light.frog",
+        "switch.link",
+        "light.bowl",
+    ]
+    frog, link, bowl = (event.data["new_state"] for event in events)
+    assert frog.attributes == {"brightness": 10}
+    assert frog.last_updated == link.last_updated == bowl.last_updated
+    assert events[0].time_fired == frog.last_updated
+    assert frog.context is bowl.context
+    assert link.context is override_context
+    assert events[2].data["old_state"].state == "on"
+    assert hass.states.get("light.bowl") is bowl
+    assert hass.states.async_entity_ids("light") == ["light.bowl", "light.frog"]
+
+    hass.states.async_set_many([("light.bowl", "off", None, False, None)])
+    await hass.async_block_till_done()
+    assert len(events) == 3
+
+
+async def test_statemachine_async_set_many_invalid_state(hass):
+    """Test an invalid state does not keep the other states from being written."""
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    with pytest.raises(InvalidStateError):
+        hass.states.async_set_many(
+            [
+                ("sensor.a", "1", None, False, None),
+                ("sensor.b", "x" * 300, None, False, None),
+                ("sensor.c", "3", None, False, None),
+            ]
+        )
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.b") is None
+    assert [event.data["entity_id"] for event in events] == ["sensor.a", "sensor.c"]
+    assert events[0].data["new_state"] is hass.states.get("sensor.a")
+    assert events[1].data["new_state"] is hass.states.get("sensor.c")
+
+
+async def test_statemachine_reuses_unchanged_attributes(hass):
+    """Test unchanged attributes are shared with the new state."""
+    hass.states.async_set("light.bowl", "on", {"brightness": 100})
+    on_state = hass.states.get("light.bowl")
+
+    hass.states.async_set("light.bowl", "off", {"brightness": 100})
+    off_state = hass.states.get("light.bowl")
+    assert off_state.attributes is on_state.attributes
+
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    hass.states.async_set("light.bowl", "off", off_state.attributes)
+    hass.states.async_set("light.bowl", "on", off_state.attributes)
+    await hass.async_block_till_done()
+    assert len(events) == 1
+    assert hass.states.get("light.bowl").attributes is on_state.attributes
+
+    hass.states.async_set("light.bowl", "off", {"brightness": 50})
+    assert hass.states.get("light.bowl").attributes == {"brightness": 50}
+
+
 async def test_hassjob_forbid_coroutine():
     """Test hassjob forbids coroutines."""
 